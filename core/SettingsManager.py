@@ -1,15 +1,41 @@
 import os
 import json
+import atexit
+import tempfile
+import threading
 
 
 import sys
 
-def get_settings_file():
-    # Store settings in %APPDATA%\KToolkit\toolbox_settings.json
-    appdata = os.environ.get('APPDATA')
+def get_app_data_dir():
+    # %APPDATA%\KToolkit holds settings and all on-disk caches
+    appdata = os.environ.get('APPDATA') or os.path.expanduser('~')
     base_path = os.path.join(appdata, 'KToolkit')
     os.makedirs(base_path, exist_ok=True)
-    return os.path.join(base_path, 'toolbox_settings.json')
+    return base_path
+
+def atomic_write(path, text):
+    """Write text to path through a temp file in the same folder and os.replace.
+
+    Readers (and a crash mid-write) see either the old file or the new one,
+    never a truncated one.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def get_settings_file():
+    # Store settings in %APPDATA%\KToolkit\toolbox_settings.json
+    return os.path.join(get_app_data_dir(), 'toolbox_settings.json')
 
 SETTINGS_FILE = get_settings_file()
 
@@ -18,14 +44,95 @@ DEFAULT_SETTINGS = {
     "video_download_path": "",
     "programs_install_path": "",
     "first_launch": True,
-    "Dev mode": False
+    "Dev mode": False,
+    "lazy_tabs": True,
+    "prefetch_modules": True
+}
+
+def _to_bool(value):
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ("1", "true", "yes", "on"):
+            return True
+        if value in ("0", "false", "no", "off", ""):
+            return False
+        raise ValueError(f"Not a boolean: {value!r}")
+    return bool(value)
+
+def _identity(value):
+    return value
+
+# Coercion for the "type" field of a module's mod_settings schema
+SETTING_TYPES = {
+    "bool": _to_bool,
+    "int": int,
+    "float": float,
+    "str": str,
 }
 
+class ModuleSettings:
+    """Typed settings of one module, stored under settings["modules"][namespace].
+
+    The mod_settings schema is compiled once into (coerce, default) pairs and
+    the coerced values are kept in a dict, so get() is a plain lookup.
+    """
+    def __init__(self, manager, namespace, schema=None):
+        self.manager = manager
+        self.namespace = namespace
+        self.schema = schema or {}
+        self._fields = {
+            key: (SETTING_TYPES.get(spec.get("type"), _identity), spec.get("default"))
+            for key, spec in self.schema.items()
+        }
+        self._values = {}
+        self.reload()
+
+    def reload(self):
+        stored = self.manager.settings.get("modules", {}).get(self.namespace, {})
+        values = dict(stored)
+        for key, (coerce, default) in self._fields.items():
+            # Older versions kept module options in the flat settings dict
+            raw = stored.get(key, self.manager.settings.get(key, default))
+            try:
+                values[key] = coerce(raw) if raw is not None else default
+            except (TypeError, ValueError):
+                values[key] = default
+        self._values = values
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def set(self, key, value):
+        coerce = self._fields.get(key, (_identity, None))[0]
+        value = coerce(value)
+        self._values[key] = value
+        with self.manager._lock:
+            self.manager.settings.setdefault("modules", {}).setdefault(self.namespace, {})[key] = value
+        self.manager._schedule_save()
+
+    def as_dict(self):
+        return dict(self._values)
+
+    def update(self, values):
+        for key, value in values.items():
+            self.set(key, value)
+
 class SettingsManager:
-    def __init__(self, settings_file=SETTINGS_FILE):
+    def __init__(self, settings_file=SETTINGS_FILE, write_delay=0.5):
         self.settings_file = settings_file
         self.settings = DEFAULT_SETTINGS.copy()
+        # Write-behind: set() only marks the settings dirty and changes made
+        # within write_delay seconds are written together. 0 writes on every set().
+        self.write_delay = write_delay
+        self.write_count = 0
+        self.saved_writes = 0
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._namespaces = {}
         self.load()
+        atexit.register(self.flush)
 
     def load(self):
         if os.path.exists(self.settings_file):
@@ -36,21 +143,108 @@ class SettingsManager:
                 pass
 
     def save(self):
-        with open(self.settings_file, 'w') as f:
-            json.dump(self.settings, f, indent=4)
+        # Snapshot and rename happen under _write_lock, so a timer flush racing an
+        # atexit/import flush can't rename an older snapshot over a newer one.
+        # set() only needs _lock and is never held up by the disk write.
+        with self._write_lock:
+            with self._lock:
+                data = json.dumps(self.settings, indent=4)
+                self._dirty = False
+                self.write_count += 1
+            atomic_write(self.settings_file, data)
+
+    def flush(self):
+        """Write pending changes now (also runs at exit)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+        self.save()
+
+    def _schedule_save(self):
+        with self._lock:
+            if self.write_delay <= 0:
+                self._dirty = True
+            elif self._timer is not None:
+                # Folded into the write that is already pending
+                self._dirty = True
+                self.saved_writes += 1
+                return
+            else:
+                self._dirty = True
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self.save()
+
+    def namespace(self, name, schema=None):
+        """Return the ModuleSettings for a module, compiling its schema on first use."""
+        ns = self._namespaces.get(name)
+        if ns is None or (schema and not ns.schema):
+            ns = ModuleSettings(self, name, schema)
+            self._namespaces[name] = ns
+        return ns
 
-    def export(self, export_path):
+    def export(self, export_path, namespace=None):
+        if namespace is not None:
+            data = json.dumps({"namespace": namespace, "settings": self.namespace(namespace).as_dict()}, indent=4)
+        else:
+            with self._lock:
+                data = json.dumps(self.settings, indent=4)
         with open(export_path, 'w') as f:
-            json.dump(self.settings, f, indent=4)
+            f.write(data)
 
-    def import_settings(self, import_path):
+    def import_settings(self, import_path, namespace=None):
         with open(import_path, 'r') as f:
-            self.settings.update(json.load(f))
-        self.save()
+            data = json.load(f)
+        # Files written by export(namespace=...) carry their namespace
+        if isinstance(data, dict) and "namespace" in data and "settings" in data:
+            namespace = namespace or data["namespace"]
+            data = data["settings"]
+        if namespace is not None:
+            self.namespace(namespace).update(data)
+            self.flush()
+            return
+        with self._lock:
+            self.settings.update(data)
+            self._dirty = True
+        for ns in self._namespaces.values():
+            ns.reload()
+        self.flush()
 
     def get(self, key, default=None):
         return self.settings.get(key, default)
 
     def set(self, key, value):
-        self.settings[key] = value
-        self.save()
+        with self._lock:
+            self.settings[key] = value
+        self._schedule_save()
+
+
+def _benchmark(n=10000):
+    """n set() calls, write-through (write_delay=0) vs write-behind, in a temp folder."""
+    import time
+    for delay in (0, 0.5):
+        folder = tempfile.mkdtemp()
+        manager = SettingsManager(os.path.join(folder, 'toolbox_settings.json'), write_delay=delay)
+        ns = manager.namespace("benchmark", {"volume": {"type": "int", "default": 0}})
+        start = time.perf_counter()
+        for i in range(n):
+            if i % 2:
+                ns.set("volume", i)
+            else:
+                manager.set("counter", i)
+        manager.flush()
+        elapsed = time.perf_counter() - start
+        with open(manager.settings_file, 'r') as f:
+            saved = json.load(f)
+        assert saved["counter"] == n - 2 and saved["modules"]["benchmark"]["volume"] == n - 1
+        print(f"write_delay={delay}: {n} set() -> {manager.write_count} writes "
+              f"({manager.saved_writes} folded) in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark(*map(int, sys.argv[1:]))
@@ -4,11 +4,14 @@ from core.ui_settings import SettingsTab
 import tkinter as tk
 from tkinter import messagebox
 from core.SettingsManager import SettingsManager
-from core.emoji import emoji_
-import importlib.util
-import glob
+from core.emoji import emoji_, save_atlas
+from core.module_registry import ModuleRegistry
 import sys
 import os
+import queue
+import tempfile
+import threading
+import time
 
 def resource_path(relative_path):
     try:
@@ -20,35 +23,55 @@ def resource_path(relative_path):
 class UserInterface:
 
     def show_blacklist_popup(self, violating, found):
-        import tkinter as tk
-        from tkinter import messagebox
-        root = tk.Tk()
-        root.withdraw()
+        # The main window is already up; hide it and block on the warning
+        self.root.withdraw()
         msg = f"Violating program found please uninstall: {', '.join(violating)}"
 
-        popup = tk.Toplevel()
+        popup = tk.Toplevel(self.root)
         popup.title("Security Warning")
         tk.Label(popup, text=msg, fg="red", font=("Segoe UI", 12, "bold")).pack(padx=20, pady=(20,10))
         for prog in violating:
             tk.Label(popup, text=f"Detected: {prog}").pack(pady=2)
-        import sys
         def close_and_exit():
             popup.destroy()
+            self.root.destroy()
             sys.exit(0)
         tk.Button(popup, text="Close Toolbox", command=close_and_exit).pack(pady=(0, 20))
         popup.protocol("WM_DELETE_WINDOW", close_and_exit)
-        popup.mainloop()
-    def __init__(self, settings: SettingsManager):
-        # --- Blacklist scan and pop-up before UI loads ---
-        self.blacklist = [
-            "Cheat Engine", "Roblox", "Roblox Studio", "Roblox Player",
-        ]
-        from core.program_detection import detect_programs_by_name, uninstall_program_by_registry_key
-        found = detect_programs_by_name(self.blacklist)
+        popup.grab_set()
+
+    def start_blacklist_scan(self):
+        # Runs off the UI thread: exe/folder hints first, then the indexed full check
+        from core.program_detection import quick_scan_programs, detect_programs_by_name
+        self.blacklist_queue = queue.Queue()
+        def worker():
+            try:
+                found = quick_scan_programs(self.blacklist)
+                if not any(found.values()):
+                    found = detect_programs_by_name(self.blacklist)
+            except Exception as e:
+                print(f"Blacklist scan failed: {e}")
+                found = {}
+            self.blacklist_queue.put(found)
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(100, self.poll_blacklist_scan)
+
+    def poll_blacklist_scan(self):
+        try:
+            found = self.blacklist_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self.poll_blacklist_scan)
+            return
         violating = [name for name, path in found.items() if path]
         if violating:
             self.show_blacklist_popup(violating, found)
-            return
+
+    def __init__(self, settings: SettingsManager, modules_dir="modules", mainloop=True):
+        # --- Blacklist ---
+        # Checked in the background once the window exists (see start_blacklist_scan)
+        self.blacklist = [
+            "Cheat Engine", "Roblox", "Roblox Studio", "Roblox Player",
+        ]
 
         self.settings = settings
         self.root = ctk.CTk()
@@ -56,6 +79,7 @@ class UserInterface:
         icon_path = resource_path("assets/icon.ico")
         self.root.iconbitmap(icon_path)
         self.root.resizable(False, False)
+        self.start_blacklist_scan()
         self.root.minsize(950, 610)
         self.root.geometry("950x610")
         ctk.set_appearance_mode("dark")
@@ -94,112 +118,48 @@ class UserInterface:
         self.main_content_frame.grid_rowconfigure(0, weight=1)
         self.main_content_frame.grid_columnconfigure(0, weight=1)
 
+        # --- Module Registry ---
+        # Every module is discovered once from static manifests and imported
+        # at most once; the sidebar, tabs and settings all read from here.
+        self.registry = ModuleRegistry(modules_dir, dev_mode=self.settings.get("Dev mode", False))
+        # Typed per-module settings stores, compiled from each mod_settings schema
+        for entry in self.registry.modules():
+            if entry.mod_settings:
+                self.settings.namespace(entry.id, entry.mod_settings)
+
         # --- Tabs ---
-        self.settings_ui = SettingsTab(self.main_content_frame, self.settings)
+        self.settings_ui = SettingsTab(self.main_content_frame, self.settings, self.registry)
         self.frames = {
             "settings": self.settings_ui,
         }
 
 
         # --- Dynamic Module Discovery ---
+        # In lazy mode each module is imported and its frame constructed the
+        # first time show_tab selects it.
+        self.lazy_tabs = self.settings.get("lazy_tabs", True)
         self.module_frames = {}
         self.module_info = []
         self.module_buttons = []
         self.module_button_map = {}
         row = 2  # After built-in buttons
 
-
-        # Load regular modules (.py) and compiled modules (.pyd) from 'modules' folder
-        module_files = glob.glob(os.path.join("modules", "*.py"))
-        pyd_files = glob.glob(os.path.join("modules", "*.pyd"))
-        all_module_files = module_files + pyd_files
-        for mod_path in all_module_files:
-            mod_name = os.path.splitext(os.path.basename(mod_path))[0]
-            if mod_name.startswith("__") or mod_name == "example_module":
+        for entry in self.registry.modules():
+            if entry.id == "example_module" or not entry.has_ui:
                 continue
-            # Load .py modules as before
-            if mod_path.endswith('.py'):
-                spec = importlib.util.spec_from_file_location(mod_name, mod_path)
-                mod = importlib.util.module_from_spec(spec)
-                try:
-                    spec.loader.exec_module(mod)
-                except Exception as e:
-                    print(f"Failed to load module {mod_name}: {e}")
-                    continue
-            # Load .pyd modules using importlib
-            elif mod_path.endswith('.pyd'):
-                modules_dir = os.path.abspath(os.path.dirname(mod_path))
-                if modules_dir not in sys.path:
-                    sys.path.insert(0, modules_dir)
-                try:
-                    mod = importlib.import_module(mod_name)
-                except Exception as e:
-                    print(f"Failed to load compiled module {mod_name}: {e}")
-                    continue
-            else:
-                continue
-            ui_class = None
-            for attr in dir(mod):
-                obj = getattr(mod, attr)
-                if isinstance(obj, type) and issubclass(obj, ctk.CTkFrame) and obj is not ctk.CTkFrame:
-                    ui_class = obj
-                    break
-            if not ui_class:
-                continue
-            mod_emoji = getattr(mod, "module_emoji", "🧩")
-            mod_name_disp = getattr(mod, "module_name", mod_name)
-            mod_desc = getattr(mod, "module_description", "")
-            mod_id = mod_name
-            home_widget_func = getattr(mod, "home_widget", None)
-            btn = ctk.CTkButton(self.sidebar_frame, image=emoji_(mod_emoji), text=mod_name_disp, command=lambda n=mod_name: self.show_tab(n), fg_color="transparent", hover_color="#2a8cdb", anchor="w", font=ctk.CTkFont(family="Segoe UI", size=14, weight="bold"), text_color_disabled="#606060")
-            btn.grid(row=row, column=0, sticky="ew", padx=20, pady=5)
-            self.module_buttons.append((btn, mod_name))
-            self.module_button_map[mod_name] = btn
-            mod_info = {"name": mod_name_disp, "desc": mod_desc, "emoji": mod_emoji, "id": mod_id, "home_widget": home_widget_func}
-            if mod_name == "home_module":
-                frame = ui_class(self.main_content_frame, self.settings, modules_info=self.module_info)
-            else:
-                try:
-                    frame = ui_class(self.main_content_frame, self.settings)
-                except TypeError:
-                    frame = ui_class(self.main_content_frame)
-            self.module_frames[mod_name] = frame
-            mod_info["frame"] = frame
-            self.module_info.append(mod_info)
-            self.frames[mod_name] = frame
+            self.add_module_tab(entry, row)
             row += 1
 
-        # --- Dev mode: Load dll_converter and pyinstaller_compiler from core if enabled ---
-        if self.settings.get("Dev mode", False):
-            for dev_mod in ["dll_converter", "nuitka"]:
-                dev_path = os.path.join("core", f"{dev_mod}.py")
-                if os.path.exists(dev_path):
-                    mod_name = dev_mod
-                    spec = importlib.util.spec_from_file_location(mod_name, dev_path)
-                    mod = importlib.util.module_from_spec(spec)
-                    try:
-                        spec.loader.exec_module(mod)
-                    except Exception as e:
-                        print(f"Failed to load core module {mod_name}: {e}")
-                    else:
-                        ui_class = getattr(mod, "ModuleUI", None)
-                        if ui_class and issubclass(ui_class, ctk.CTkFrame):
-                            mod_emoji = getattr(mod, "module_emoji", "🧩")
-                            mod_name_disp = getattr(mod, "module_name", mod_name)
-                            mod_desc = getattr(mod, "module_description", "")
-                            mod_id = mod_name
-                            home_widget_func = getattr(mod, "home_widget", None)
-                            btn = ctk.CTkButton(self.sidebar_frame, image=emoji_(mod_emoji), text=mod_name_disp, command=lambda n=mod_name: self.show_tab(n), fg_color="transparent", hover_color="#2a8cdb", anchor="w", font=ctk.CTkFont(family="Segoe UI", size=14, weight="bold"), text_color_disabled="#606060")
-                            btn.grid(row=row, column=0, sticky="ew", padx=20, pady=5)
-                            self.module_buttons.append((btn, mod_name))
-                            self.module_button_map[mod_name] = btn
-                            mod_info = {"name": mod_name_disp, "desc": mod_desc, "emoji": mod_emoji, "id": mod_id, "home_widget": home_widget_func}
-                            frame = ui_class(self.main_content_frame, self.settings)
-                            self.module_frames[mod_name] = frame
-                            mod_info["frame"] = frame
-                            self.module_info.append(mod_info)
-                            self.frames[mod_name] = frame
-                            row += 1
+        if not self.lazy_tabs:
+            for _, mod_name in self.module_buttons:
+                self.build_module_frame(mod_name)
+        elif self.settings.get("prefetch_modules", True):
+            # Import module code on a thread pool while the skeleton sidebar is shown
+            self.prefetch_futures = self.registry.prefetch([mod_name for _, mod_name in self.module_buttons])
+            for btn, mod_name in self.module_buttons:
+                if not self.prefetch_futures[mod_name].done():
+                    btn.configure(text=f"{self.registry.get(mod_name).name}  …")
+            self.root.after(100, self.poll_prefetch)
 
         self.author_label = ctk.CTkLabel(self.sidebar_frame, text="By MisterK", font=ctk.CTkFont(family="Segoe UI", size=10, weight="bold"), text_color="#808080")
         self.author_label.grid(row=998, column=0, padx=20, pady=(10, 10), sticky="s")
@@ -210,8 +170,34 @@ class UserInterface:
             self.handle_first_launch_ffmpeg_check()
 
         self.current_tab = None
-        self.show_tab("home_module")
-        self.root.mainloop()
+        # Let the sidebar paint before the home tab is built
+        self.root.after(50, lambda: self.show_tab("home_module"))
+        if mainloop:
+            self.root.mainloop()
+
+    def poll_prefetch(self):
+        # Flip sidebar buttons from "loading" to "ready" as background imports finish
+        pending = False
+        for btn, mod_name in self.module_buttons:
+            future = self.prefetch_futures.get(mod_name)
+            if future is None:
+                continue
+            if future.done():
+                entry = self.registry.get(mod_name)
+                btn.configure(text=entry.name)
+                if entry.error is not None:
+                    btn.configure(state="disabled")
+                del self.prefetch_futures[mod_name]
+            else:
+                pending = True
+        if pending:
+            self.root.after(100, self.poll_prefetch)
+        else:
+            print("[Startup] Module import times:")
+            for line in self.registry.import_report():
+                print(f"  {line}")
+            # Startup emoji are all rendered by now; persist them for the next launch
+            save_atlas()
 
     def handle_first_launch_ffmpeg_check(self):
         import shutil
@@ -310,10 +296,55 @@ class UserInterface:
             dialog.wait_window()
         self.settings.set("first_launch", False)
 
+    def add_module_tab(self, entry, row):
+        mod_name = entry.id
+        mod_emoji = entry.manifest["emoji"]
+        mod_name_disp = entry.name
+        btn = ctk.CTkButton(self.sidebar_frame, image=emoji_(mod_emoji), text=mod_name_disp, command=lambda n=mod_name: self.show_tab(n), fg_color="transparent", hover_color="#2a8cdb", anchor="w", font=ctk.CTkFont(family="Segoe UI", size=14, weight="bold"), text_color_disabled="#606060")
+        btn.grid(row=row, column=0, sticky="ew", padx=20, pady=5)
+        self.module_buttons.append((btn, mod_name))
+        self.module_button_map[mod_name] = btn
+        # home_widget is filled in once the module has been imported
+        mod_info = {"name": mod_name_disp, "desc": entry.manifest["desc"], "emoji": mod_emoji, "id": mod_name, "home_widget": None, "frame": None}
+        self.module_info.append(mod_info)
+
+    def build_module_frame(self, mod_name):
+        # Import the module and construct its frame on first use
+        frame = self.module_frames.get(mod_name)
+        if frame is not None:
+            return frame
+        entry = self.registry.get(mod_name)
+        if entry is None or self.registry.load(entry) is None:
+            return None
+        ui_class = entry.ui_class
+        if ui_class is None:
+            print(f"Module {mod_name} has no UI class.")
+            return None
+        try:
+            if mod_name == "home_module":
+                frame = ui_class(self.main_content_frame, self.settings, modules_info=self.module_info)
+            else:
+                try:
+                    frame = ui_class(self.main_content_frame, self.settings)
+                except TypeError:
+                    frame = ui_class(self.main_content_frame)
+        except Exception as e:
+            print(f"Failed to build module {mod_name}: {e}")
+            return None
+        self.module_frames[mod_name] = frame
+        self.frames[mod_name] = frame
+        for mod_info in self.module_info:
+            if mod_info["id"] == mod_name:
+                mod_info["frame"] = frame
+                mod_info["home_widget"] = getattr(entry.module, "home_widget", None)
+        return frame
+
     def show_tab(self, name):
         if self.current_tab:
             self.current_tab.grid_remove()
         frame = self.frames.get(name)
+        if frame is None and name in self.module_button_map:
+            frame = self.build_module_frame(name)
         if frame:
             frame.grid(row=0, column=0, sticky="nsew")
             self.current_tab = frame
@@ -341,3 +372,42 @@ class UserInterface:
                 btn.configure(fg_color="#1f6aa5", text_color="white", text_color_disabled="white")
             else:
                 btn.configure(fg_color="transparent", text_color="white", text_color_disabled="#606060")
+
+
+BENCHMARK_MODULE = '''import customtkinter as ctk
+
+module_name = "Synthetic {i}"
+module_emoji = "🧩"
+module_description = "Synthetic module {i} for the startup benchmark."
+
+
+class Synthetic{i}UI(ctk.CTkFrame):
+    def __init__(self, parent, settings=None):
+        super().__init__(parent, fg_color="transparent")
+        for row in range(40):
+            ctk.CTkLabel(self, text=f"Row {{row}}").grid(row=row, column=0, sticky="w")
+'''
+
+
+def _benchmark(*counts):
+    """Time from UserInterface() to the first update_idletasks(), eager vs lazy tabs, for N synthetic modules."""
+    for n in map(int, counts or (5, 20, 80)):
+        modules_dir = tempfile.mkdtemp()
+        for i in range(n):
+            with open(os.path.join(modules_dir, f"synthetic_{i}.py"), "w", encoding="utf-8") as f:
+                f.write(BENCHMARK_MODULE.format(i=i))
+        results = []
+        for lazy in (False, True):
+            settings = SettingsManager(os.path.join(tempfile.mkdtemp(), 'toolbox_settings.json'))
+            settings.set("first_launch", False)
+            settings.set("lazy_tabs", lazy)
+            start = time.perf_counter()
+            ui = UserInterface(settings, modules_dir=modules_dir, mainloop=False)
+            ui.root.update_idletasks()
+            results.append((time.perf_counter() - start) * 1000)
+            ui.root.destroy()
+        print(f"{n:4d} modules: eager {results[0]:8.1f} ms, lazy {results[1]:8.1f} ms to first paint")
+
+
+if __name__ == "__main__":
+    _benchmark(*sys.argv[1:])
@@ -5,7 +5,9 @@ import os
 import sys
 import subprocess
 import gc
-import ast
+
+from core.import_scanner import get_scanner, distribution_for
+from core.wheel_cache import get_cache
 
 # --- Module Metadata ---
 module_version = "1.0.0"
@@ -55,6 +57,7 @@ class DLLConverterUI(ctk.CTkFrame):
     def __init__(self, parent, settings=None):
         super().__init__(parent, fg_color="transparent")
         self.settings = settings
+        self.config = settings.namespace("dll_converter", mod_settings) if settings else None
         self.imported_modules = []
         self.check_vars = {}
         self.checkboxes_frame = None
@@ -152,22 +155,9 @@ class DLLConverterUI(ctk.CTkFrame):
             self.check_vars[mod] = var
 
     def get_third_party_imports(self, file_path):
-        stdlib = set(sys.builtin_module_names)
-        stdlib.update({
-            'os', 'sys', 'math', 'json', 're', 'subprocess', 'threading', 'time', 'tkinter', 'ctypes', 'gc', 'logging', 'collections', 'itertools', 'functools', 'typing', 'pathlib', 'shutil', 'random', 'datetime', 'inspect', 'platform', 'traceback', 'unittest', 'email', 'http', 'urllib', 'xml', 'csv', 'argparse', 'socket', 'queue', 'multiprocessing', 'asyncio', 'contextlib', 'enum', 'abc', 'pprint', 'glob', 'tempfile', 'getpass', 'hashlib', 'hmac', 'base64', 'struct', 'signal', 'weakref', 'zipfile', 'codecs', 'configparser', 'copy', 'decimal', 'difflib', 'doctest', 'fileinput', 'fractions', 'heapq', 'html', 'imghdr', 'locale', 'mailbox', 'mmap', 'numbers', 'pickle', 'selectors', 'smtplib', 'sqlite3', 'ssl', 'statistics', 'string', 'tarfile', 'textwrap', 'uuid', 'webbrowser', 'wsgiref', 'zlib', 'zoneinfo', 'dataclasses', 'concurrent', 'importlib', 'site', 'distutils', 'setuptools', 'venv', 'pip', 'cython', 'pex'
-        })
-        with open(file_path, 'r', encoding='utf-8') as f:
-            tree = ast.parse(f.read(), filename=file_path)
-        imports = set()
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.add(alias.name.split('.')[0])
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    imports.add(node.module.split('.')[0])
-        third_party = [mod for mod in sorted(imports) if mod not in stdlib]
-        return third_party
+        # Toolkit packages and build tools are never packaged alongside the module
+        skip = {'core', 'modules', 'setuptools', 'pip', 'cython', 'Cython', 'pex', 'distutils'}
+        return sorted(get_scanner().third_party([file_path], local=skip))
 
     def convert_module(self):
         if not self.selected_module:
@@ -194,7 +184,7 @@ class DLLConverterUI(ctk.CTkFrame):
             top.grab_set()
             self.wait_window(top)
 
-            hidden_imports = self.settings.get("hidden_imports", "")
+            hidden_imports = self.config.get("hidden_imports", "") if self.config else ""
             hidden_imports_list = [pkg.strip() for pkg in hidden_imports.split(",") if pkg.strip()]
             checked_imports = [mod for mod, var in self.check_vars.items() if var.get()]
             all_imports = list(set(hidden_imports_list + checked_imports))
@@ -211,7 +201,7 @@ class DLLConverterUI(ctk.CTkFrame):
             setup_code = (
                 "from setuptools import setup\n"
                 "from Cython.Build import cythonize\n"
-                f"setup(\n    ext_modules=cythonize('{module_path}', language_level={self.settings.get('cythonize_level', '3')})\n)\n"
+                f"setup(\n    ext_modules=cythonize('{module_path}', language_level={self.config.get('cythonize_level', '3') if self.config else '3'})\n)\n"
             )
             setup_path = os.path.join(os.path.dirname(module_path), "setup_cython_temp.py")
             with open(setup_path, "w") as f:
@@ -220,6 +210,12 @@ class DLLConverterUI(ctk.CTkFrame):
             result = subprocess.run(cmd, cwd=os.path.dirname(module_path), capture_output=True, text=True)
             gc.collect()
             if result.returncode == 0:
+                # Ship the metadata next to the .pyd so the toolkit can list it without importing
+                try:
+                    from core.module_manifest import write_sidecar
+                    write_sidecar(module_path)
+                except Exception as e:
+                    print(f"[DLLConverter] Failed to write manifest sidecar: {e}")
                 self.status_label.configure(text=f"Conversion successful! .pyd created in {os.path.dirname(module_path)}")
                 messagebox.showinfo("Success", f"DLL (.pyd) created for {module_name}.")
             else:
@@ -228,16 +224,26 @@ class DLLConverterUI(ctk.CTkFrame):
             os.remove(setup_path)
 
             for mod_name in all_imports:
-                pkg_name = self.IMPORT_TO_PYPI.get(mod_name, mod_name)
+                pkg_name = distribution_for(mod_name, self.IMPORT_TO_PYPI)
                 self.status_label.configure(text=f"Packaging {pkg_name} as {archive_type.get()} in ./libs...")
                 install_dir = os.path.join(libs_dir, pkg_name)
                 if not self.pip_cmd:
                     self.status_label.configure(text=f"pip is not available. Skipping {pkg_name}.")
                     continue
                 pip_success = False
+                # The index plus the local wheel cache as an extra source; the cache alone when
+                # the index fails and it holds a wheel for the Python behind pip_cmd
+                cache = get_cache()
+                pip_python = self.pip_cmd[0] if self.pip_cmd[1:3] == ["-m", "pip"] else None
                 if archive_type.get() == "zip":
+                    pip_install = self.pip_cmd + ["install", pkg_name, "-t", install_dir]
                     try:
-                        subprocess.check_call(self.pip_cmd + ["install", pkg_name, "-t", install_dir])
+                        try:
+                            subprocess.check_call(pip_install + cache.find_links_args())
+                        except subprocess.CalledProcessError:
+                            if not pip_python or not cache.has([pkg_name], pip_python):
+                                raise
+                            subprocess.check_call(pip_install + cache.find_links_args(offline=True))
                         pip_success = True
                     except Exception as e:
                         self.status_label.configure(text=f"Failed to pip install {pkg_name}: {e}")
@@ -251,7 +257,7 @@ class DLLConverterUI(ctk.CTkFrame):
                     except Exception:
                         pass
                     pex_path = os.path.join(libs_dir, f"{pkg_name}.pex")
-                    pex_cmd = [sys.executable, "-m", "pex", pkg_name, "-o", pex_path]
+                    pex_cmd = [sys.executable, "-m", "pex", pkg_name, "-f", cache.wheel_dir, "-o", pex_path]
                     subprocess.run(pex_cmd, capture_output=True, text=True)
             self.status_label.configure(text="All done!")
         except Exception as e:
@@ -1,11 +1,107 @@
+import os
+import json
+import atexit
+import threading
+from functools import lru_cache
 import emoji
 from customtkinter import CTkImage
 from PIL import Image, ImageDraw, ImageFont
-def emoji_(emoji, size=32):
-    # Convert emoji to CTkImage
-    font = ImageFont.truetype("seguiemj.ttf", size=int(size/1.5))
-    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    draw.text((size/2, size/2), emoji, embedded_color=True, font=font, anchor="mm")
-    img = CTkImage(img, size=(size, size))
-    return img
\ No newline at end of file
+from core.SettingsManager import get_app_data_dir
+
+# Rendered emoji are cached twice: CTkImages in an in-process LRU, and the
+# raw tiles in a PNG atlas next to the settings file so later startups do
+# no font rendering at all.
+
+EMOJI_FONT = "seguiemj.ttf"
+ATLAS_FILE = os.path.join(get_app_data_dir(), "emoji_atlas.png")
+ATLAS_INDEX_FILE = os.path.join(get_app_data_dir(), "emoji_atlas.json")
+ATLAS_WIDTH = 1024
+
+_atlas_lock = threading.RLock()
+_atlas_tiles = None   # {key: PIL.Image}
+_atlas_dirty = False
+render_count = 0
+
+
+@lru_cache(maxsize=None)
+def _load_font(font, font_size):
+    return ImageFont.truetype(font, size=font_size)
+
+
+def _tile_key(text, size, font):
+    return f"{font}|{size}|{text}"
+
+
+def _load_atlas():
+    global _atlas_tiles
+    if _atlas_tiles is not None:
+        return _atlas_tiles
+    _atlas_tiles = {}
+    try:
+        with open(ATLAS_INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        atlas = Image.open(ATLAS_FILE)
+        atlas.load()
+        for key, (x, y, w, h) in index.items():
+            _atlas_tiles[key] = atlas.crop((x, y, x + w, y + h))
+    except Exception:
+        pass
+    return _atlas_tiles
+
+
+def save_atlas():
+    """Write all rendered tiles into the atlas PNG and its JSON index."""
+    global _atlas_dirty
+    with _atlas_lock:
+        if not _atlas_dirty or not _atlas_tiles:
+            return
+        # Simple shelf packing: left to right, new row when the width is full
+        index = {}
+        x = y = row_h = 0
+        for key, tile in _atlas_tiles.items():
+            w, h = tile.size
+            if x + w > ATLAS_WIDTH:
+                x, y, row_h = 0, y + row_h, 0
+            index[key] = [x, y, w, h]
+            x += w
+            row_h = max(row_h, h)
+        atlas = Image.new("RGBA", (ATLAS_WIDTH, max(1, y + row_h)), (0, 0, 0, 0))
+        for key, (tx, ty, _, _) in index.items():
+            atlas.paste(_atlas_tiles[key], (tx, ty))
+        try:
+            atlas.save(ATLAS_FILE)
+            with open(ATLAS_INDEX_FILE, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            _atlas_dirty = False
+        except Exception as e:
+            print(f"Failed to save emoji atlas: {e}")
+
+
+atexit.register(save_atlas)
+
+
+def render_emoji(emoji, size=32, font=EMOJI_FONT):
+    """Return the emoji as a PIL image, from the atlas if it was rendered before."""
+    global _atlas_dirty, render_count
+    key = _tile_key(emoji, size, font)
+    with _atlas_lock:
+        tile = _load_atlas().get(key)
+        if tile is not None:
+            return tile
+        img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+        draw.text((size/2, size/2), emoji, embedded_color=True, font=_load_font(font, int(size/1.5)), anchor="mm")
+        render_count += 1
+        _atlas_tiles[key] = img
+        _atlas_dirty = True
+        return img
+
+
+@lru_cache(maxsize=256)
+def _emoji_image(emoji, size, font):
+    return CTkImage(render_emoji(emoji, size, font), size=(size, size))
+
+
+def emoji_(emoji, size=32, font=EMOJI_FONT):
+    # Convert emoji to CTkImage (shared between widgets, see _emoji_image)
+    return _emoji_image(emoji, size, font)
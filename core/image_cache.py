@@ -0,0 +1,96 @@
+import os
+import threading
+from collections import OrderedDict
+from customtkinter import CTkImage
+from PIL import Image
+
+# Process-wide cache of decoded, resized images and the CTkImage wrapping
+# them. Keyed by (path, mtime, size), so an edited file is reloaded and the
+# same icon at the same size is decoded once no matter how many widgets
+# show it.
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ImageCache:
+    """LRU of decoded images, bounded by the RGBA bytes it holds."""
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> {"image", "ctk", "bytes"}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(path, size):
+        path = os.path.abspath(path)
+        return (path, os.path.getmtime(path), tuple(size) if size else None)
+
+    def _load(self, key):
+        path, _, size = key
+        with Image.open(path) as img:
+            img = img.convert("RGBA")
+            if size and img.size != size:
+                img = img.resize(size, Image.LANCZOS)
+        return {"image": img, "ctk": None, "bytes": img.width * img.height * 4}
+
+    def _entry(self, path, size):
+        try:
+            key = self.key(path, size)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+            self.misses += 1
+            try:
+                entry = self._load(key)
+            except Exception as e:
+                print(f"Failed to load image {path}: {e}")
+                return None
+            self._entries[key] = entry
+            self.total_bytes += entry["bytes"]
+            self._evict()
+            return entry
+
+    def _evict(self):
+        # Always keep the newest entry, even if it alone is over the limit
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.total_bytes -= entry["bytes"]
+            self.evictions += 1
+
+    def image(self, path, size=None):
+        """Decoded (and resized) PIL image, or None if the file can't be read."""
+        entry = self._entry(path, size)
+        return entry["image"] if entry else None
+
+    def ctk_image(self, path, size):
+        """Shared CTkImage for path at size, or None if the file can't be read."""
+        entry = self._entry(path, size)
+        if entry is None:
+            return None
+        if entry["ctk"] is None:
+            entry["ctk"] = CTkImage(entry["image"], size=size)
+        return entry["ctk"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.total_bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+image_cache = ImageCache()
+
+
+def ctk_image(path, size):
+    return image_cache.ctk_image(path, size)
@@ -0,0 +1,226 @@
+import os
+import sys
+import ast
+import json
+import hashlib
+import threading
+import importlib.util
+import importlib.metadata
+
+from core.SettingsManager import get_app_data_dir, atomic_write
+
+# Which top-level imports of the toolkit's modules are missing, without
+# importing anything: sources are parsed once per content hash (cached on
+# disk), installed-ness comes from importlib.util.find_spec, and import
+# names are mapped to PyPI projects from the installed dist-info metadata.
+
+CACHE_FILE = os.path.join(get_app_data_dir(), 'import_scan.json')
+CACHE_VERSION = 1
+
+if hasattr(sys, "stdlib_module_names"):
+    STDLIB = frozenset(sys.stdlib_module_names) | frozenset(sys.builtin_module_names)
+else:
+    # Python < 3.10: list the stdlib directory instead
+    import sysconfig
+    _stdlib_dir = sysconfig.get_paths()["stdlib"]
+    STDLIB = frozenset(sys.builtin_module_names) | frozenset(
+        os.path.splitext(n)[0] for n in os.listdir(_stdlib_dir) if n.isidentifier() or n.endswith(".py"))
+
+# Import names whose project can't be found from metadata because nothing
+# providing them is installed yet
+FALLBACK_DISTRIBUTIONS = {
+    "cv2": "opencv-python",
+    "PIL": "Pillow",
+    "Crypto": "pycryptodome",
+    "yaml": "PyYAML",
+    "skimage": "scikit-image",
+    "sklearn": "scikit-learn",
+    "bs4": "beautifulsoup4",
+    "dateutil": "python-dateutil",
+    "win32api": "pywin32",
+    "win32con": "pywin32",
+    "yt_dlp": "yt-dlp",
+}
+
+_STATEMENT_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+def scan_source(source, filename="<module>"):
+    """Top-level names of every absolute import in the source.
+
+    Only statement bodies are visited (imports are statements), so the
+    expressions that make up most of a module are never walked.
+    """
+    names = set()
+    stack = list(ast.parse(source, filename=filename).body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names.add(alias.name.split(".")[0])
+        elif isinstance(node, ast.ImportFrom):
+            if node.module and not node.level:
+                names.add(node.module.split(".")[0])
+        else:
+            for field in _STATEMENT_FIELDS:
+                stack.extend(getattr(node, field, None) or ())
+    return names
+
+
+def is_installed(name):
+    """True if the top-level module can be found; nothing is executed."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+_distributions = None
+_dist_lock = threading.Lock()
+
+
+def distributions(refresh=False):
+    """{import name: [project names]} from installed metadata (top_level.txt / RECORD)."""
+    global _distributions
+    with _dist_lock:
+        if _distributions is None or refresh:
+            try:
+                _distributions = importlib.metadata.packages_distributions()
+            except Exception:
+                _distributions = {}
+        return _distributions
+
+
+def distribution_for(name, fallback=None):
+    """PyPI project that provides import name, best guess when nothing provides it yet."""
+    projects = distributions().get(name)
+    if projects:
+        return projects[0]
+    return (fallback or FALLBACK_DISTRIBUTIONS).get(name, name)
+
+
+class ImportScanner:
+    """Import sets of source files, cached by path and content hash.
+
+    parse_count counts files actually parsed; an unchanged file costs one
+    stat (or one hash when only its mtime moved).
+    """
+    def __init__(self, cache_path=CACHE_FILE):
+        self.cache_path = cache_path
+        self.entries = {}
+        self.parse_count = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("entries", {})
+        except Exception:
+            pass
+
+    def save(self):
+        try:
+            atomic_write(self.cache_path, json.dumps({"version": CACHE_VERSION, "entries": self.entries}))
+        except Exception as e:
+            print(f"Failed to save import scan cache: {e}")
+
+    def _scan_file(self, path):
+        # Returns (names, changed)
+        key = os.path.abspath(path)
+        mtime = os.path.getmtime(path)
+        entry = self.entries.get(key)
+        if entry and entry.get("mtime") == mtime:
+            return set(entry["imports"]), False
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry.get("sha256") == digest:
+            entry["mtime"] = mtime
+            return set(entry["imports"]), True
+        self.parse_count += 1
+        names = scan_source(data.decode("utf-8", errors="replace"), path)
+        self.entries[key] = {"mtime": mtime, "sha256": digest, "imports": sorted(names)}
+        return names, True
+
+    def imports(self, paths):
+        """Union of the top-level imports of the given files (unparsable files are skipped)."""
+        names = set()
+        dirty = False
+        with self._lock:
+            for path in paths:
+                try:
+                    found, changed = self._scan_file(path)
+                except (OSError, SyntaxError, ValueError):
+                    continue
+                names |= found
+                dirty = dirty or changed
+            if dirty:
+                self.save()
+        return names
+
+    def third_party(self, paths, local=()):
+        """Imports that are neither stdlib nor one of the local packages."""
+        return {n for n in self.imports(paths) if n not in STDLIB and n not in local}
+
+    def missing(self, paths, local=()):
+        """{import name: project to install} for third-party imports that can't be found."""
+        importlib.invalidate_caches()
+        return {n: distribution_for(n) for n in sorted(self.third_party(paths, local)) if not is_installed(n)}
+
+
+_scanner = None
+
+
+def get_scanner():
+    global _scanner
+    if _scanner is None:
+        _scanner = ImportScanner()
+    return _scanner
+
+
+def _benchmark(modules_dir="modules"):
+    import glob
+    import time
+    import tempfile
+    import importlib as _importlib
+    paths = glob.glob(os.path.join(modules_dir, "*.py"))
+
+    start = time.perf_counter()
+    old = set()
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for node in ast.walk(ast.parse(f.read(), filename=path)):
+                if isinstance(node, ast.Import):
+                    old.update(n.name.split(".")[0] for n in node.names)
+                elif isinstance(node, ast.ImportFrom) and node.module:
+                    old.add(node.module.split(".")[0])
+    walk_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for name in old:
+        try:
+            _importlib.import_module(name)
+        except Exception:
+            pass
+    import_ms = (time.perf_counter() - start) * 1000
+
+    cache_path = os.path.join(tempfile.mkdtemp(), "import_scan.json")
+    start = time.perf_counter()
+    ImportScanner(cache_path).imports(paths)
+    cold_ms = (time.perf_counter() - start) * 1000
+    scanner = ImportScanner(cache_path)
+    start = time.perf_counter()
+    new = scanner.third_party(paths, local={"core", "modules"})
+    warm_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    missing = {n: distribution_for(n) for n in new if not is_installed(n)}
+    spec_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(paths)} files: ast.walk {walk_ms:.1f} ms, import_module {import_ms:.1f} ms")
+    print(f"scanner: cold {cold_ms:.1f} ms, warm {warm_ms:.2f} ms (parsed {scanner.parse_count}), find_spec {spec_ms:.1f} ms")
+    print(f"missing: {missing}")
+
+
+if __name__ == "__main__":
+    _benchmark(*sys.argv[1:])
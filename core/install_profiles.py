@@ -0,0 +1,93 @@
+import os
+import json
+import datetime
+
+from core.SettingsManager import get_app_data_dir
+from core.program_catalog import load_catalog
+
+# Named sets of catalog programs installed in one go. A profile becomes a
+# `winget import` manifest of the programs that aren't installed yet, run
+# as a single job. User profiles live in settings["install_profiles"] and
+# are merged over the defaults by name.
+
+SETTINGS_KEY = "install_profiles"
+MANIFEST_DIR = os.path.join(get_app_data_dir(), "profiles")
+WINGET_SCHEMA = "https://aka.ms/winget-packages.schema.2.0.json"
+WINGET_SOURCE = {
+    "Argument": "https://cdn.winget.microsoft.com/cache",
+    "Identifier": "Microsoft.Winget.Source_8wekyb3d8bbwe",
+    "Name": "winget",
+    "Type": "Microsoft.PreIndexed.Package",
+}
+
+DEFAULT_PROFILES = {
+    "Essentials": ["7-Zip", "Everything", "VLC", "Google Chrome", "Discord", "WizTree"],
+    "Developer": ["Visual Studio Code", "Python", "Eclipse Temurin JDK 21", "IntelliJ IDEA", "WinSCP", "7-Zip"],
+    "Media": ["FFmpeg", "VLC", "K-Lite Codec Pack Mega"],
+    "Minecraft": ["Prism Launcher", "Eclipse Temurin JDK 8", "Eclipse Temurin JDK 17", "Eclipse Temurin JDK 21"],
+}
+
+
+def load_profiles(settings=None):
+    """Return {profile name: [program names]}, user profiles over the defaults."""
+    profiles = {name: list(programs) for name, programs in DEFAULT_PROFILES.items()}
+    if settings is not None:
+        profiles.update(settings.get(SETTINGS_KEY, {}) or {})
+    return profiles
+
+
+def save_profile(settings, name, programs):
+    user_profiles = dict(settings.get(SETTINGS_KEY, {}) or {})
+    user_profiles[name] = list(programs)
+    settings.set(SETTINGS_KEY, user_profiles)
+
+
+def plan_profile(programs, detected=None, catalog=None):
+    """Split a profile into what winget can install in bulk and what it can't.
+
+    Returns {"install": [entries], "skipped": [names already installed],
+    "manual": [entries needing a browser or the Python dialog]}.
+    """
+    catalog = catalog or load_catalog()
+    detected = detected or {}
+    plan = {"install": [], "skipped": [], "manual": []}
+    seen = set()
+    for name in programs:
+        entry = catalog.get(name)
+        if entry is None or name in seen:
+            continue
+        seen.add(name)
+        if detected.get(name):
+            plan["skipped"].append(name)
+        elif entry.get("winget") and not entry.get("source") and not entry.get("python_multi"):
+            plan["install"].append(entry)
+        else:
+            plan["manual"].append(entry)
+    return plan
+
+
+def build_import_manifest(entries):
+    """winget import (packages schema 2.0) manifest for the given catalog entries."""
+    return {
+        "$schema": WINGET_SCHEMA,
+        "CreationDate": datetime.datetime.now().astimezone().isoformat(),
+        "Sources": [{
+            "Packages": [{"PackageIdentifier": entry["winget"]} for entry in entries],
+            "SourceDetails": WINGET_SOURCE,
+        }],
+        "WinGetVersion": "1.6.0",
+    }
+
+
+def write_import_manifest(profile_name, entries, directory=MANIFEST_DIR):
+    os.makedirs(directory, exist_ok=True)
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in profile_name)
+    path = os.path.join(directory, f"{safe_name}.winget.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(build_import_manifest(entries), f, indent=2)
+    return path
+
+
+def import_args(manifest_path):
+    return ["import", "-i", manifest_path, "--accept-package-agreements", "--accept-source-agreements",
+            "--ignore-unavailable", "--no-upgrade"]
@@ -0,0 +1,183 @@
+import os
+import ast
+import json
+import hashlib
+
+from core.SettingsManager import get_app_data_dir, atomic_write
+
+# Reads module metadata (module_name, module_emoji, ...) straight from the
+# source with ast, so labels can be shown without importing cv2, yt_dlp, etc.
+
+MANIFEST_CACHE_FILE = os.path.join(get_app_data_dir(), 'module_manifest.json')
+MANIFEST_VERSION = 1
+
+METADATA_FIELDS = {
+    "module_name": "name",
+    "module_emoji": "emoji",
+    "module_description": "desc",
+    "module_version": "version",
+    "module_icon": "icon",
+    "mod_settings": "mod_settings",
+    "home_widgets": "home_widgets",
+}
+
+_cache = None
+
+
+def _literal(node, env):
+    # Like ast.literal_eval, but also resolves names assigned earlier in the module
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id in env:
+            return env[node.id]
+        raise ValueError(node.id)
+    if isinstance(node, ast.Dict):
+        return {_literal(k, env): _literal(v, env) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        items = [_literal(e, env) for e in node.elts]
+        return tuple(items) if isinstance(node, ast.Tuple) else items
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_literal(node.operand, env)
+    return ast.literal_eval(node)
+
+
+def _is_frame_base(base):
+    if isinstance(base, ast.Attribute):
+        return base.attr == "CTkFrame"
+    if isinstance(base, ast.Name):
+        return base.id == "CTkFrame"
+    return False
+
+
+def parse_manifest(source, mod_id):
+    """Extract module metadata from Python source without executing it."""
+    tree = ast.parse(source)
+    env = {}
+    frame_classes = []
+    module_ui = None
+    has_home_widget = False
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and any(_is_frame_base(b) for b in node.bases):
+            frame_classes.append(node.name)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "home_widget":
+            has_home_widget = True
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                if target.id == "ModuleUI" and isinstance(node.value, ast.Name):
+                    module_ui = node.value.id
+                try:
+                    env[target.id] = _literal(node.value, env)
+                except Exception:
+                    env.pop(target.id, None)
+    # Same pick as the old dir() scan: ModuleUI if set, else first frame class by name
+    ui_class = module_ui if module_ui in frame_classes else (sorted(frame_classes)[0] if frame_classes else None)
+    manifest = {
+        "id": mod_id,
+        "name": mod_id,
+        "emoji": "🧩",
+        "desc": "",
+        "version": "?",
+        "icon": None,
+        "mod_settings": None,
+        "home_widgets": None,
+        "ui_class": ui_class,
+        "has_home_widget": has_home_widget,
+    }
+    for attr, key in METADATA_FIELDS.items():
+        if attr in env:
+            manifest[key] = env[attr]
+    return manifest
+
+
+def sidecar_path(mod_path):
+    # Compiled modules (e.g. mcfs_module.cp313-win_amd64.pyd) ship mcfs_module.manifest.json
+    stem = os.path.basename(mod_path).split(".")[0]
+    return os.path.join(os.path.dirname(mod_path), f"{stem}.manifest.json")
+
+
+def write_sidecar(source_path, target_dir=None):
+    """Write the manifest of a .py module next to its compiled counterpart."""
+    with open(source_path, "r", encoding="utf-8") as f:
+        source = f.read()
+    mod_id = os.path.splitext(os.path.basename(source_path))[0]
+    manifest = parse_manifest(source, mod_id)
+    path = sidecar_path(os.path.join(target_dir or os.path.dirname(source_path), os.path.basename(source_path)))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    return path
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        _cache = {}
+        try:
+            with open(MANIFEST_CACHE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                _cache = data.get("entries", {})
+        except Exception:
+            pass
+    return _cache
+
+
+def _save_cache():
+    try:
+        atomic_write(MANIFEST_CACHE_FILE, json.dumps({"version": MANIFEST_VERSION, "entries": _load_cache()}, ensure_ascii=False))
+    except Exception as e:
+        print(f"Failed to save module manifest cache: {e}")
+
+
+def _read_source_manifest(mod_path, mod_id, cache):
+    key = os.path.abspath(mod_path)
+    mtime = os.path.getmtime(mod_path)
+    entry = cache.get(key)
+    if entry and entry.get("mtime") == mtime:
+        return entry["manifest"], False
+    with open(mod_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if entry and entry.get("sha256") == digest:
+        # Touched but unchanged: refresh the mtime only
+        entry["mtime"] = mtime
+        return entry["manifest"], True
+    manifest = parse_manifest(data.decode("utf-8", errors="replace"), mod_id)
+    cache[key] = {"mtime": mtime, "sha256": digest, "manifest": manifest}
+    return manifest, True
+
+
+def read_manifest(mod_path):
+    """Return the manifest for one module file, or None if it can't be read statically."""
+    return read_manifests([mod_path]).get(mod_path)
+
+
+def read_manifests(mod_paths):
+    """Return {path: manifest} for the given module files, using the on-disk cache."""
+    cache = _load_cache()
+    result = {}
+    dirty = False
+    for mod_path in mod_paths:
+        mod_id = os.path.splitext(os.path.basename(mod_path))[0]
+        try:
+            if mod_path.endswith(".py"):
+                manifest, changed = _read_source_manifest(mod_path, mod_id, cache)
+                dirty = dirty or changed
+            else:
+                sidecar = sidecar_path(mod_path)
+                if not os.path.exists(sidecar):
+                    result[mod_path] = None
+                    continue
+                with open(sidecar, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                manifest["id"] = mod_id
+        except Exception as e:
+            print(f"Failed to read manifest for {mod_id}: {e}")
+            result[mod_path] = None
+            continue
+        result[mod_path] = manifest
+    if dirty:
+        _save_cache()
+    return result
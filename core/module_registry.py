@@ -0,0 +1,186 @@
+import os
+import sys
+import glob
+import time
+import threading
+import importlib
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+import customtkinter as ctk
+
+from core.module_manifest import read_manifests
+
+# One place that discovers modules, imports each at most once and hands the
+# same module object, metadata and UI class to every part of the UI.
+
+DEV_MODULES = ["dll_converter", "nuitka"]
+
+
+class ModuleEntry:
+    def __init__(self, mod_id, path, manifest, source="modules"):
+        self.id = mod_id
+        self.path = path
+        self.manifest = manifest
+        self.source = source
+        self.module = None
+        self.ui_class = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.manifest["name"]
+
+    @property
+    def mod_settings(self):
+        return self.manifest.get("mod_settings")
+
+    @property
+    def has_ui(self):
+        return bool(self.manifest.get("ui_class"))
+
+    @property
+    def loaded(self):
+        return self.module is not None
+
+
+def find_ui_class(mod, class_name=None):
+    obj = getattr(mod, class_name, None) if class_name else None
+    if isinstance(obj, type) and issubclass(obj, ctk.CTkFrame):
+        return obj
+    for attr in dir(mod):
+        obj = getattr(mod, attr)
+        if isinstance(obj, type) and issubclass(obj, ctk.CTkFrame) and obj is not ctk.CTkFrame:
+            return obj
+    return None
+
+
+def manifest_from_module(mod, mod_id):
+    ui_class = find_ui_class(mod)
+    return {
+        "id": mod_id,
+        "name": getattr(mod, "module_name", mod_id),
+        "emoji": getattr(mod, "module_emoji", "🧩"),
+        "desc": getattr(mod, "module_description", ""),
+        "version": getattr(mod, "module_version", "?"),
+        "icon": getattr(mod, "module_icon", None),
+        "mod_settings": getattr(mod, "mod_settings", None),
+        "home_widgets": getattr(mod, "home_widgets", None),
+        "ui_class": ui_class.__name__ if ui_class else None,
+        "has_home_widget": callable(getattr(mod, "home_widget", None)),
+    }
+
+
+class ModuleRegistry:
+    def __init__(self, modules_dir="modules", core_dir="core", dev_mode=False):
+        self.modules_dir = modules_dir
+        self.core_dir = core_dir
+        self.dev_mode = dev_mode
+        self.entries = {}
+        # Number of module executions, per module id and in total (read by tests)
+        self.import_counts = {}
+        self.import_count = 0
+        # Seconds spent executing each module, filled in as imports finish
+        self.import_times = {}
+        self._count_lock = threading.Lock()
+        self._executor = None
+        self.discover()
+
+    def discover(self):
+        module_files = glob.glob(os.path.join(self.modules_dir, "*.py"))
+        pyd_files = glob.glob(os.path.join(self.modules_dir, "*.pyd"))
+        paths = []
+        for mod_path in module_files + pyd_files:
+            mod_id = self.module_id(mod_path)
+            if mod_id.startswith("__"):
+                continue
+            # For .pyd, skip if .py with same name exists
+            if mod_path.endswith('.pyd') and os.path.exists(os.path.join(self.modules_dir, f"{mod_id}.py")):
+                continue
+            paths.append((mod_path, "modules"))
+        if self.dev_mode:
+            for dev_mod in DEV_MODULES:
+                dev_path = os.path.join(self.core_dir, f"{dev_mod}.py")
+                if os.path.exists(dev_path):
+                    paths.append((dev_path, "core"))
+        manifests = read_manifests([p for p, _ in paths])
+        for mod_path, source in paths:
+            mod_id = self.module_id(mod_path)
+            if mod_id in self.entries:
+                continue
+            manifest = manifests.get(mod_path)
+            entry = ModuleEntry(mod_id, mod_path, manifest, source)
+            if manifest is None:
+                # Compiled module without a manifest sidecar: import it to read metadata
+                if self.load(entry) is None:
+                    continue
+                entry.manifest = manifest_from_module(entry.module, mod_id)
+            self.entries[mod_id] = entry
+        return self.entries
+
+    @staticmethod
+    def module_id(mod_path):
+        # mcfs_module.py and mcfs_module.cp313-win_amd64.pyd are both "mcfs_module"
+        return os.path.basename(mod_path).split(".")[0]
+
+    def get(self, mod_id):
+        return self.entries.get(mod_id)
+
+    def modules(self, source=None):
+        return [e for e in self.entries.values() if source is None or e.source == source]
+
+    def load(self, entry):
+        """Import a module once and return it (None on failure)."""
+        if isinstance(entry, str):
+            entry = self.entries.get(entry)
+            if entry is None:
+                return None
+        with entry.lock:
+            if entry.module is not None or entry.error is not None:
+                return entry.module
+            start = time.perf_counter()
+            try:
+                mod = self._exec(entry)
+            except Exception as e:
+                entry.error = e
+                print(f"Failed to load module {entry.id}: {e}")
+                return None
+            finally:
+                self.import_times[entry.id] = time.perf_counter() - start
+            with self._count_lock:
+                self.import_counts[entry.id] = self.import_counts.get(entry.id, 0) + 1
+                self.import_count += 1
+            entry.module = mod
+            class_name = entry.manifest.get("ui_class") if entry.manifest else None
+            entry.ui_class = find_ui_class(mod, class_name)
+            return mod
+
+    def prefetch(self, mod_ids=None, max_workers=4):
+        """Import modules on a thread pool. Returns {mod_id: Future}."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="module-import")
+        ids = mod_ids if mod_ids is not None else list(self.entries)
+        return {mod_id: self._executor.submit(self.load, mod_id) for mod_id in ids if mod_id in self.entries}
+
+    def import_report(self):
+        """One line per imported module, slowest first."""
+        lines = []
+        for mod_id, seconds in sorted(self.import_times.items(), key=lambda kv: kv[1], reverse=True):
+            entry = self.entries.get(mod_id)
+            status = "failed" if entry is not None and entry.error is not None else "ok"
+            lines.append(f"{mod_id:<20} {seconds * 1000:8.1f} ms  {status}")
+        return lines
+
+    def _exec(self, entry):
+        # Load .py modules from source
+        if entry.path.endswith('.py'):
+            spec = importlib.util.spec_from_file_location(entry.id, entry.path)
+            mod = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(mod)
+            return mod
+        # Load .pyd modules using importlib
+        modules_dir = os.path.abspath(os.path.dirname(entry.path))
+        if modules_dir not in sys.path:
+            sys.path.insert(0, modules_dir)
+        return importlib.import_module(entry.id)
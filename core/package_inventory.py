@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import threading
+
+from core.SettingsManager import get_app_data_dir, atomic_write
+from core.python_registry import get_registry
+
+# Installed packages of an interpreter, read straight from the
+# *.dist-info/METADATA (and *.egg-info/PKG-INFO) files in its site-packages
+# instead of running `pip list`. A site-packages directory whose mtime hasn't
+# changed is served from the cache; when it has, only the dist-info
+# directories that are new or were rewritten are read again.
+
+CACHE_FILE = os.path.join(get_app_data_dir(), 'package_inventory.json')
+CACHE_VERSION = 1
+
+METADATA_FILES = {".dist-info": "METADATA", ".egg-info": "PKG-INFO"}
+HEADER_FIELDS = {"name": "name", "version": "version", "summary": "summary", "requires-python": "requires_python"}
+
+
+def normalize_name(name):
+    # PEP 503: "Pillow", "pillow" and "PIL_low" style spellings compare equal
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _meta_kind(entry):
+    for suffix in METADATA_FILES:
+        if entry.endswith(suffix):
+            return suffix
+    return None
+
+
+def read_metadata(dist_path):
+    """Return the package record for one dist-info/egg-info directory, or None."""
+    suffix = _meta_kind(dist_path)
+    if suffix is None:
+        return None
+    meta_path = os.path.join(dist_path, METADATA_FILES[suffix])
+    if not os.path.isfile(meta_path) and suffix == ".egg-info" and os.path.isfile(dist_path):
+        meta_path = dist_path  # old-style single-file egg-info
+    record = {"name": None, "version": None, "summary": "", "requires_python": None,
+              "installer": None, "path": dist_path}
+    try:
+        with open(meta_path, "r", encoding="utf-8", errors="replace") as f:
+            # Headers only: stop at the blank line before the long description
+            for line in f:
+                if not line.strip():
+                    break
+                key, sep, value = line.partition(":")
+                field = HEADER_FIELDS.get(key.strip().lower())
+                if sep and field and record[field] in (None, ""):
+                    record[field] = value.strip()
+    except OSError:
+        return None
+    if not record["name"]:
+        return None
+    try:
+        with open(os.path.join(dist_path, "INSTALLER"), "r", encoding="utf-8") as f:
+            record["installer"] = f.read().strip() or None
+    except OSError:
+        pass
+    return record
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class PackageInventory:
+    """Cached package listing per site-packages directory.
+
+    read_count counts METADATA files parsed, so tests and the benchmark can
+    check that a refresh after one install reads one or two entries only.
+    """
+    def __init__(self, cache_path=CACHE_FILE):
+        self.cache_path = cache_path
+        self.sites = {}  # site dir -> {"mtime", "entries": {dist dir name: {"mtime", "record"}}}
+        self.read_count = 0
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.sites = data.get("sites", {})
+        except Exception:
+            pass
+
+    def save(self):
+        try:
+            atomic_write(self.cache_path, json.dumps({"version": CACHE_VERSION, "sites": self.sites}))
+        except Exception as e:
+            print(f"Failed to save package inventory: {e}")
+
+    def _scan_site(self, site_dir):
+        # Returns (records, changed)
+        mtime = _mtime(site_dir)
+        cached = self.sites.get(site_dir)
+        if mtime is None:
+            return [], self.sites.pop(site_dir, None) is not None
+        if cached and cached.get("mtime") == mtime:
+            return [e["record"] for e in cached["entries"].values() if e["record"]], False
+        old_entries = cached["entries"] if cached else {}
+        entries = {}
+        try:
+            names = os.listdir(site_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if _meta_kind(name) is None:
+                continue
+            dist_path = os.path.join(site_dir, name)
+            dist_mtime = _mtime(dist_path)
+            old = old_entries.get(name)
+            if old and old.get("mtime") == dist_mtime:
+                entries[name] = old
+                continue
+            self.read_count += 1
+            entries[name] = {"mtime": dist_mtime, "record": read_metadata(dist_path)}
+        self.sites[site_dir] = {"mtime": mtime, "entries": entries}
+        return [e["record"] for e in entries.values() if e["record"]], True
+
+    def site_dirs(self, python_path):
+        info = get_registry().info(python_path) or {}
+        dirs = list(info.get("site_packages") or [])
+        if info.get("user_site") and not info.get("venv"):
+            dirs.append(info["user_site"])
+        return dirs
+
+    def packages(self, python_path=None, site_dirs=None):
+        """Return [{"name", "version", "summary", ...}] sorted by name.
+
+        The first site-packages directory wins when a project is installed
+        in several, matching sys.path order.
+        """
+        dirs = site_dirs if site_dirs is not None else self.site_dirs(python_path)
+        with self._lock:
+            seen = {}
+            dirty = False
+            for site_dir in dirs:
+                records, changed = self._scan_site(site_dir)
+                dirty = dirty or changed
+                for record in records:
+                    seen.setdefault(normalize_name(record["name"]), record)
+            if dirty:
+                self.save()
+        return sorted(seen.values(), key=lambda r: normalize_name(r["name"]))
+
+    def installed_names(self, python_path=None, site_dirs=None):
+        """Normalized names of everything installed, for "is X missing?" checks."""
+        return {normalize_name(r["name"]) for r in self.packages(python_path, site_dirs)}
+
+
+_inventory = None
+
+
+def get_inventory():
+    global _inventory
+    if _inventory is None:
+        _inventory = PackageInventory()
+    return _inventory
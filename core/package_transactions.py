@@ -0,0 +1,163 @@
+import re
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from core.python_registry import get_registry
+from core.wheel_cache import get_cache, pinned_version
+
+# Install / uninstall several packages in one resolver run per interpreter,
+# optionally on several interpreters at once. Installs go through the local
+# wheel cache (core.wheel_cache) first. Output is streamed to a callback as
+# it arrives, with per-package results picked out of it.
+
+# uv: " + requests==2.32.3" / " - requests==2.31.0"
+UV_CHANGE_RE = re.compile(r'^\s*([+-])\s+([A-Za-z0-9._\-\[\]]+)(?:==(\S+))?')
+# pip: "Successfully installed a-1.0 b-2.0" / "Successfully uninstalled a-1.0"
+PIP_DONE_RE = re.compile(r'^Successfully (installed|uninstalled) (.+)$')
+PIP_COLLECT_RE = re.compile(r'^Collecting (\S+)')
+
+
+def split_packages(text):
+    """"requests, pillow  yt-dlp" -> ["requests", "pillow", "yt-dlp"]"""
+    return [p for p in re.split(r'[\s,;]+', text or "") if p]
+
+
+class PackageTransaction:
+    """A set of packages to install and/or uninstall together.
+
+    run() gives each interpreter one install call and one uninstall call
+    (uv when available, pip otherwise), never one call per package.
+    on_event(python_path, kind, value) is called from worker threads with:
+        "line"    raw output line
+        "package" (action, name, version) parsed from the output
+        "done"    return code (0 when every step succeeded)
+    """
+    def __init__(self, install=(), uninstall=(), upgrade=False, cache=None):
+        self.install = list(install)
+        self.uninstall = list(uninstall)
+        self.upgrade = upgrade
+        # Local wheel cache read before the index (cache=False to skip it)
+        self.cache = get_cache() if cache is None else cache
+
+    def _uv(self, python_path, info):
+        if info.get("uv"):
+            return [python_path, "-m", "uv", "pip"]
+        if shutil.which("uv"):
+            return ["uv", "pip"]
+        return None
+
+    def commands(self, python_path, cache_args=()):
+        info = get_registry().info(python_path) or {}
+        uv = self._uv(python_path, info)
+        commands = []
+        if self.uninstall:
+            if uv:
+                commands.append(uv + ["uninstall", "--python", python_path] + self.uninstall)
+            else:
+                commands.append([python_path, "-m", "pip", "uninstall", "-y"] + self.uninstall)
+        if self.install:
+            upgrade = ["--upgrade"] if self.upgrade else []
+            if uv:
+                commands.append(uv + ["install", "--python", python_path] + upgrade + list(cache_args) + self.install)
+            else:
+                commands.append([python_path, "-m", "pip", "install"] + upgrade + list(cache_args) + self.install)
+        return commands
+
+    def _stream(self, python_path, cmd, on_event):
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                    encoding="utf-8", errors="replace", bufsize=1)
+            for line in proc.stdout:
+                line = line.rstrip()
+                if not line:
+                    continue
+                on_event(python_path, "line", line)
+                for change in parse_changes(line):
+                    on_event(python_path, "package", change)
+            return proc.wait()
+        except Exception as e:
+            on_event(python_path, "line", f"Exception: {e}")
+            return -1
+
+    def _fill_cache(self, python_path, on_event):
+        # Pinned specs only: their download replaces the index resolve, and the install
+        # then runs offline. pip download pulls dependencies too; needs pip in the target.
+        if not all(pinned_version(r) for r in self.install) or self.cache.has(self.install, python_path):
+            return
+        info = get_registry().info(python_path) or {}
+        if info.get("pip"):
+            self.cache.fill(python_path, self.install, on_line=lambda line: on_event(python_path, "line", line))
+
+    def _install(self, python_path, on_event):
+        def offline_cmd():
+            return self.commands(python_path, self.cache.find_links_args(offline=True))[-1]
+
+        if self.cache and not self.upgrade:
+            self._fill_cache(python_path, on_event)
+            # Pinned specs with a wheel for this interpreter's tags install from disk alone
+            if self.cache.can_install_offline(self.install, python_path):
+                code = self._stream(python_path, offline_cmd(), on_event)
+                if code == 0:
+                    return code
+                on_event(python_path, "line", "Install from the local wheel cache failed; trying the package index")
+        cache_args = self.cache.find_links_args() if self.cache else []
+        code = self._stream(python_path, self.commands(python_path, cache_args)[-1], on_event)
+        if code != 0 and self.cache and self.cache.has(self.install, python_path):
+            # No index (offline machine): whatever compatible wheels are cached still beat failing
+            on_event(python_path, "line", "Package index install failed; installing from the local wheel cache")
+            code = self._stream(python_path, offline_cmd(), on_event)
+        return code
+
+    def run_one(self, python_path, on_event=None):
+        on_event = on_event or (lambda *args: None)
+        returncode = 0
+        if self.uninstall:
+            returncode = self._stream(python_path, self.commands(python_path)[0], on_event)
+        if self.install:
+            code = self._install(python_path, on_event)
+            returncode = returncode or code
+        if any(p.split("[")[0].lower() in ("uv", "pip") for p in self.install + self.uninstall):
+            get_registry().invalidate(python_path)
+        on_event(python_path, "done", returncode)
+        return returncode
+
+    def run(self, python_paths, on_event=None, max_workers=4):
+        """Apply to every interpreter in parallel; returns {python_path: returncode}."""
+        python_paths = list(dict.fromkeys(python_paths))
+        if not python_paths:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(python_paths))) as pool:
+            futures = {path: pool.submit(self.run_one, path, on_event) for path in python_paths}
+        return {path: future.result() for path, future in futures.items()}
+
+    def start(self, python_paths, on_event=None, on_finished=None):
+        """run() on a background thread; on_finished(results) is called from it."""
+        def worker():
+            results = self.run(python_paths, on_event)
+            if on_finished:
+                on_finished(results)
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+
+def parse_changes(line):
+    """[(action, name, version)] reported by one uv/pip output line."""
+    match = UV_CHANGE_RE.match(line)
+    if match:
+        action = "installed" if match.group(1) == "+" else "removed"
+        return [(action, match.group(2), match.group(3))]
+    match = PIP_DONE_RE.match(line.strip())
+    if match:
+        action = "installed" if match.group(1) == "installed" else "removed"
+        changes = []
+        for item in match.group(2).split():
+            name, _, version = item.rpartition("-")
+            changes.append((action, name or item, version if name else None))
+        return changes
+    match = PIP_COLLECT_RE.match(line.strip())
+    if match:
+        return [("collecting", match.group(1), None)]
+    return []
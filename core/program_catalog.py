@@ -0,0 +1,83 @@
+import os
+import re
+import json
+
+from core.SettingsManager import get_app_data_dir
+
+# The one list of known programs: what the Program Manager shows and how
+# program_detection finds each of them. Entries in user_programs.json in the
+# app data folder are merged over the bundled catalog by name.
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'program_catalog.json')
+USER_CATALOG_FILE = os.path.join(get_app_data_dir(), 'user_programs.json')
+
+_catalogs = {}
+
+
+class ProgramRule:
+    """Detection rule for one catalog entry, with its regex compiled up front.
+
+    exe / folders       exe names tried on PATH and under <root>\\<folder>
+    search_path         also probe every PATH entry directly (JDKs, Python, ...)
+    path_pattern        regex a candidate path must match
+    exclude_prefixes    path prefixes to ignore (env vars allowed)
+    candidates          fixed install paths tried after the folder hints
+    registry_name       substring looked up in Uninstall display names
+    registry_candidates if set, a registry hit resolves to the first existing
+                        path here (or nothing) instead of the Uninstall subkey
+    """
+    def __init__(self, entry):
+        self.name = entry["name"]
+        self.exes = entry.get("exe", [])
+        self.folders = entry.get("folders", [])
+        self.search_path = entry.get("search_path", False)
+        pattern = entry.get("path_pattern")
+        self.path_re = re.compile(pattern) if pattern else None
+        self.exclude_prefixes = entry.get("exclude_prefixes", [])
+        self.candidates = entry.get("candidates", [])
+        self.registry_name = entry.get("registry_name") or self.name
+        self.registry_candidates = entry.get("registry_candidates")
+
+
+class ProgramCatalog:
+    def __init__(self, entries):
+        self.entries = entries
+        self.rules = {entry["name"]: ProgramRule(entry) for entry in entries}
+
+    def rule(self, name):
+        # Unknown names still get the registry / Start Menu lookup
+        rule = self.rules.get(name)
+        return rule if rule is not None else ProgramRule({"name": name})
+
+    def get(self, name):
+        return next((entry for entry in self.entries if entry["name"] == name), None)
+
+    def manager_entries(self):
+        return [entry for entry in self.entries if entry.get("manager", True)]
+
+    def folder_hints(self):
+        return sorted({folder for rule in self.rules.values() for folder in rule.folders})
+
+
+def _read_entries(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("programs", [])
+
+
+def load_catalog(path=CATALOG_FILE, user_path=USER_CATALOG_FILE):
+    key = (path, user_path)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        entries = _read_entries(path)
+        if user_path and os.path.exists(user_path):
+            try:
+                by_name = {entry["name"]: i for i, entry in enumerate(entries)}
+                for entry in _read_entries(user_path):
+                    if entry["name"] in by_name:
+                        entries[by_name[entry["name"]]] = entry
+                    else:
+                        entries.append(entry)
+            except Exception as e:
+                print(f"Failed to read user program catalog: {e}")
+        catalog = _catalogs[key] = ProgramCatalog(entries)
+    return catalog
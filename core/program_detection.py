@@ -1,224 +1,652 @@
 import os
 import glob
+import json
+import threading
 import subprocess
-import winreg
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+try:
+    import winreg
+except ImportError:  # Not on Windows; detection then needs a custom backend
+    winreg = None
 
-def get_installed_programs_via_start_menu():
-    # Search Start Menu for all .lnk shortcuts (indexed by Windows Search)
-    start_menu_dirs = [
-        os.path.expandvars(r'%APPDATA%\Microsoft\Windows\Start Menu\Programs'),
-        os.path.expandvars(r'%PROGRAMDATA%\Microsoft\Windows\Start Menu\Programs')
+from core.SettingsManager import get_app_data_dir, atomic_write
+from core.program_catalog import load_catalog, CATALOG_FILE, USER_CATALOG_FILE
+
+INDEX_FILE = os.path.join(get_app_data_dir(), 'program_index.json')
+INDEX_VERSION = 2
+_index_lock = threading.Lock()
+
+START_MENU_DIRS = [
+    r'%APPDATA%\Microsoft\Windows\Start Menu\Programs',
+    r'%PROGRAMDATA%\Microsoft\Windows\Start Menu\Programs',
+]
+
+UNINSTALL_KEYS = [
+    r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall",
+    r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
+]
+
+class DetectionBackend:
+    """Filesystem and registry access used by detection.
+
+    Everything detection touches goes through here, so tests can run it on
+    Linux against a fake tree by overriding these methods.
+    """
+    def getenv(self, key, default=None):
+        return os.environ.get(key, default)
+
+    def expandvars(self, path):
+        return os.path.expandvars(path)
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def mtime(self, path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def listdir(self, path):
+        try:
+            return os.listdir(path)
+        except OSError:
+            return []
+
+    def subdirs(self, path):
+        try:
+            return [entry.path for entry in os.scandir(path) if entry.is_dir()]
+        except OSError:
+            return []
+
+    def find_shortcuts(self, base):
+        return glob.glob(os.path.join(base, '**', '*.lnk'), recursive=True)
+
+    def uninstall_sources(self):
+        # (root, key path) pairs holding Uninstall entries
+        if winreg is None:
+            return []
+        return [(root, key_path) for root in (winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER) for key_path in UNINSTALL_KEYS]
+
+    def read_uninstall(self, source):
+        # Query one uninstall key for installed programs: {DisplayName: subkey}
+        found = {}
+        root, key_path = source
+        try:
+            with winreg.OpenKey(root, key_path) as key:
+                for i in range(0, winreg.QueryInfoKey(key)[0]):
+                    try:
+                        subkey_name = winreg.EnumKey(key, i)
+                        with winreg.OpenKey(key, subkey_name) as subkey:
+                            display_name, _ = winreg.QueryValueEx(subkey, "DisplayName")
+                            found[display_name] = subkey_name
+                    except Exception:
+                        continue
+        except Exception:
+            pass
+        return found
+
+    def uninstall_entries(self):
+        found = {}
+        for source in self.uninstall_sources():
+            found.update(self.read_uninstall(source))
+        return found
+
+    def uninstall_stamp(self):
+        # Last-write times of the Uninstall keys; they change on every (un)install
+        stamp = []
+        if winreg is None:
+            return stamp
+        for root in (winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER):
+            for key_path in UNINSTALL_KEYS:
+                try:
+                    with winreg.OpenKey(root, key_path) as key:
+                        stamp.append(winreg.QueryInfoKey(key)[2])
+                except Exception:
+                    stamp.append(None)
+        return stamp
+
+
+default_backend = DetectionBackend()
+
+
+class TimeoutBackend(DetectionBackend):
+    """Wraps a backend so every point probe runs on a bounded pool with a timeout.
+
+    A probe that hangs (slow network-redirected AppData, a dead network
+    drive on PATH) counts as "not found" after `timeout` seconds instead of
+    blocking detection. Whole listings (Uninstall keys, Start Menu
+    shortcuts) are not timed: cutting one short would report every program
+    in it as missing.
+
+    Timeouts are counted per calling thread between start_tracking() and
+    tracked_timeouts(), so callers can tell which results may be wrong;
+    paths whose probe timed out are kept in `timed_out`.
+    """
+    def __init__(self, backend=None, timeout=2.0, max_workers=8):
+        self.backend = backend or default_backend
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="detect-probe")
+        self.timeouts = 0
+        self.timed_out = set()
+        self._local = threading.local()
+
+    def _probe(self, fallback, func, *args):
+        future = self.pool.submit(func, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self.timeouts += 1
+            self.timed_out.update(args)
+            self._local.timeouts = getattr(self._local, "timeouts", 0) + 1
+            return fallback
+        except Exception:
+            return fallback
+
+    def start_tracking(self):
+        self._local.timeouts = 0
+
+    def tracked_timeouts(self):
+        return getattr(self._local, "timeouts", 0)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def getenv(self, key, default=None):
+        return self.backend.getenv(key, default)
+
+    def expandvars(self, path):
+        return self.backend.expandvars(path)
+
+    def exists(self, path):
+        return self._probe(False, self.backend.exists, path)
+
+    def mtime(self, path):
+        return self._probe(None, self.backend.mtime, path)
+
+    def listdir(self, path):
+        return self._probe([], self.backend.listdir, path)
+
+    def subdirs(self, path):
+        return self._probe([], self.backend.subdirs, path)
+
+    def find_shortcuts(self, base):
+        return self.backend.find_shortcuts(base)
+
+    def uninstall_sources(self):
+        return self.backend.uninstall_sources()
+
+    def read_uninstall(self, source):
+        return self.backend.read_uninstall(source)
+
+    def uninstall_stamp(self):
+        return self._probe([], self.backend.uninstall_stamp)
+
+
+def get_start_menu_dirs(backend=None):
+    backend = backend or default_backend
+    return [backend.expandvars(d) for d in START_MENU_DIRS]
+
+
+def get_program_dirs(backend=None):
+    # Program Files, ProgramData and AppData roots searched with the folder hints
+    backend = backend or default_backend
+    return [
+        backend.getenv('ProgramFiles', r'C:\Program Files'),
+        backend.getenv('ProgramFiles(x86)', r'C:\Program Files (x86)'),
+        backend.getenv('PROGRAMDATA', r'C:\ProgramData'),
+        backend.expandvars(r'%ALLUSERSPROFILE%'),
+        backend.expandvars(r'%APPDATA%'),
+        backend.expandvars(r'%LOCALAPPDATA%'),
     ]
+
+
+def get_installed_programs_via_start_menu(backend=None):
+    # Search Start Menu for all .lnk shortcuts (indexed by Windows Search)
+    backend = backend or default_backend
     found = {}
-    for base in start_menu_dirs:
-        for lnk in glob.glob(os.path.join(base, '**', '*.lnk'), recursive=True):
+    for base in get_start_menu_dirs(backend):
+        for lnk in backend.find_shortcuts(base):
             name = os.path.splitext(os.path.basename(lnk))[0]
             found[name] = lnk
     return found
 
-def get_installed_programs_via_registry():
-    # Query uninstall keys for installed programs
-    uninstall_keys = [
-        r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall",
-        r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"
-    ]
-    found = {}
-    for root in (winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER):
-        for key_path in uninstall_keys:
-            try:
-                with winreg.OpenKey(root, key_path) as key:
-                    for i in range(0, winreg.QueryInfoKey(key)[0]):
-                        try:
-                            subkey_name = winreg.EnumKey(key, i)
-                            with winreg.OpenKey(key, subkey_name) as subkey:
-                                display_name, _ = winreg.QueryValueEx(subkey, "DisplayName")
-                                found[display_name] = subkey_name
-                        except Exception:
-                            continue
-            except Exception:
-                continue
-    return found
 
-def detect_programs_by_name(program_names):
-    # Returns dict: {name: found_path or None}
-    import shutil
-    import subprocess
-    found = {}
-    start_menu = get_installed_programs_via_start_menu()
-    registry = get_installed_programs_via_registry()
-    # Scan Program Files and Program Files (x86) for installed programs
-    program_dirs = [
-        os.environ.get('ProgramFiles', r'C:\Program Files'),
-        os.environ.get('ProgramFiles(x86)', r'C:\Program Files (x86)'),
-        os.environ.get('PROGRAMDATA', r'C:\ProgramData'),
-        os.path.expandvars(r'%ALLUSERSPROFILE%'),
-        os.path.expandvars(r'%APPDATA%'),
-        os.path.expandvars(r'%LOCALAPPDATA%'),
-    ]
-    exe_hints = {
-        '7-Zip': ['7zFM.exe', '7z.exe'],
-        'FFmpeg': ['ffmpeg.exe'],
-        'Everything': ['Everything.exe'],
-        'VLC': ['vlc.exe'],
-        'Roblox': ['RobloxPlayerBeta.exe'],
-        'Roblox Studio': ['RobloxStudioBeta.exe'],
-        'Roblox Player': ['RobloxPlayerBeta.exe'],
-        'Cheat Engine': ['cheatengine-x86_64.exe', 'cheatengine.exe'],
-        'Discord': ['Discord.exe'],
-        'Reg Organizer': ['RegOrganizer.exe'],
-        'WizTree': ['WizTree64.exe', 'WizTree.exe'],
-        'Prism Launcher': ['PrismLauncher.exe'],
-        'IntelliJ IDEA': ['idea64.exe', 'idea.exe'],
-        'Visual Studio Code': ['Code.exe'],
-        'Visual Studio': ['devenv.exe', 'vswhere.exe', 'vs.exe', 'VisualStudio.exe', 'visual studio 2022.exe'],
-        'SkyClient': ['SkyClient.exe'],
-        'WinSCP': ['WinSCP.exe'],
-        'K-Lite Codec Pack Mega': ['klcp_mega.exe', 'CodecTweakTool.exe'],
-        'Phone Link': ['PhoneExperienceHost.exe'],
-        'Python': ['python.exe', 'python3.exe'],
-        'Eclipse Temurin JDK 8': ['java.exe'],
-        'Eclipse Temurin JDK 11': ['java.exe'],
-        'Eclipse Temurin JDK 17': ['java.exe'],
-        'Eclipse Temurin JDK 21': ['java.exe'],
-    }
-    folder_hints = {
-        '7-Zip': ['7-Zip'],
-        'FFmpeg': ['ffmpeg', 'FFmpeg'],
-        'Everything': ['Everything'],
-        'VLC': ['VideoLAN', 'VLC'],
-        'Roblox': ['Roblox'],
-        'Roblox Studio': ['Roblox'],
-        'Roblox Player': ['Roblox'],
-        'Cheat Engine': ['Cheat Engine'],
-        'Discord': ['Discord'],
-        'Reg Organizer': ['Reg Organizer', 'RegOrganizer'],
-        'WizTree': ['WizTree'],
-        'WinSCP': ['WinSCP'],
-        'Prism Launcher': ['PrismLauncher', 'Prism Launcher'],
-        'IntelliJ IDEA': ['JetBrains', 'IntelliJ IDEA Community Edition', 'IntelliJ IDEA'],
-        'Visual Studio Code': ['Microsoft VS Code', 'VSCode', 'Visual Studio Code'],
-        'Visual Studio': ['Microsoft Visual Studio', 'Visual Studio', 'Visual Studio 2022', '2022'],
-        'SkyClient': ['SkyClient'],
-        'K-Lite Codec Pack Mega': ['K-Lite Codec Pack'],
-        'Phone Link': ['PhoneExperienceHost', 'Phone Link'],
-        'Python': ['Python', 'Python3'],
-        'Eclipse Temurin JDK 8': ['Eclipse Foundation', 'Eclipse Adoptium', 'Adoptium', 'Java', 'jdk-8'],
-        'Eclipse Temurin JDK 11': ['Eclipse Foundation', 'Eclipse Adoptium', 'Adoptium', 'Java', 'jdk-11'],
-        'Eclipse Temurin JDK 17': ['Eclipse Foundation', 'Eclipse Adoptium', 'Adoptium', 'Java', 'jdk-17'],
-        'Eclipse Temurin JDK 21': ['Eclipse Foundation', 'Eclipse Adoptium', 'Adoptium', 'Java', 'jdk-21'],
-    }
-    for name in program_names:
-        exe_path = None
-        # 1. Try PATH (for common exe names)
-        for exe in exe_hints.get(name, []):
-            exe_path = shutil.which(exe)
-            # For 7-Zip, ignore system32
-            if exe_path and name == '7-Zip' and exe_path.lower().startswith(os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'system32').lower()):
-                exe_path = None
-            # For Visual Studio, prefer devenv.exe in a path containing 'Visual Studio'
-            if exe_path and name == 'Visual Studio' and 'devenv.exe' in exe_path.lower() and 'visual studio' not in exe_path.lower():
-                exe_path = None
-            # For JDKs, check version in path
-            if exe_path and name.startswith('Eclipse Temurin JDK'):
-                # Extract version from name
-                import re
-                jdk_version = re.search(r'JDK (\d+)', name)
-                if jdk_version:
-                    jdk_version = jdk_version.group(1)
-                    # Try to find version in path (e.g. zulu\\21 or jdk-21)
-                    if not (f"zulu{jdk_version}" in exe_path or f"jdk-{jdk_version}" in exe_path or f"\\{jdk_version}\\" in exe_path or f"-{jdk_version}\\" in exe_path):
-                        exe_path = None
-            if exe_path:
-                break
-        # 2. Try searching PATH env for java/python (all JDKs, Python)
-        if not exe_path and name in [
-            'Python', 'Eclipse Temurin JDK 8', 'Eclipse Temurin JDK 11', 'Eclipse Temurin JDK 17', 'Eclipse Temurin JDK 21', 'IntelliJ IDEA', 'Visual Studio Code']:
+def get_installed_programs_via_registry(backend=None):
+    return (backend or default_backend).uninstall_entries()
+
+
+def excluded_dirs(backend=None, extra=()):
+    """Folders the toolkit writes to itself (app data, temp), normcased."""
+    backend = backend or default_backend
+    dirs = [get_app_data_dir(), backend.getenv('TEMP'), backend.getenv('TMP')]
+    dirs.extend(extra)
+    return tuple(os.path.normcase(os.path.abspath(d)) for d in dirs if d)
+
+
+def is_excluded(path, excluded):
+    path = os.path.normcase(os.path.abspath(path))
+    return any(path == d or path.startswith(d.rstrip(os.sep) + os.sep) for d in excluded)
+
+
+def subfolder_mtimes(roots, backend=None, excluded=()):
+    """{subfolder: mtime} one level below each root, skipping excluded folders."""
+    backend = backend or default_backend
+    stamp = {}
+    for root in roots:
+        for sub in backend.subdirs(root):
+            if not is_excluded(sub, excluded):
+                stamp[sub] = backend.mtime(sub)
+    return stamp
+
+
+class DetectionIndex:
+    """Detection results persisted between runs.
+
+    The index stores a stamp made of the mtimes of every scanned directory
+    (plus the subfolders one level below the Start Menu roots and folder
+    hints, so a shortcut added to an existing Start Menu folder counts),
+    the Uninstall keys' last-write times, PATH and the program catalog.
+    The toolkit's own app data and temp folders are never part of it. While the stamp still matches,
+    cached results are returned without scanning anything.
+    """
+    def __init__(self, path=INDEX_FILE, backend=None):
+        self.path = path
+        self.backend = backend or default_backend
+        self.stamp = None
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                self.stamp = data.get('stamp')
+                self.entries = data.get('entries', {})
+        except Exception:
+            pass
+
+    def save(self):
+        # Another index (detection thread, watcher) may have saved since we loaded:
+        # keep its entries when the stamp is the same, then write atomically
+        with _index_lock:
             try:
-                path_env = os.environ.get('PATH', '')
-                for exe in exe_hints.get(name, []):
-                    for p in path_env.split(os.pathsep):
-                        candidate = os.path.join(p, exe)
-                        if os.path.exists(candidate):
-                            # For JDKs, check version in path
-                            if name.startswith('Eclipse Temurin JDK'):
-                                import re
-                                jdk_version = re.search(r'JDK (\d+)', name)
-                                if jdk_version:
-                                    jdk_version = jdk_version.group(1)
-                                    if not (f"zulu{jdk_version}" in candidate or f"jdk-{jdk_version}" in candidate or f"\\{jdk_version}\\" in candidate or f"-{jdk_version}\\" in candidate):
-                                        continue
-                            exe_path = candidate
-                            break
-                    if exe_path:
-                        break
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION and data.get('stamp') == self.stamp:
+                    self.entries = dict(data.get('entries', {}), **self.entries)
             except Exception:
                 pass
+            try:
+                atomic_write(self.path, json.dumps({'version': INDEX_VERSION, 'stamp': self.stamp, 'entries': self.entries}, indent=2))
+            except Exception as e:
+                print(f"Failed to save program index: {e}")
+
+    def hint_dirs(self):
+        # Folder hints under the Program Files style bases (Program Files\VideoLAN, ...)
+        hints = load_catalog().folder_hints()
+        return sorted({os.path.join(base, hint) for base in get_program_dirs(self.backend) if base for hint in hints})
+
+    def watched_dirs(self):
+        dirs = set(get_start_menu_dirs(self.backend)) | set(self.hint_dirs())
+        dirs.update(base for base in get_program_dirs(self.backend) if base)
+        path_env = self.backend.getenv('PATH', '')
+        dirs.update(p for p in path_env.split(os.pathsep) if p)
+        excluded = excluded_dirs(self.backend, [os.path.dirname(os.path.abspath(self.path))])
+        return sorted(d for d in dirs if not is_excluded(d, excluded))
+
+    def current_stamp(self):
+        # Subfolders one level down the Start Menu trees and folder hints only: adding to an
+        # existing folder doesn't touch its parent's mtime. Never the AppData/Temp roots,
+        # where the toolkit's own writes would invalidate the index on every save.
+        excluded = excluded_dirs(self.backend, [os.path.dirname(os.path.abspath(self.path))])
+        roots = get_start_menu_dirs(self.backend) + self.hint_dirs()
+        return {
+            'dirs': {d: self.backend.mtime(d) for d in self.watched_dirs()},
+            'subdirs': subfolder_mtimes(roots, self.backend, excluded),
+            'uninstall': self.backend.uninstall_stamp(),
+            'path': self.backend.getenv('PATH', ''),
+            'catalog': [self.backend.mtime(CATALOG_FILE), self.backend.mtime(USER_CATALOG_FILE)],
+        }
+
+    def lookup(self, program_names):
+        """Return ({name: path} for names still valid in the index, [names to scan])."""
+        stamp = self.current_stamp()
+        if stamp != self.stamp:
+            self.stamp = stamp
+            self.entries = {}
+        found = {n: self.entries[n] for n in program_names if n in self.entries}
+        missing = [n for n in program_names if n not in self.entries]
+        return found, missing
+
+    def update(self, results):
+        self.entries.update(results)
+        self.save()
+
+    def refresh(self, results):
+        """Store re-detected entries and re-stamp, keeping the other entries valid.
+
+        Used by program_watcher after it re-resolved every program a change
+        could have affected.
+        """
+        self.stamp = self.current_stamp()
+        self.update(results)
+
+
+class NameMatcher:
+    """Aho-Corasick automaton over lowercased program names.
+
+    first_matches() walks each text once and reports, for every pattern, the
+    first text (in iteration order) that contains it, which is what the old
+    per-program `name.lower() in prog.lower()` scans returned.
+    """
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for pattern in patterns:
+            state = 0
+            for ch in pattern.lower():
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(pattern)
+        # Breadth-first pass to fill in failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text):
+        state = 0
+        for ch in text.lower():
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            yield from self.out[state]
+
+    def first_matches(self, texts, wanted=None):
+        """Return {pattern: first text containing it} for the patterns in wanted (default all)."""
+        remaining = set(wanted) if wanted is not None else {p for outs in self.out for p in outs}
+        found = {}
+        for text in texts:
+            if not remaining:
+                break
+            for pattern in self.iter_matches(text):
+                if pattern in remaining:
+                    remaining.discard(pattern)
+                    found[pattern] = text
+        return found
+
+
+class DetectionEngine:
+    """Resolves many programs in one pass.
+
+    PATH is listed once into an exe lookup table, existence probes are
+    memoised for the whole pass, and the registry and Start Menu listings are
+    each scanned once with a NameMatcher for all still-unresolved programs.
+    """
+    def __init__(self, backend=None, catalog=None, path_table=True):
+        self.backend = backend or default_backend
+        self.catalog = catalog or load_catalog()
+        # Without the table, which() probes <PATH entry>\<exe> directly (cheaper for a few names)
+        self.use_path_table = path_table
+        self.program_dirs = get_program_dirs(self.backend)
+        self._exists = {}
+        self._excluded = {}
+        self._path_dirs = [p for p in self.backend.getenv('PATH', '').split(os.pathsep) if p]
+        self._path_table = None
+        self._start_menu = None
+        self._registry = None
+
+    @property
+    def start_menu(self):
+        if self._start_menu is None:
+            self._start_menu = get_installed_programs_via_start_menu(self.backend)
+        return self._start_menu
+
+    @property
+    def registry(self):
+        if self._registry is None:
+            self._registry = get_installed_programs_via_registry(self.backend)
+        return self._registry
+
+    def exists(self, path):
+        result = self._exists.get(path)
+        if result is None:
+            result = self.backend.exists(path)
+            # A timed-out probe is retried by the next caller instead of memoised as missing
+            if path not in getattr(self.backend, "timed_out", ()):
+                self._exists[path] = result
+        return result
+
+    def build_path_table(self):
+        # One listdir per PATH entry (first PATH entry wins, like shutil.which)
+        if self._path_table is None:
+            table = {}
+            for p in self._path_dirs:
+                for entry in self.backend.listdir(p):
+                    table.setdefault(entry.lower(), os.path.join(p, entry))
+            self._path_table = table
+        return self._path_table
+
+    def which(self, exe):
+        if not self.use_path_table:
+            for p in self._path_dirs:
+                candidate = os.path.join(p, exe)
+                if self.exists(candidate):
+                    return candidate
+            return None
+        return self.build_path_table().get(exe.lower())
+
+    def accepts(self, rule, path):
+        # Compiled rule checks: excluded prefixes and the required path pattern
+        excluded = self._excluded.get(rule.name)
+        if excluded is None:
+            excluded = self._excluded[rule.name] = tuple(self.backend.expandvars(p).lower() for p in rule.exclude_prefixes)
+        if excluded and path.lower().startswith(excluded):
+            return False
+        return rule.path_re is None or rule.path_re.search(path) is not None
+
+    def _resolve_local(self, rule):
+        # Steps 1-4: PATH, folder hints and known install paths; no listings needed
+        # 1. Try PATH (for common exe names)
+        for exe in rule.exes:
+            exe_path = self.which(exe)
+            if exe_path and self.accepts(rule, exe_path):
+                return exe_path
+        # 2. Try searching every PATH entry directly (JDKs, Python, ...)
+        if rule.search_path:
+            for exe in rule.exes:
+                for p in self._path_dirs:
+                    candidate = os.path.join(p, exe)
+                    if self.exists(candidate) and self.accepts(rule, candidate):
+                        return candidate
         # 3. Try only specific folders in Program Files, ProgramData, AppData
-        if not exe_path:
-            for exe in exe_hints.get(name, []):
-                for base_dir in program_dirs:
-                    if not base_dir or not os.path.exists(base_dir):
-                        continue
-                    for folder_hint in folder_hints.get(name, []):
-                        folder_path = os.path.join(base_dir, folder_hint)
-                        if os.path.exists(folder_path):
-                            candidate = os.path.join(folder_path, exe)
-                            if os.path.exists(candidate):
-                                # For 7-Zip, ignore system32
-                                if name == '7-Zip' and candidate.lower().startswith(os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'system32').lower()):
-                                    continue
-                                exe_path = candidate
-                                break
-                    if exe_path:
-                        break
-                if exe_path:
-                    break
-        # 4. Special case for VSCode: check AppData/Local/Programs/Microsoft VS Code
-        if not exe_path and name == 'Visual Studio Code':
-            local_vscode = os.path.expandvars(r'%LOCALAPPDATA%\\Programs\\Microsoft VS Code\\Code.exe')
-            if os.path.exists(local_vscode):
-                exe_path = local_vscode
-        # 4b. Special case for Visual Studio 2022: check default install path
-        if not exe_path and name == 'Visual Studio':
-            vs2022_path = r'C:\\Program Files\\Microsoft Visual Studio\\2022\\Community\\Common7\\IDE\\devenv.exe'
-            if os.path.exists(vs2022_path):
-                exe_path = vs2022_path
+        for exe in rule.exes:
+            for base_dir in self.program_dirs:
+                if not base_dir or not self.exists(base_dir):
+                    continue
+                for folder_hint in rule.folders:
+                    folder_path = os.path.join(base_dir, folder_hint)
+                    if self.exists(folder_path):
+                        candidate = os.path.join(folder_path, exe)
+                        if self.exists(candidate) and self.accepts(rule, candidate):
+                            return candidate
+        # 4. Known install locations (e.g. per-user VSCode, Visual Studio 2022)
+        for template in rule.candidates:
+            candidate = self.backend.expandvars(template)
+            if self.exists(candidate):
+                return candidate
+        return None
+
+    def _resolve_registry_match(self, rule, match):
+        # Some Uninstall entries only give a subkey; map them to a real path
+        if rule.registry_candidates is not None:
+            for template in rule.registry_candidates:
+                candidate = self.backend.expandvars(template)
+                if self.exists(candidate):
+                    return candidate
+            return None
+        return self.registry[match]
+
+    def resolve(self, program_names):
+        """Return {name: found_path or None} for all names in one pass."""
+        rules = {name: self.catalog.rule(name) for name in program_names}
+        found = {name: self._resolve_local(rule) for name, rule in rules.items()}
+        unresolved = [name for name in program_names if not found[name]]
+        if not unresolved:
+            return found
+        wanted = {rules[name].registry_name for name in unresolved}
+        matcher = NameMatcher(wanted)
         # 5. Try registry
-        if not exe_path:
-            match = next((prog for prog in registry if name.lower() in prog.lower()), None)
+        matches = matcher.first_matches(self.registry, wanted)
+        for name in unresolved:
+            match = matches.get(rules[name].registry_name)
             if match:
-                # Special case: Visual Studio registry returns subkey, not exe path
-                if name == 'Visual Studio':
-                    vs2022_path = r'C:\\Program Files\\Microsoft Visual Studio\\2022\\Community\\Common7\\IDE\\devenv.exe'
-                    if os.path.exists(vs2022_path):
-                        exe_path = vs2022_path
-                    else:
-                        vs_lnk = os.path.expandvars(r'%PROGRAMDATA%\\Microsoft\\Windows\\Start Menu\\Programs\\Visual Studio 2022.lnk')
-                        if os.path.exists(vs_lnk):
-                            exe_path = vs_lnk
-                        else:
-                            exe_path = None
-                # Special case: WinSCP registry returns subkey, not exe path
-                elif name == 'WinSCP':
-                    # Try known install path
-                    winscp_path = r'C:\\Program Files (x86)\\WinSCP\\WinSCP.exe'
-                    if os.path.exists(winscp_path):
-                        exe_path = winscp_path
-                    else:
-                        winscp_path2 = r'C:\\Program Files\\WinSCP\\WinSCP.exe'
-                        if os.path.exists(winscp_path2):
-                            exe_path = winscp_path2
-                        else:
-                            exe_path = None
-                else:
-                    exe_path = registry[match]
+                found[name] = self._resolve_registry_match(rules[name], match)
         # 6. Try start menu shortcut (especially for VSCode)
-        if not exe_path:
-            match = next((lnk for prog, lnk in start_menu.items() if name.lower() in prog.lower()), None)
-            if match:
-                exe_path = match
-        found[name] = exe_path if exe_path else None
-    return found
+        unresolved = [name for name in unresolved if not found[name]]
+        if unresolved:
+            start_menu = self.start_menu
+            matches = NameMatcher(unresolved).first_matches(start_menu)
+            for name in unresolved:
+                match = matches.get(name)
+                if match:
+                    found[name] = start_menu[match]
+        return {name: path if path else None for name, path in found.items()}
+
+
+def scan_programs(program_names, backend=None, catalog=None):
+    """Full detection scan, ignoring the index. Returns {name: found_path or None}."""
+    return DetectionEngine(backend, catalog).resolve(program_names)
+
+
+def quick_scan_programs(program_names, backend=None, catalog=None):
+    """Fast path: probe only the exe and folder hints of each name.
+
+    No Start Menu, registry or PATH listings, so it is cheap enough for a
+    handful of names at startup. Returns {name: found_path or None}.
+    """
+    engine = DetectionEngine(backend, catalog, path_table=False)
+    return {name: engine._resolve_local(engine.catalog.rule(name)) for name in program_names}
+
+
+def detect_programs_by_name(program_names, backend=None, use_index=True, index_path=INDEX_FILE):
+    # Returns dict: {name: found_path or None}
+    backend = backend or default_backend
+    if not use_index:
+        return scan_programs(program_names, backend)
+    index = DetectionIndex(index_path, backend)
+    found, missing = index.lookup(program_names)
+    if missing:
+        scanned = scan_programs(missing, backend)
+        index.update(scanned)
+        found.update(scanned)
+    return {name: found.get(name) for name in program_names}
+
+
+def iter_detect_programs(program_names, backend=None, use_index=True, index_path=INDEX_FILE, max_workers=8, probe_timeout=2.0):
+    """Concurrent detection that yields (name, found_path or None) as each program resolves.
+
+    Indexed results come first. The remaining programs are probed on a
+    bounded pool while the Uninstall keys and Start Menu roots are listed in
+    parallel; programs that need those listings resolve once they arrive.
+    Results that depended on a timed-out probe are yielded but not written
+    to the index, so the next scan tries them again.
+    """
+    backend = backend or default_backend
+    missing = list(program_names)
+    index = None
+    if use_index:
+        index = DetectionIndex(index_path, backend)
+        found, missing = index.lookup(program_names)
+        for name, path in found.items():
+            yield name, path
+    if not missing:
+        return
+    probes = TimeoutBackend(backend, timeout=probe_timeout, max_workers=max_workers)
+    engine = DetectionEngine(probes)
+    results = {}
+    uncertain = set()  # names whose result depended on a timed-out probe
+
+    def resolve_local(rule):
+        probes.start_tracking()
+        path = engine._resolve_local(rule)
+        return path, probes.tracked_timeouts() > 0
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="detect") as pool:
+        # Listings: one task per Uninstall key and per Start Menu root
+        registry_futures = [pool.submit(probes.read_uninstall, source) for source in probes.uninstall_sources()]
+        start_menu_futures = [pool.submit(probes.find_shortcuts, base) for base in get_start_menu_dirs(probes)]
+        probes.start_tracking()
+        engine.build_path_table()  # built once before the workers share it
+        path_table_timed_out = probes.tracked_timeouts() > 0
+        rules = {name: engine.catalog.rule(name) for name in missing}
+        local = {pool.submit(resolve_local, rules[name]): name for name in missing}
+        unresolved = []
+        for future in as_completed(local):
+            name = local[future]
+            try:
+                path, timed_out = future.result()
+            except Exception:
+                path, timed_out = None, False
+            if timed_out or path_table_timed_out:
+                uncertain.add(name)
+            if path:
+                results[name] = path
+                yield name, path
+            else:
+                unresolved.append(name)
+        if unresolved:
+            registry = {}
+            for future in registry_futures:
+                registry.update(future.result())
+            engine._registry = registry
+            wanted = {rules[name].registry_name for name in unresolved}
+            matches = NameMatcher(wanted).first_matches(registry, wanted)
+            still = []
+            for name in unresolved:
+                match = matches.get(rules[name].registry_name)
+                probes.start_tracking()
+                path = engine._resolve_registry_match(rules[name], match) if match else None
+                if probes.tracked_timeouts():
+                    uncertain.add(name)
+                if path:
+                    results[name] = path
+                    yield name, path
+                else:
+                    still.append(name)
+            if still:
+                start_menu = {}
+                for future in start_menu_futures:
+                    for lnk in future.result():
+                        start_menu[os.path.splitext(os.path.basename(lnk))[0]] = lnk
+                matches = NameMatcher(still).first_matches(start_menu)
+                for name in still:
+                    path = start_menu[matches[name]] if name in matches else None
+                    results[name] = path
+                    yield name, path
+        else:
+            for future in registry_futures + start_menu_futures:
+                future.cancel()
+    probes.shutdown()
+    if index is not None:
+        index.update({name: path for name, path in results.items() if name not in uncertain})
+
 
 def uninstall_program_by_registry_key(reg_key):
     # Try to run the uninstall string from registry
@@ -243,3 +671,51 @@ def uninstall_program_by_registry_key(reg_key):
     except Exception:
         pass
     return False
+
+
+def _benchmark(n_registry=5000, n_programs=200, repeat=3):
+    # Synthetic registry/Start Menu: compare the old per-program scans with one engine pass
+    import time
+    import random
+
+    class _SyntheticBackend(DetectionBackend):
+        def __init__(self):
+            rnd = random.Random(0)
+            words = ["".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(3, 9))) for _ in range(2000)]
+            self.registry = {" ".join(rnd.sample(words, 3)).title(): f"{{{i:08d}}}" for i in range(n_registry)}
+            self.programs = [" ".join(rnd.sample(words, 2)).title() for _ in range(n_programs)]
+        def getenv(self, key, default=None):
+            return {'PATH': ''}.get(key, default)
+        def expandvars(self, path):
+            return path
+        def exists(self, path):
+            return False
+        def mtime(self, path):
+            return None
+        def find_shortcuts(self, base):
+            return []
+        def uninstall_entries(self):
+            return self.registry
+
+    backend = _SyntheticBackend()
+    names = backend.programs
+    start = time.perf_counter()
+    for _ in range(repeat):
+        naive = {n: next((p for p in backend.registry if n.lower() in p.lower()), None) for n in names}
+    naive_t = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        matched = NameMatcher(names).first_matches(backend.registry)
+    engine_t = (time.perf_counter() - start) / repeat
+    assert {n: naive[n] for n in names if naive[n]} == matched
+    start = time.perf_counter()
+    scan_programs(names, backend)
+    full_t = time.perf_counter() - start
+    print(f"{n_registry} registry entries, {n_programs} programs")
+    print(f"  per-program scan: {naive_t * 1000:8.1f} ms")
+    print(f"  single pass:      {engine_t * 1000:8.1f} ms")
+    print(f"  full engine run:  {full_t * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,144 @@
+import os
+import threading
+
+from core.program_detection import (
+    DetectionEngine, DetectionIndex, INDEX_FILE, default_backend,
+    get_program_dirs, get_start_menu_dirs, excluded_dirs, subfolder_mtimes,
+)
+from core.program_catalog import load_catalog
+
+# Keeps detection results current after installs and uninstalls without
+# re-running the full scan: watched directories are mapped to the programs
+# they can affect, and only those programs are resolved again.
+
+
+class PollingWatcher:
+    """Watches directories by polling their mtimes (and the Uninstall keys).
+
+    For `trees` (the Start Menu roots) the first level of subfolders is
+    polled too, since a shortcut added to an existing vendor folder only
+    changes that folder; such a change is reported as its root.
+
+    Any object with the same snapshot()/changes() pair can replace it, e.g.
+    one built on ReadDirectoryChangesW or inotify.
+    """
+    def __init__(self, dirs, backend=None, trees=()):
+        self.backend = backend or default_backend
+        self.trees = sorted(set(trees))
+        self.dirs = sorted(set(dirs) | set(self.trees))
+        self.excluded = excluded_dirs(self.backend)
+        self.state = None
+
+    def snapshot(self):
+        return {
+            'dirs': {d: self.backend.mtime(d) for d in self.dirs},
+            'subdirs': {root: subfolder_mtimes([root], self.backend, self.excluded) for root in self.trees},
+            'uninstall': self.backend.uninstall_stamp(),
+        }
+
+    def changes(self):
+        """Return (changed_dirs, uninstall_changed) since the previous call."""
+        state = self.snapshot()
+        previous, self.state = self.state, state
+        if previous is None:
+            return [], False
+        changed = [d for d in self.dirs if state['dirs'].get(d) != previous['dirs'].get(d)]
+        changed += [root for root in self.trees
+                    if root not in changed and state['subdirs'].get(root) != previous['subdirs'].get(root)]
+        return changed, state['uninstall'] != previous['uninstall']
+
+
+class ProgramWatcher:
+    """Re-detects only the programs affected by filesystem/registry changes.
+
+    on_change(results) is called from the watcher thread with
+    {name: found_path or None} for every program that was re-resolved.
+    Call poke() to check right away (e.g. after winget finishes).
+    """
+    def __init__(self, program_names, on_change, detected=None, backend=None, catalog=None,
+                 watcher=None, index_path=INDEX_FILE, interval=1.0):
+        self.program_names = list(program_names)
+        self.on_change = on_change
+        self.detected = dict(detected or {})
+        self.backend = backend or default_backend
+        self.catalog = catalog or load_catalog()
+        self.index_path = index_path
+        self.interval = interval
+        self.start_menu_dirs = [os.path.normcase(d) for d in get_start_menu_dirs(self.backend)]
+        self.dir_programs = self._map_dirs()
+        self.watcher = watcher or PollingWatcher(list(self.dir_programs), self.backend, trees=self.start_menu_dirs)
+        self.redetect_count = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _map_dirs(self):
+        # {normcased dir: {program names}}: folder hint dirs and known install locations
+        mapping = {}
+        bases = [b for b in get_program_dirs(self.backend) if b]
+        for name in self.program_names:
+            rule = self.catalog.rule(name)
+            dirs = [os.path.join(base, hint) for base in bases for hint in rule.folders]
+            dirs += [os.path.dirname(self.backend.expandvars(c)) for c in rule.candidates]
+            for d in dirs:
+                mapping.setdefault(os.path.normcase(d), set()).add(name)
+        return mapping
+
+    def affected(self, changed_dirs, uninstall_changed):
+        names = set()
+        start_menu_changed = False
+        for d in changed_dirs:
+            d = os.path.normcase(d)
+            names |= self.dir_programs.get(d, set())
+            start_menu_changed = start_menu_changed or d in self.start_menu_dirs
+        if start_menu_changed or uninstall_changed:
+            # New shortcuts / Uninstall entries can only matter for programs not found
+            # on disk, or ones that were found through the Start Menu or registry
+            for name in self.program_names:
+                path = self.detected.get(name)
+                if not path or not self._on_disk(name, path):
+                    names.add(name)
+        return [name for name in self.program_names if name in names]
+
+    def _on_disk(self, name, path):
+        # Found through a folder hint / known location (not a shortcut or registry key)
+        path = os.path.normcase(os.path.dirname(path))
+        return any(name in names and (path == d or path.startswith(d + os.sep))
+                   for d, names in self.dir_programs.items())
+
+    def check(self):
+        """Poll once; re-detect and report affected programs. Returns the results."""
+        changed_dirs, uninstall_changed = self.watcher.changes()
+        names = self.affected(changed_dirs, uninstall_changed)
+        if not names:
+            return {}
+        results = DetectionEngine(self.backend, self.catalog).resolve(names)
+        self.redetect_count += len(names)
+        self.detected.update(results)
+        DetectionIndex(self.index_path, self.backend).refresh(results)
+        self.on_change(results)
+        return results
+
+    def poke(self):
+        self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self.watcher.changes()  # baseline
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Program watcher failed: {e}")
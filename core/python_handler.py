@@ -10,16 +10,15 @@ def ensure_python_and_uv(min_version="3.13.4"):
     # 1. Check for python >= min_version
     def version_tuple(v):
         return tuple(map(int, (v.split("."))))
+    from core.python_registry import get_registry
     py_exec = shutil.which("python") or shutil.which("python3")
     found_version = None
     if py_exec:
-        try:
-            out = subprocess.check_output([py_exec, "--version"], text=True).strip()
-            found_version = re.search(r"(\d+\.\d+\.\d+)", out)
-            if found_version:
-                found_version = found_version.group(1)
-        except Exception:
-            pass
+        # Cached per executable; read from patchlevel.h / pyvenv.cfg when possible
+        found_version = get_registry().version(py_exec)
+        if found_version:
+            found_version = re.search(r"(\d+\.\d+\.\d+)", found_version)
+            found_version = found_version.group(1) if found_version else None
     if not py_exec or not found_version or version_tuple(found_version) < version_tuple(min_version):
         # Use winget to install Python 3.13 if available (as in the module)
         print("Installing Python 3.13.4 via winget...")
@@ -46,100 +45,53 @@ def scan_and_install_missing_pkgs(modules_dir="modules"):
     """
     Scan all .py files in modules_dir for imports, try to install missing pkgs using uv pip install --system.
     """
-    import ast
     import glob
-    import sys
     import importlib
+    from core.import_scanner import get_scanner, is_installed
     py_exec = ensure_python_and_uv()
-    # 1. Scan for imports
-    pkgs = set()
-    for pyfile in glob.glob(os.path.join(modules_dir, "*.py")):
-        with open(pyfile, "r", encoding="utf-8", errors="ignore") as f:
-            try:
-                tree = ast.parse(f.read(), filename=pyfile)
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Import):
-                        for n in node.names:
-                            pkgs.add(n.name.split(".")[0])
-                    elif isinstance(node, ast.ImportFrom):
-                        if node.module:
-                            pkgs.add(node.module.split(".")[0])
-            except Exception:
-                continue
-    # 2. Try to import, collect missing
-    missing = set()
-    import_errors = {}
-    for pkg in pkgs:
-        try:
-            importlib.import_module(pkg)
-        except ImportError as e:
-            missing.add(pkg)
-            import_errors[pkg] = str(e)
+    # 1. Scan for imports (cached per file hash) and 2. look them up with find_spec, nothing is imported
+    paths = glob.glob(os.path.join(modules_dir, "*.py"))
+    missing = get_scanner().missing(paths, local={"core", "modules"})
     if not missing:
         print("All required packages are already installed.")
         return
-    # Map import names to PyPI package names (shared with modules)
-    install_name_map = {
-        "cv2": "opencv-python",
-        "PIL": "Pillow",
-        "Crypto": "pycryptodome",
-        "optparse": "optparse",
-    }
-    install_pkgs = [install_name_map.get(m, m) for m in missing]
+    # Import names -> PyPI projects, from installed metadata where possible
+    install_pkgs = sorted(set(missing.values()))
     print(f"Missing packages: {missing}")
     print(f"Installing: {install_pkgs}")
-    # 3. Try to install missing pkgs with uv pip install --system
-    result = subprocess.run(["uv", "pip", "install", "--system"] + install_pkgs, capture_output=True, text=True)
+    # 3. Try to install missing pkgs with uv pip install --system, from the local wheel cache when possible
+    from core.wheel_cache import get_cache
+    cache = get_cache()
+    uv_cmd = ["uv", "pip", "install", "--system"]
+    offline = cache.can_install_offline(install_pkgs, py_exec)
+    result = subprocess.run(uv_cmd + cache.find_links_args(offline=offline) + install_pkgs, capture_output=True, text=True)
+    if result.returncode != 0 and offline:
+        result = subprocess.run(uv_cmd + cache.find_links_args() + install_pkgs, capture_output=True, text=True)
+    elif result.returncode != 0 and cache.has(install_pkgs, py_exec):
+        # No index reachable: fall back to the compatible wheels already cached
+        result = subprocess.run(uv_cmd + cache.find_links_args(offline=True) + install_pkgs, capture_output=True, text=True)
     if result.returncode != 0:
         print("uv pip install failed:")
         print(result.stdout)
         print(result.stderr)
-    # 4. Try to import again, print errors if still missing
-    still_missing = set()
-    for pkg in missing:
-        try:
-            importlib.import_module(pkg)
-        except Exception as e:
-            still_missing.add(pkg)
-            print(f"[ERROR] After install, failed to import '{pkg}': {e}")
+    # 4. Check again, print what is still missing
+    importlib.invalidate_caches()
+    still_missing = {name for name in missing if not is_installed(name)}
     if still_missing:
-        print(f"[WARNING] Some packages could not be imported after install: {still_missing}")
+        print(f"[WARNING] Some packages could not be found after install: {still_missing}")
         print("Check for system dependencies, correct wheel versions, or DLL issues.")
-    # Optionally, print original import errors for context
-    for pkg, err in import_errors.items():
-        print(f"Original import error for {pkg}: {err}")
-import sys
 import os
-import glob
+import importlib
 
 def try_import_with_system_pip(module_name, package_hint=None):
+    """Import module_name, falling back to the site-packages of other installed Pythons.
+
+    The fallback looks the name up in a cached index of every interpreter's
+    site-packages and loads it through a meta-path finder, without touching
+    sys.path; core.site_resolver.module_origin() tells where it came from.
+    """
     try:
-        return __import__(module_name)
+        return importlib.import_module(module_name)
     except ImportError:
-        # Try to find the package in all Python installations
-        possible_dirs = []
-        for path in os.environ["PATH"].split(os.pathsep):
-            python_exe = os.path.join(path, "python.exe")
-            if os.path.exists(python_exe):
-                # Try to find site-packages
-                for sp in glob.glob(os.path.join(path, "Lib", "site-packages")):
-                    possible_dirs.append(sp)
-        # Also try common locations
-        for root in ["C:\\Python*", "C:\\Users\\*\\AppData\\Local\\Programs\\Python\\Python313"]:
-            for py in glob.glob(root):
-                sp = os.path.join(py, "Lib", "site-packages")
-                if os.path.exists(sp):
-                    possible_dirs.append(sp)
-        # Try to import from those
-        for sp in possible_dirs:
-            if package_hint:
-                if not os.path.exists(os.path.join(sp, package_hint)):
-                    continue
-            if sp not in sys.path:
-                sys.path.insert(0, sp)
-            try:
-                return __import__(module_name)
-            except ImportError:
-                continue
-        raise
-
+        from core.site_resolver import import_from_installed_pythons
+        return import_from_installed_pythons(module_name, package_hint)
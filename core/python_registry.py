@@ -0,0 +1,362 @@
+import os
+import re
+import sys
+import json
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from core.SettingsManager import get_app_data_dir, atomic_write
+
+# Every Python interpreter on the machine, found once and remembered.
+# Results are cached by the executable's realpath, size and mtime, so a
+# refresh only looks at interpreters that are new or were replaced, and
+# versions are read from files next to the binary whenever possible instead
+# of running `python --version`.
+
+CACHE_FILE = os.path.join(get_app_data_dir(), 'python_registry.json')
+CACHE_VERSION = 5
+
+EXE_NAMES = ("python.exe", "python3.exe", "python", "python3")
+PATCHLEVEL_RE = re.compile(r'#define\s+PY_VERSION\s+"([^"]+)"')
+PYVENV_RE = re.compile(r'^\s*(?:version|version_info)\s*=\s*(\d+\.\d+\.\d+)', re.MULTILINE)
+VERSION_RE = re.compile(r'(\d+\.\d+\.\d+\S*)')
+MINOR_RE = re.compile(r'python(\d+)\.(\d+)(?:\.exe)?', re.IGNORECASE)
+
+
+def install_dirs():
+    # Windows: per-user and all-users python.org install folders
+    if sys.platform != "win32":
+        return []
+    return [
+        os.path.join(os.environ.get("LocalAppData", ""), "Programs", "Python"),
+        os.path.join(os.environ.get("ProgramFiles", ""), "Python"),
+        os.path.join(os.environ.get("ProgramFiles(x86)", ""), "Python"),
+    ]
+
+
+def candidate_paths():
+    """Executables that may be Python interpreters, in PATH order first."""
+    candidates = []
+    for path in os.environ.get("PATH", "").split(os.pathsep):
+        if not path:
+            continue
+        for exe_name in EXE_NAMES:
+            candidates.append(os.path.join(path, exe_name))
+    for d in install_dirs():
+        if os.path.isdir(d):
+            for sub in sorted(os.listdir(d)):
+                candidates.append(os.path.join(d, sub, "python.exe"))
+    return candidates
+
+
+def path_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def in_venv(exe_path):
+    # venv / virtualenv / uv venv: pyvenv.cfg next to the exe or one folder up
+    exe_dir = os.path.dirname(os.path.abspath(exe_path))
+    return any(os.path.isfile(os.path.join(d, "pyvenv.cfg")) for d in (exe_dir, os.path.dirname(exe_dir)))
+
+
+def is_store_shim(path, size):
+    # App execution aliases in WindowsApps are 0-byte reparse points that open the Store
+    return size == 0 and "windowsapps" in path.lower()
+
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _minor(name):
+    # "python3.11" / "python3.11.exe" -> (3, 11); anything else -> None
+    match = MINOR_RE.fullmatch(name)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _patchlevel(path, minor=None):
+    # PY_VERSION from a patchlevel.h, only if it belongs to the expected minor
+    text = _read(path)
+    match = PATCHLEVEL_RE.search(text) if text else None
+    if not match:
+        return None
+    version = match.group(1)
+    if minor is not None and tuple(int(x) for x in version.split(".")[:2]) != minor:
+        return None
+    return version
+
+
+def version_from_layout(exe_path):
+    """Read the version from files installed next to the interpreter, or None.
+
+    Tries pyvenv.cfg (virtualenvs, uv and Store installs), then the
+    patchlevel.h of the interpreter's own minor version: taken from the
+    executable's name (python3.X), else from the prefix when it holds
+    exactly one lib/python3.X. Anything ambiguous returns None so the
+    interpreter gets probed instead.
+    """
+    exe_dir = os.path.dirname(exe_path)
+    prefixes = [exe_dir, os.path.dirname(exe_dir)]
+    for prefix in prefixes:
+        text = _read(os.path.join(prefix, "pyvenv.cfg"))
+        if text:
+            match = PYVENV_RE.search(text)
+            if match:
+                return match.group(1)
+            # A venv without its version: the base interpreter can't be read from here
+            return None
+    exe_minor = _minor(os.path.basename(exe_path))
+    for prefix in prefixes:
+        try:
+            minors = {m for m in map(_minor, os.listdir(os.path.join(prefix, "lib"))) if m}
+        except OSError:
+            minors = set()
+        if exe_minor is not None:
+            if exe_minor in minors:
+                return _patchlevel(os.path.join(prefix, "include", "python%d.%d" % exe_minor, "patchlevel.h"), exe_minor)
+            continue
+        if len(minors) == 1:
+            minor = minors.pop()
+            return _patchlevel(os.path.join(prefix, "include", "python%d.%d" % minor, "patchlevel.h"), minor)
+        if minors:
+            return None  # several versions share this prefix
+        # python.org Windows layout: one install per prefix, include/patchlevel.h
+        version = _patchlevel(os.path.join(prefix, "include", "patchlevel.h"))
+        if version:
+            return version
+    return None
+
+
+# Run with `python -c`; kept free of f-strings so old interpreters can answer too
+PROBE_SCRIPT = r"""
+import json, os, platform, site, sys, sysconfig
+try:
+    from importlib.util import find_spec
+except ImportError:
+    find_spec = None
+def has(mod):
+    if find_spec is None:
+        return False
+    try:
+        return find_spec(mod) is not None
+    except Exception:
+        return False
+paths = sysconfig.get_paths()
+site_packages = [paths.get("purelib"), paths.get("platlib")]
+if hasattr(site, "getsitepackages"):
+    site_packages += site.getsitepackages()
+user_site = site.getusersitepackages() if getattr(site, "ENABLE_USER_SITE", False) else None
+base_prefix = getattr(sys, "base_prefix", sys.prefix)
+seen = []
+for p in site_packages:
+    if p and p not in seen:
+        seen.append(p)
+print(json.dumps({
+    "version": platform.python_version(),
+    "implementation": platform.python_implementation(),
+    "arch": platform.machine(),
+    "bits": 64 if sys.maxsize > 2 ** 32 else 32,
+    "platform": sysconfig.get_platform(),
+    "executable": sys.executable,
+    "prefix": sys.prefix,
+    "base_prefix": base_prefix,
+    "site_packages": seen,
+    "user_site": user_site,
+    "pip": has("pip"),
+    "uv": has("uv"),
+    "venv": sys.prefix != base_prefix,
+}))
+"""
+
+
+def probe_interpreter(exe_path, timeout=15):
+    """Everything the Python Manager needs about one interpreter, in one process."""
+    out = subprocess.check_output([exe_path, "-c", PROBE_SCRIPT], stderr=subprocess.DEVNULL, text=True, timeout=timeout)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def probe_version(exe_path, timeout=10):
+    out = subprocess.check_output([exe_path, "--version"], stderr=subprocess.STDOUT, text=True, timeout=timeout)
+    match = VERSION_RE.search(out)
+    return match.group(1) if match else out.strip().replace("Python ", "")
+
+
+class PythonRegistry:
+    """Cached interpreter discovery.
+
+    Entries are keyed by the interpreter's normalized path, so a venv whose
+    python is a symlink to its base keeps its own site-packages and
+    sys.executable. interpreters() stats every candidate, reuses entries
+    whose (realpath, size, mtime) still match and only reads or probes the
+    rest, probing in parallel. Symlinks and PATH duplicates outside a venv,
+    and Store shims, collapse to one interpreter in the listing.
+    """
+    def __init__(self, cache_path=CACHE_FILE, max_workers=8):
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self.entries = {}
+        self.probe_count = 0
+        self.layout_count = 0
+        self._lock = threading.Lock()
+        # Guards entries and the cache file; probes run outside it so parallel callers don't queue up
+        self._entries_lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("entries", {})
+        except Exception:
+            pass
+
+    def save(self):
+        with self._entries_lock:
+            try:
+                atomic_write(self.cache_path, json.dumps({"version": CACHE_VERSION, "entries": self.entries}, indent=2))
+            except Exception as e:
+                print(f"Failed to save Python registry: {e}")
+
+    def _resolve(self, candidates):
+        # {normalized path: (path, realpath, size, mtime)} for real, executable files
+        found = {}
+        seen = set()
+        for path in candidates:
+            try:
+                if not os.path.isfile(path) or not os.access(path, os.X_OK):
+                    continue
+                path = os.path.abspath(path)
+                real = os.path.normcase(os.path.realpath(path))
+                st = os.stat(real)
+            except OSError:
+                continue
+            # A venv's python shares its base's realpath but not its site-packages
+            identity = (real, os.path.dirname(path_key(path))) if in_venv(path) else real
+            if is_store_shim(path, st.st_size) or identity in seen:
+                continue
+            seen.add(identity)
+            found[path_key(path)] = (path, real, st.st_size, st.st_mtime)
+        return found
+
+    def _describe(self, real, path):
+        # Returns (version, info or None); a layout read needs no process at all
+        version = version_from_layout(path if in_venv(path) else real)
+        if version is not None:
+            with self._lock:
+                self.layout_count += 1
+            return version, None
+        info = self._probe(path)
+        if info is not None:
+            return info["version"], info
+        return probe_version(path), None
+
+    def _probe(self, path):
+        with self._lock:
+            self.probe_count += 1
+        try:
+            return probe_interpreter(path)
+        except Exception:
+            return None
+
+    def interpreters(self, candidates=None, with_info=False):
+        """Return [{"path", "version", "realpath"}] for every interpreter found.
+
+        with_info=True adds "info" (see PROBE_SCRIPT), probing in parallel
+        the interpreters whose metadata isn't cached yet. Safe to call from
+        several threads at once.
+        """
+        full_scan = candidates is None
+        found = self._resolve(candidate_paths() if full_scan else candidates)
+        with self._entries_lock:
+            stale = []
+            for key, (path, real, size, mtime) in found.items():
+                entry = self.entries.get(key)
+                if (not entry or entry.get("realpath") != real
+                        or entry.get("size") != size or entry.get("mtime") != mtime):
+                    stale.append(key)
+        described = {}
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {key: pool.submit(self._describe, found[key][1], found[key][0]) for key in stale}
+            for key, future in futures.items():
+                try:
+                    described[key] = future.result()
+                except Exception:
+                    described[key] = (None, None)
+        with self._entries_lock:
+            for key, (version, info) in described.items():
+                path, real, size, mtime = found[key]
+                self.entries[key] = {"path": path, "realpath": real, "size": size, "mtime": mtime,
+                                     "version": version, "info": info}
+            changed = bool(stale)
+            missing = []
+            if with_info:
+                missing = [key for key in found if self.entries[key].get("version") and not self.entries[key].get("info")]
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {key: pool.submit(self._probe, found[key][0]) for key in missing}
+            probed = {key: future.result() for key, future in futures.items()}
+            with self._entries_lock:
+                for key, info in probed.items():
+                    entry = self.entries.get(key)
+                    if info is not None and entry is not None:
+                        entry["info"] = info
+                        entry["version"] = info["version"]
+            changed = True
+        with self._entries_lock:
+            if full_scan and any(key not in found for key in self.entries):
+                # Forget interpreters that are gone
+                self.entries = {key: entry for key, entry in self.entries.items() if key in found}
+                changed = True
+            if changed:
+                self.save()
+            pythons = []
+            for key, (path, real, _, _) in found.items():
+                entry = self.entries.get(key) or {}
+                version = entry.get("version")
+                if version:
+                    py = {"path": path, "version": version, "realpath": real}
+                    if with_info:
+                        py["info"] = entry.get("info")
+                    pythons.append(py)
+        return pythons
+
+    def version(self, exe_path):
+        """Version of one interpreter (cached like the rest), or None."""
+        for py in self.interpreters([exe_path]):
+            return py["version"]
+        return None
+
+    def info(self, exe_path):
+        """Cached probe result for one interpreter (see PROBE_SCRIPT), or None."""
+        for py in self.interpreters([exe_path], with_info=True):
+            return py["info"]
+        return None
+
+    def invalidate(self, exe_path):
+        """Drop cached metadata after changing the interpreter (e.g. installing uv)."""
+        with self._entries_lock:
+            entry = self.entries.get(path_key(exe_path))
+            if entry is not None and entry.get("info") is not None:
+                entry["info"] = None
+                self.save()
+
+
+_registry = None
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        _registry = PythonRegistry()
+    return _registry
+
+
+def list_installed_pythons():
+    return get_registry().interpreters()
@@ -0,0 +1,107 @@
+import time
+import random
+import string
+
+# Substring search over a fixed list of records (e.g. the program catalog).
+# Every 1-3 character n-gram of the searched fields is indexed once, so a
+# query only has to look at records that share all of its n-grams.
+
+MAX_GRAM = 3
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class SearchIndex:
+    """Lowercased n-gram index over dict records.
+
+    search() returns the records whose name (or any other field) contains
+    the query, ranked name prefix > name substring > other field, keeping
+    catalog order within each rank. Recent results are kept, so backspacing
+    over a query costs nothing.
+    """
+    def __init__(self, records, fields=("name", "desc"), name_field="name", cache_size=64):
+        self.records = list(records)
+        self.fields = fields
+        self.name_field = name_field
+        self.names = [str(r.get(name_field) or "").lower() for r in self.records]
+        self.texts = ["\n".join(str(r.get(f) or "").lower() for f in fields) for r in self.records]
+        # gram -> record ids, for the name alone and for all fields
+        self.name_postings = self._build(self.names)
+        self.postings = self._build(self.texts)
+        self.cache_size = cache_size
+        self._cache = {}
+
+    @staticmethod
+    def _build(texts):
+        postings = {}
+        for i, text in enumerate(texts):
+            for n in range(1, MAX_GRAM + 1):
+                for gram in _grams(text, n):
+                    postings.setdefault(gram, set()).add(i)
+        return postings
+
+    @staticmethod
+    def _lookup(postings, query, texts):
+        if len(query) <= MAX_GRAM:
+            return postings.get(query, set())
+        # Rarest trigram first keeps the intersection small
+        lists = sorted((postings.get(g, set()) for g in _grams(query, MAX_GRAM)), key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result &= ids
+            if not result:
+                break
+        # n-grams only say the pieces are there; confirm the whole substring
+        return {i for i in result if query in texts[i]}
+
+    def search(self, query):
+        query = query.strip().lower()
+        if not query:
+            return list(self.records)
+        cached = self._cache.get(query)
+        if cached is not None:
+            return cached
+        in_name = self._lookup(self.name_postings, query, self.names)
+        prefix = {i for i in in_name if self.names[i].startswith(query)}
+        hits = self._lookup(self.postings, query, self.texts)
+        ranked = sorted(prefix) + sorted(in_name - prefix) + sorted(hits - in_name)
+        result = [self.records[i] for i in ranked]
+        if len(self._cache) >= self.cache_size:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[query] = result
+        return result
+
+
+def _benchmark(sizes=(100, 1000, 10000), queries=("v", "vi", "vis", "visual", "code editor", "zzz"), repeat=20):
+    """Compare the old linear filter with SearchIndex as the catalog grows."""
+    rng = random.Random(0)
+    words = ["visual", "studio", "code", "editor", "media", "player", "python", "git",
+             "archive", "browser", "driver", "launcher", "toolkit", "manager", "server"]
+    for size in sizes:
+        records = []
+        for i in range(size):
+            name = " ".join(rng.choice(words) for _ in range(2)) + f" {i}"
+            desc = " ".join(rng.choice(words + ["".join(rng.choices(string.ascii_lowercase, k=6))]) for _ in range(8))
+            records.append({"name": name, "desc": desc})
+        start = time.perf_counter()
+        index = SearchIndex(records)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for q in queries:
+                [r for r in records if q in r["name"].lower() or q in r["desc"].lower()]
+        linear = (time.perf_counter() - start) / (repeat * len(queries))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            index._cache.clear()
+            for q in queries:
+                index.search(q)
+        indexed = (time.perf_counter() - start) / (repeat * len(queries))
+        print(f"{size:>6} programs: build {build * 1000:7.1f} ms  "
+              f"linear {linear * 1000:7.3f} ms/query  indexed {indexed * 1000:7.3f} ms/query")
+
+
+if __name__ == "__main__":
+    _benchmark()
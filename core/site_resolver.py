@@ -0,0 +1,235 @@
+import os
+import sys
+import glob
+import json
+import threading
+import importlib
+import importlib.abc
+import importlib.machinery
+
+from core.SettingsManager import get_app_data_dir, atomic_write
+from core.python_registry import get_registry, candidate_paths
+
+# Imports a module the running toolkit doesn't have from another Python
+# installed on the machine. Every site-packages directory of every known
+# interpreter is indexed once by top-level name (cached on disk by
+# directory mtime), and a finder at the end of sys.meta_path loads the
+# module from the one directory that has it. sys.path is left alone.
+
+CACHE_FILE = os.path.join(get_app_data_dir(), 'site_index.json')
+CACHE_VERSION = 1
+
+EXTENSION_SUFFIXES = tuple(importlib.machinery.EXTENSION_SUFFIXES) + (".pyd", ".so")
+SKIP_SUFFIXES = (".dist-info", ".egg-info", ".data", ".pth")
+
+
+def top_level_names(site_dir):
+    """Importable top-level names in one site-packages directory."""
+    names = set()
+    try:
+        entries = list(os.scandir(site_dir))
+    except OSError:
+        return names
+    for entry in entries:
+        name = entry.name
+        if name.startswith((".", "__")) or name.endswith(SKIP_SUFFIXES):
+            continue
+        if entry.is_dir():
+            # Regular and namespace packages
+            if name.isidentifier():
+                names.add(name)
+        elif name.endswith(".py"):
+            names.add(name[:-3])
+        elif name.endswith(EXTENSION_SUFFIXES):
+            # foo.cp312-win_amd64.pyd -> foo
+            names.add(name.split(".")[0])
+    return {n for n in names if n.isidentifier()}
+
+
+def _extra_candidates():
+    # Old-style C:\Python27 / C:\Python313 installs the registry doesn't look for
+    if sys.platform != "win32":
+        return []
+    return glob.glob("C:\\Python*\\python.exe")
+
+
+class SiteIndex:
+    """{top-level name: [site dirs]} over every interpreter's site-packages.
+
+    Directories are ordered with interpreters of the running Python's
+    major.minor first, since their compiled extensions can actually load.
+    """
+    def __init__(self, cache_path=CACHE_FILE):
+        self.cache_path = cache_path
+        self.sites = {}    # site dir -> {"mtime", "names"}
+        self.origins = {}  # site dir -> {"python", "version"}
+        self.order = []
+        self.names = {}
+        self.scan_count = 0
+        self.built = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.sites = data.get("sites", {})
+        except Exception:
+            pass
+
+    def save(self):
+        try:
+            atomic_write(self.cache_path, json.dumps({"version": CACHE_VERSION, "sites": self.sites}))
+        except Exception as e:
+            print(f"Failed to save site-packages index: {e}")
+
+    def discover(self):
+        """[(site dir, interpreter path, version)] outside the running interpreter's sys.path.
+
+        Interpreters of another major version (a leftover C:\\Python27) are
+        skipped: nothing in their site-packages can be imported here.
+        """
+        own = {os.path.normcase(os.path.abspath(p)) for p in sys.path if p}
+        major = f"{sys.version_info[0]}."
+        current = f"{sys.version_info[0]}.{sys.version_info[1]}."
+        registry = get_registry()
+        pythons = registry.interpreters(candidate_paths() + _extra_candidates(), with_info=True)
+        found = []
+        seen = set()
+        for py in pythons:
+            if not (py.get("version") or "").startswith(major):
+                continue
+            info = py.get("info") or {}
+            dirs = list(info.get("site_packages") or [])
+            if info.get("user_site"):
+                dirs.append(info["user_site"])
+            for site_dir in dirs:
+                key = os.path.normcase(os.path.abspath(site_dir))
+                if key in own or key in seen or not os.path.isdir(site_dir):
+                    continue
+                seen.add(key)
+                # The probe's sys.executable tells venvs sharing a base binary apart
+                found.append((site_dir, info.get("executable") or py["path"], py["version"]))
+        found.sort(key=lambda item: not item[2].startswith(current))
+        return found
+
+    def build(self):
+        """Index every discovered directory; only directories whose mtime changed are listed again."""
+        with self._lock:
+            dirty = False
+            self.order = []
+            self.origins = {}
+            self.names = {}
+            for site_dir, python, version in self.discover():
+                try:
+                    mtime = os.path.getmtime(site_dir)
+                except OSError:
+                    continue
+                cached = self.sites.get(site_dir)
+                if not cached or cached.get("mtime") != mtime:
+                    self.scan_count += 1
+                    cached = {"mtime": mtime, "names": sorted(top_level_names(site_dir))}
+                    self.sites[site_dir] = cached
+                    dirty = True
+                self.order.append(site_dir)
+                self.origins[site_dir] = {"python": python, "version": version}
+                for name in cached["names"]:
+                    self.names.setdefault(name, []).append(site_dir)
+            if dirty:
+                self.save()
+            self.built = True
+
+    def lookup(self, name):
+        """Site dirs providing top-level module name, best first."""
+        if not self.built:
+            self.build()
+        return self.names.get(name, [])
+
+
+class SiteFinder(importlib.abc.MetaPathFinder):
+    """Last-resort finder for top-level modules in foreign site-packages.
+
+    Only directories a module was explicitly resolved from are searched, so
+    that module's own dependencies load from the same place and nothing
+    else on the machine leaks into the import system.
+    """
+    def __init__(self, index):
+        self.index = index
+        self.active = []   # site dirs activated by resolve()
+        self.loaded = {}   # top-level module name -> site dir
+
+    def find_spec(self, fullname, path=None, target=None):
+        if path is not None or not self.active:
+            return None  # submodules are found through their package's __path__
+        for site_dir in self.index.names.get(fullname, ()):
+            if site_dir in self.active:
+                spec = importlib.machinery.PathFinder.find_spec(fullname, [site_dir])
+                if spec is not None:
+                    self.loaded[fullname] = site_dir
+                    return spec
+        return None
+
+    def resolve(self, module_name, package_hint=None):
+        """Import module_name from the first indexed directory that has it."""
+        top = (package_hint or module_name).split(".")[0]
+        for site_dir in self.index.lookup(top):
+            added = site_dir not in self.active
+            if added:
+                self.active.append(site_dir)
+            before = set(sys.modules)
+            try:
+                module = importlib.import_module(module_name)
+            except Exception as e:
+                # Not only ImportError: a package built for another Python
+                # can fail with SyntaxError, AttributeError, OSError...
+                print(f"[site_resolver] {module_name} from {site_dir} failed: {e!r}")
+                self._purge(site_dir, set(sys.modules) - before)
+                if added:
+                    self.active.remove(site_dir)
+                    self.loaded = {n: d for n, d in self.loaded.items() if d != site_dir}
+                continue
+            origin = self.origin(module_name)
+            if origin:
+                print(f"[site_resolver] {module_name} loaded from Python {origin['version']} ({origin['python']})")
+            return module
+        raise ImportError(f"No module named '{module_name}' in any installed Python", name=module_name)
+
+    @staticmethod
+    def _purge(site_dir, names):
+        # Drop half-initialised modules a failed import left behind from
+        # site_dir, so the next candidate imports them from scratch
+        prefix = os.path.normcase(os.path.abspath(site_dir)) + os.sep
+        for name in names:
+            module = sys.modules.get(name)
+            files = [getattr(module, "__file__", None)] + list(getattr(module, "__path__", None) or ())
+            if any(f and os.path.normcase(os.path.abspath(f)).startswith(prefix) for f in files):
+                del sys.modules[name]
+
+    def origin(self, module_name):
+        """{"site_dir", "python", "version"} a module was loaded from, or None."""
+        site_dir = self.loaded.get(module_name.split(".")[0])
+        if site_dir is None:
+            return None
+        return dict(self.index.origins.get(site_dir, {}), site_dir=site_dir)
+
+
+_finder = None
+
+
+def get_finder():
+    """The installed SiteFinder, appended to sys.meta_path on first use."""
+    global _finder
+    if _finder is None:
+        _finder = SiteFinder(SiteIndex())
+        sys.meta_path.append(_finder)
+    return _finder
+
+
+def import_from_installed_pythons(module_name, package_hint=None):
+    return get_finder().resolve(module_name, package_hint)
+
+
+def module_origin(module_name):
+    return get_finder().origin(module_name) if _finder is not None else None
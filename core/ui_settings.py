@@ -3,17 +3,19 @@ import os
 import tkinter.filedialog as filedialog
 import tkinter as tk
 from core.emoji import emoji_
-from PIL import Image
+from core.module_registry import ModuleRegistry
+from core.image_cache import image_cache
 
 folder_emoji=emoji_("📁")
 save_emoji=emoji_("💾")
 
 class SettingsTab(ctk.CTkFrame):
 
-    def __init__(self, parent, settings):
+    def __init__(self, parent, settings, registry=None):
         import shutil
         super().__init__(parent, fg_color="transparent")
         self.settings = settings
+        self.registry = registry or ModuleRegistry()
         # --- Tabs for Settings ---
         self.tabs = ctk.CTkTabview(self)
         self.tabs.pack(fill="both", expand=True, padx=20, pady=10)
@@ -22,13 +24,9 @@ class SettingsTab(ctk.CTkFrame):
 
         # --- Mod Configs Tab ---
         mod_configs_tab = self.tabs.add("Mod Configs")
-        mod_configs_frame = ctk.CTkFrame(mod_configs_tab, fg_color="#232323", corner_radius=8)
+        mod_configs_frame = ctk.CTkScrollableFrame(mod_configs_tab, fg_color="#232323", corner_radius=8)
         mod_configs_frame.pack(fill="both", expand=True, padx=30, pady=10)
         ctk.CTkLabel(mod_configs_frame, text="Module Configurations", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w", padx=10, pady=(10, 2))
-        import importlib.util, glob
-        module_files = glob.glob(os.path.join("modules", "*.py"))
-        pyd_files = glob.glob(os.path.join("modules", "*.pyd"))
-        module_files += pyd_files
         # --- Home Page Widget Visibility Section ---
         home_section = ctk.CTkFrame(mod_configs_frame, fg_color="#232323", corner_radius=8)
         home_section.pack(fill="x", padx=10, pady=8)
@@ -36,22 +34,9 @@ class SettingsTab(ctk.CTkFrame):
         # Load current state from settings
         home_widgets_enabled = self.settings.get('home_widgets_enabled', {})
         # List all modules for toggling
-        for mod_path in module_files:
-            mod_name = os.path.splitext(os.path.basename(mod_path))[0]
-            if mod_name.startswith("__"):
-                continue
-            # For .pyd, skip if .py with same name already loaded
-            if mod_path.endswith('.pyd') and os.path.exists(os.path.join("modules", f"{mod_name}.py")):
-                continue
-            spec = importlib.util.spec_from_file_location(mod_name, mod_path)
-            mod = importlib.util.module_from_spec(spec)
-            try:
-                spec.loader.exec_module(mod)
-            except Exception as e:
-                print(f"Failed to load module {mod_name}: {e}")
-                continue
-            mod_disp = getattr(mod, "module_name", mod_name)
-            mod_id = getattr(mod, "module_name", mod_name)
+        for entry in self.registry.modules(source="modules"):
+            mod_disp = entry.name
+            mod_id = entry.name
             row = ctk.CTkFrame(home_section, fg_color="transparent")
             row.pack(fill="x", padx=20, pady=2)
             ctk.CTkLabel(row, text=mod_disp, font=ctk.CTkFont(size=11)).pack(side="left")
@@ -65,6 +50,22 @@ class SettingsTab(ctk.CTkFrame):
             cb = make_callback(mod_id, var)
             ctk.CTkCheckBox(row, variable=var, text="Show on Home", command=cb).pack(side="left", padx=8)
 
+        # --- Per-module options, built from each module's mod_settings schema ---
+        self.option_vars = {}
+        for entry in self.registry.modules():
+            if not entry.mod_settings:
+                continue
+            config = self.settings.namespace(entry.id, entry.mod_settings)
+            section = ctk.CTkFrame(mod_configs_frame, fg_color="#232323", corner_radius=8)
+            section.pack(fill="x", padx=10, pady=8)
+            header = ctk.CTkFrame(section, fg_color="transparent")
+            header.pack(fill="x")
+            ctk.CTkLabel(header, text=entry.name, font=ctk.CTkFont(size=13, weight="bold")).pack(side="left", padx=10)
+            ctk.CTkButton(header, text="Export", width=60, command=lambda ns=entry.id: self.export_namespace(ns), fg_color="#2a8cdb").pack(side="right", padx=4)
+            ctk.CTkButton(header, text="Import", width=60, command=lambda ns=entry.id: self.import_namespace(ns), fg_color="#1f6aa5").pack(side="right", padx=4)
+            for key, spec in entry.mod_settings.items():
+                self.add_option_row(section, config, key, spec)
+
         # FFmpeg Path
         ffmpeg_frame = ctk.CTkFrame(general_tab, fg_color="#232323", corner_radius=8)
         ffmpeg_frame.pack(fill="x", padx=30, pady=10)
@@ -146,41 +147,23 @@ class SettingsTab(ctk.CTkFrame):
         modules_frame = ctk.CTkFrame(modules_tab, fg_color="#232323", corner_radius=8)
         modules_frame.pack(fill="x", padx=30, pady=10)
         ctk.CTkLabel(modules_frame, text="Modules", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w", padx=10, pady=(10, 2))
-        import importlib.util, glob
-        module_files = glob.glob(os.path.join("modules", "*.py"))
-        pyd_files = glob.glob(os.path.join("modules", "*.pyd"))
-        module_files += pyd_files
         module_list = []
-        for mod_path in module_files:
-            mod_name = os.path.splitext(os.path.basename(mod_path))[0]
-            if mod_name.startswith("__"):
-                continue
-            # For .pyd, skip if .py with same name already loaded
-            if mod_path.endswith('.pyd') and os.path.exists(os.path.join("modules", f"{mod_name}.py")):
-                continue
-            spec = importlib.util.spec_from_file_location(mod_name, mod_path)
-            mod = importlib.util.module_from_spec(spec)
-            try:
-                spec.loader.exec_module(mod)
-            except Exception as e:
-                print(f"Failed to load module {mod_name}: {e}")
-                continue
-            mod_name_disp = getattr(mod, "module_name", mod_name)
-            mod_desc = getattr(mod, "module_description", "")
-            mod_version = getattr(mod, "module_version", "?")
-            mod_icon = getattr(mod, "module_icon", None)
-            mod_emoji = getattr(mod, "module_emoji", "🧩")
+        for entry in self.registry.modules(source="modules"):
+            mod_name_disp = entry.name
+            mod_desc = entry.manifest["desc"]
+            mod_version = entry.manifest["version"]
+            mod_icon = entry.manifest["icon"]
+            mod_emoji = entry.manifest["emoji"]
             # Remove spaces from emoji string
             if isinstance(mod_emoji, str):
                 mod_emoji = mod_emoji.replace(" ", "")
-            module_list.append({"name": mod_name_disp, "desc": mod_desc, "version": mod_version, "icon": mod_icon, "emoji": mod_emoji, "id": mod_name})
+            module_list.append({"name": mod_name_disp, "desc": mod_desc, "version": mod_version, "icon": mod_icon, "emoji": mod_emoji, "id": entry.id})
         module_list.sort(key=lambda m: m["name"].lower())
         for mod in module_list:
             row = ctk.CTkFrame(modules_frame, fg_color="transparent")
             row.pack(fill="x", padx=10, pady=4)
-            icon_path = os.path.join("assets", mod["icon"]) if mod["icon"] and os.path.exists(os.path.join("assets", mod["icon"])) else None
-            if icon_path:
-                img = ctk.CTkImage(Image.open(icon_path), size=(32,32))
+            img = image_cache.ctk_image(os.path.join("assets", mod["icon"]), (32,32)) if mod["icon"] else None
+            if img:
                 icon = ctk.CTkLabel(row, image=img, text="")
             else:
                 icon = ctk.CTkLabel(row, text=mod["emoji"], font=ctk.CTkFont(size=20))
@@ -189,3 +172,43 @@ class SettingsTab(ctk.CTkFrame):
             ctk.CTkLabel(row, text=f"v{mod['version']}", font=ctk.CTkFont(size=11)).pack(side="left", padx=(0,8))
             ctk.CTkLabel(row, text=mod["desc"], font=ctk.CTkFont(size=11), text_color="#bbbbbb").pack(side="left", padx=(0,8))
             ctk.CTkButton(row, text="Uninstall", state="disabled",width=10, fg_color="#444444").pack(side="right", padx=4)
+
+    def add_option_row(self, parent, config, key, spec):
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        row.pack(fill="x", padx=20, pady=2)
+        desc = spec.get("desc", key)
+        if spec.get("type") == "bool":
+            var = ctk.BooleanVar(value=bool(config.get(key)))
+            ctk.CTkCheckBox(row, variable=var, text=desc, command=lambda: config.set(key, var.get())).pack(side="left")
+        else:
+            ctk.CTkLabel(row, text=desc, font=ctk.CTkFont(size=11)).pack(side="left")
+            var = ctk.StringVar(value=str(config.get(key, "")))
+            entry = ctk.CTkEntry(row, textvariable=var, width=160)
+            entry.pack(side="right", padx=8)
+            def save(event=None):
+                try:
+                    config.set(key, var.get())
+                except (TypeError, ValueError):
+                    tk.messagebox.showerror("Invalid Value", f"{desc}: expected {spec.get('type', 'a value')}.")
+                    var.set(str(config.get(key, "")))
+            entry.bind("<Return>", save)
+            entry.bind("<FocusOut>", save)
+        self.option_vars[(config.namespace, key)] = var
+
+    def refresh_options(self, namespace):
+        config = self.settings.namespace(namespace)
+        for (ns, key), var in self.option_vars.items():
+            if ns == namespace:
+                value = config.get(key)
+                var.set(value if isinstance(var, ctk.BooleanVar) else str(value))
+
+    def export_namespace(self, namespace):
+        path = filedialog.asksaveasfilename(title="Export Module Settings", initialfile=f"{namespace}.json", defaultextension=".json", filetypes=[("JSON Files", "*.json"), ("All Files", "*")])
+        if path:
+            self.settings.export(path, namespace=namespace)
+
+    def import_namespace(self, namespace):
+        path = filedialog.askopenfilename(title="Import Module Settings", filetypes=[("JSON Files", "*.json"), ("All Files", "*")])
+        if path:
+            self.settings.import_settings(path, namespace=namespace)
+            self.refresh_options(namespace)
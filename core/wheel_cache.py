@@ -0,0 +1,245 @@
+import os
+import re
+import sys
+import html
+import hashlib
+import sysconfig
+import threading
+import subprocess
+import http.server
+import functools
+
+from packaging import tags
+from packaging.utils import parse_wheel_filename, InvalidWheelFilename
+from packaging.version import Version, InvalidVersion
+
+from core.SettingsManager import get_app_data_dir
+from core.python_registry import get_registry
+
+# Local package mirror under the app data folder:
+#   wheels/   every wheel / sdist the toolkit downloaded
+#   simple/   a PEP 503 "simple" index over wheels/, rebuilt after downloads
+# Pinned installs with a wheel matching the target interpreter's tags
+# resolve from here alone (--no-index --find-links), so reinstalls and
+# offline machines work at disk speed; everything else keeps the index
+# and only adds the cache as --find-links. serve_index() puts the same
+# tree behind a local HTTP index for tests.
+
+CACHE_ROOT = os.path.join(get_app_data_dir(), "package_cache")
+ARCHIVE_SUFFIXES = (".whl", ".tar.gz", ".zip")
+PIN_RE = re.compile(r"^[A-Za-z0-9._\-]+(?:\[[^\]]*\])?\s*===?\s*([A-Za-z0-9._+!]+)\s*$")
+
+
+def normalize_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def requirement_name(requirement):
+    # "requests[socks]>=2.31; python_version>'3.8'" -> "requests"
+    return normalize_name(re.split(r"[\s\[<>=!~;@]", requirement.strip(), 1)[0])
+
+
+def pinned_version(requirement):
+    # "requests==2.32.3" -> "2.32.3"; ranges, wildcards and extras-only specs -> None
+    match = PIN_RE.match(requirement.strip())
+    return match.group(1) if match else None
+
+
+def _same_version(version, pin):
+    try:
+        return version == Version(pin)
+    except InvalidVersion:
+        return str(version) == pin
+
+
+def interpreter_tags(python_path=None):
+    """Wheel tags an interpreter accepts, best first.
+
+    None means the running interpreter. Others are described from their
+    cached registry info, sharing this machine's platform tags when they
+    report the same platform.
+    """
+    if python_path is None:
+        return list(tags.sys_tags())
+    info = get_registry().info(python_path) or {}
+    try:
+        version = tuple(int(x) for x in info["version"].split(".")[:2])
+    except (KeyError, ValueError):
+        return []
+    platform = info.get("platform")
+    if not platform or platform == sysconfig.get_platform():
+        platforms = list(tags.platform_tags())
+    else:
+        platforms = [re.sub(r"[-.]", "_", platform)]
+    found = []
+    interpreter = None
+    if info.get("implementation", "CPython") == "CPython":
+        interpreter = "cp%d%d" % version
+        found.extend(tags.cpython_tags(version, abis=[interpreter], platforms=platforms))
+    found.extend(tags.compatible_tags(version, interpreter, platforms))
+    return found
+
+
+def archive_project(filename):
+    """Project name of a wheel or sdist file name, or None."""
+    if filename.endswith(".whl"):
+        return normalize_name(filename.split("-")[0])
+    for suffix in (".tar.gz", ".zip"):
+        if filename.endswith(suffix):
+            name, sep, _ = filename[:-len(suffix)].rpartition("-")
+            return normalize_name(name) if sep else None
+    return None
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class WheelCache:
+    def __init__(self, root=CACHE_ROOT):
+        self.root = root
+        self.wheel_dir = os.path.join(root, "wheels")
+        self.simple_dir = os.path.join(root, "simple")
+        self._lock = threading.Lock()
+        self._hashes = {}  # filename -> (size, mtime, sha256)
+        self._tags = {}    # python_path -> frozenset of accepted tags
+
+    def projects(self):
+        """{normalized project name: [archive file names]}"""
+        found = {}
+        try:
+            names = sorted(os.listdir(self.wheel_dir))
+        except OSError:
+            return found
+        for filename in names:
+            project = archive_project(filename)
+            if project:
+                found.setdefault(project, []).append(filename)
+        return found
+
+    def tags_for(self, python_path=None):
+        key = python_path or sys.executable
+        if key not in self._tags:
+            self._tags[key] = frozenset(interpreter_tags(python_path))
+        return self._tags[key]
+
+    def compatible(self, requirement, python_path=None):
+        """Cached wheels the interpreter can install for requirement (pinned version only if pinned).
+
+        Sdists don't count: building one offline needs its build backend from the index.
+        """
+        accepted = self.tags_for(python_path)
+        pin = pinned_version(requirement)
+        wheels = []
+        for filename in self.projects().get(requirement_name(requirement), []):
+            if not filename.endswith(".whl"):
+                continue
+            try:
+                _, version, _, wheel_tags = parse_wheel_filename(filename)
+            except InvalidWheelFilename:
+                continue
+            if pin is not None and not _same_version(version, pin):
+                continue
+            if accepted & wheel_tags:
+                wheels.append(filename)
+        return wheels
+
+    def has(self, requirements, python_path=None):
+        """True when every requirement has a wheel here that python_path (default: this Python) accepts."""
+        return all(self.compatible(r, python_path) for r in requirements)
+
+    def can_install_offline(self, requirements, python_path=None):
+        # Only pinned specs go straight to the cache; a plain "requests" should still get the newest release
+        return all(pinned_version(r) for r in requirements) and self.has(requirements, python_path)
+
+    def find_links_args(self, offline=False):
+        """Resolver options that read this cache first (accepted by pip and uv)."""
+        args = ["--find-links", self.wheel_dir]
+        return (["--no-index"] + args) if offline else args
+
+    def download_command(self, python_path, requirements):
+        # The target interpreter downloads, so wheel tags match it; already cached files aren't fetched again
+        return [python_path, "-m", "pip", "download", "--dest", self.wheel_dir,
+                "--find-links", self.wheel_dir] + list(requirements)
+
+    def fill(self, python_path, requirements, on_line=None):
+        """Download requirements (with dependencies) into the cache. Returns True on success."""
+        os.makedirs(self.wheel_dir, exist_ok=True)
+        try:
+            proc = subprocess.Popen(self.download_command(python_path, requirements), stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace")
+            for line in proc.stdout:
+                if on_line and line.strip():
+                    on_line(line.rstrip())
+            ok = proc.wait() == 0
+        except Exception as e:
+            if on_line:
+                on_line(f"Wheel cache download failed: {e}")
+            ok = False
+        self.rebuild_index()
+        return ok
+
+    def rebuild_index(self):
+        """Write the PEP 503 simple index for everything in wheels/."""
+        with self._lock:
+            projects = self.projects()
+            os.makedirs(self.simple_dir, exist_ok=True)
+            links = []
+            for project, files in sorted(projects.items()):
+                links.append(f'<a href="{project}/">{html.escape(project)}</a><br/>')
+                project_dir = os.path.join(self.simple_dir, project)
+                os.makedirs(project_dir, exist_ok=True)
+                rows = []
+                for filename in files:
+                    digest = self._hash(filename)
+                    href = f"../../wheels/{filename}#sha256={digest}"
+                    rows.append(f'<a href="{html.escape(href)}">{html.escape(filename)}</a><br/>')
+                self._write(os.path.join(project_dir, "index.html"), project, rows)
+            self._write(os.path.join(self.simple_dir, "index.html"), "Simple index", links)
+
+    def _hash(self, filename):
+        path = os.path.join(self.wheel_dir, filename)
+        st = os.stat(path)
+        cached = self._hashes.get(filename)
+        if cached and cached[:2] == (st.st_size, st.st_mtime):
+            return cached[2]
+        digest = _sha256(path)
+        self._hashes[filename] = (st.st_size, st.st_mtime, digest)
+        return digest
+
+    @staticmethod
+    def _write(path, title, rows):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"<!DOCTYPE html>\n<html><head><meta name=\"pypi:repository-version\" content=\"1.0\">"
+                    f"<title>{html.escape(title)}</title></head><body>\n" + "\n".join(rows) + "\n</body></html>\n")
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_index(root=CACHE_ROOT, host="127.0.0.1", port=0):
+    """Serve the cache as a simple index on a background thread.
+
+    Returns (server, index_url); pass index_url to --index-url and call
+    server.shutdown() when done.
+    """
+    handler = functools.partial(_QuietHandler, directory=root)
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/simple/"
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = WheelCache()
+    return _cache
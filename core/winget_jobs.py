@@ -0,0 +1,201 @@
+import os
+import re
+import shlex
+import queue
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# Runs winget install / uninstall jobs on a small pool and turns their
+# output into structured events. Nothing here touches Tk: the UI drains
+# events() from its own after() loop. Set KTOOLKIT_WINGET to run a different
+# executable (e.g. "python3 fake_winget.py" on Linux).
+
+WINGET_COMMAND = os.environ.get("KTOOLKIT_WINGET", "winget")
+DEFAULT_CONCURRENCY = 2
+LOG_LINES = 200
+
+# "45%", or a download bar ending in "1.50 MB / 3.00 MB"
+PERCENT_RE = re.compile(r'(\d{1,3}(?:\.\d+)?)\s*%')
+SIZE_RE = re.compile(r'([\d.]+)\s*([KMG]?B)\s*/\s*([\d.]+)\s*([KMG]?B)')
+# Spinner frames and lines made only of bar glyphs
+NOISE_RE = re.compile(r'^[\s\-\\|/]*$|^[^\x00-\x7f]+$')
+LINE_SPLIT_RE = re.compile(r'[\r\n]')
+# winget install/import announce each package with "Found <name> [<id>]"
+STEP_RE = re.compile(r'^Found .+ \[[^\]]+\]')
+
+UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def winget_command():
+    return shlex.split(WINGET_COMMAND, posix=os.name != "nt")
+
+
+def parse_progress(line):
+    """Return the percentage a winget output line reports, or None."""
+    match = SIZE_RE.search(line)
+    if match:
+        done = float(match.group(1)) * UNITS[match.group(2)]
+        total = float(match.group(3)) * UNITS[match.group(4)]
+        if total > 0:
+            return min(100.0, done * 100.0 / total)
+    match = PERCENT_RE.search(line)
+    if match:
+        return min(100.0, float(match.group(1)))
+    return None
+
+
+class WingetJob:
+    def __init__(self, job_id, args, title, steps=1):
+        self.id = job_id
+        self.args = list(args)
+        self.title = title
+        self.status = QUEUED
+        self.progress = None
+        # Packages in the job (winget import); progress covers all of them
+        self.steps = max(1, steps)
+        self.step = 0
+        self.lines = []  # last LOG_LINES lines
+        self.line_count = 0
+        self.returncode = None
+        self.proc = None
+        self.cancelled = False
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+
+class WingetScheduler:
+    """Queue of winget jobs run `concurrency` at a time.
+
+    winget itself serialises the install step, but downloads, hash checks
+    and uninstalls of other packages overlap. Worker threads only post
+    events; events() hands them to the UI thread batched, with progress
+    coalesced to the latest value per job.
+    """
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, command=None):
+        self.concurrency = max(1, int(concurrency))
+        self.command = command or winget_command()
+        self.jobs = []
+        self.on_finished = []  # callbacks(job), called from the worker thread
+        self._events = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="winget")
+        self._lock = threading.Lock()
+
+    def submit(self, args, title="Operation", steps=1):
+        with self._lock:
+            job = WingetJob(len(self.jobs) + 1, args, title, steps)
+            self.jobs.append(job)
+        self._post(job, "status", QUEUED)
+        self._executor.submit(self._run, job)
+        return job
+
+    def cancel(self, job):
+        job.cancelled = True
+        if job.proc is not None and job.proc.poll() is None:
+            job.proc.terminate()
+
+    def pending(self):
+        return [job for job in self.jobs if not job.finished]
+
+    def _post(self, job, kind, value):
+        self._events.put((job, kind, value))
+
+    def events(self):
+        """Drain queued events: [(job, kind, value)], one progress event per job."""
+        events = []
+        progress = {}
+        while True:
+            try:
+                job, kind, value = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if job.id in progress:
+                    events[progress[job.id]] = (job, kind, value)
+                    continue
+                progress[job.id] = len(events)
+            events.append((job, kind, value))
+        return events
+
+    def _set_status(self, job, status):
+        job.status = status
+        self._post(job, "status", status)
+
+    def _run(self, job):
+        if job.cancelled:
+            self._finish(job, CANCELLED)
+            return
+        self._set_status(job, RUNNING)
+        try:
+            job.proc = subprocess.Popen(self.command + job.args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            self._read_output(job)
+            job.returncode = job.proc.wait()
+        except Exception as e:
+            self._add_line(job, f"Exception: {e}")
+            self._finish(job, FAILED)
+            return
+        if job.cancelled:
+            self._finish(job, CANCELLED)
+        else:
+            self._finish(job, DONE if job.returncode == 0 else FAILED)
+
+    def _read_output(self, job):
+        # winget redraws its bars with \r, so split on both \r and \n
+        fd = job.proc.stdout.fileno()
+        buffer = ""
+        last_line = None
+        while True:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            parts = LINE_SPLIT_RE.split(buffer + chunk.decode("utf-8", errors="replace"))
+            buffer = parts.pop()
+            for line in parts:
+                last_line = self._handle_line(job, line, last_line)
+        if buffer:
+            self._handle_line(job, buffer, last_line)
+
+    def _handle_line(self, job, line, last_line):
+        line = line.strip()
+        if not line or NOISE_RE.match(line):
+            return last_line
+        if STEP_RE.match(line):
+            job.step = min(job.step + 1, job.steps)
+        percent = parse_progress(line)
+        if percent is not None:
+            job.progress = (max(job.step - 1, 0) + percent / 100.0) * 100.0 / job.steps
+            self._post(job, "progress", percent)
+            return last_line
+        if line == last_line:
+            return last_line
+        self._add_line(job, line)
+        return line
+
+    def _add_line(self, job, line):
+        job.lines.append(line)
+        job.line_count += 1
+        del job.lines[:-LOG_LINES]
+        self._post(job, "line", line)
+
+    def _finish(self, job, status):
+        if status == DONE:
+            job.progress = 100.0
+        self._set_status(job, status)
+        for callback in self.on_finished:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"winget job callback failed: {e}")
+
+    def shutdown(self):
+        for job in self.pending():
+            self.cancel(job)
+        self._executor.shutdown(wait=False)
@@ -124,7 +124,10 @@ class MCFSModuleUI(ctk.CTkFrame):
 
         self.file_path = ctk.StringVar()
         self.password = ctk.StringVar()
-        self.recovery = ctk.IntVar(value=0)
+        self.settings = settings
+        config = settings.namespace("mcfs_module", mod_settings) if settings else None
+        default_recovery = config.get("default_recovery_percent") if config else mod_settings["default_recovery_percent"]["default"]
+        self.recovery = ctk.IntVar(value=default_recovery)
         self.mode = ctk.StringVar(value="encrypt")
         self.output_dir = ctk.StringVar()
 
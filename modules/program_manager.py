@@ -3,12 +3,14 @@ import tkinter.filedialog as filedialog
 import tkinter.simpledialog as simpledialog
 import tkinter.messagebox as messagebox
 import threading
+import queue
 import os
 import subprocess
-from PIL import Image
+import textwrap
 import certifi
 import ssl
 from core.emoji import emoji_
+from core.image_cache import image_cache
 
 # --- Module Metadata ---
 module_name = "Program Manager"
@@ -30,6 +32,11 @@ mod_settings = {
         "type": "bool",
         "default": False,
         "desc": "Show hidden/system programs"
+    },
+    "winget_concurrency": {
+        "type": "int",
+        "default": 2,
+        "desc": "winget jobs run at the same time"
     }
 }
 
@@ -41,16 +48,218 @@ settings_config = mod_settings
 ModuleUI = None  # Set to your UI class if exists
 
 # Use program detection logic from core_utilities
-from core import program_detection
+from core import program_detection, program_catalog
+from core.program_watcher import ProgramWatcher
+from core.search_index import SearchIndex
+from core import winget_jobs, install_profiles
+from core.package_transactions import PackageTransaction
 
 folder_emoji = emoji_("📁")
 trash_emoji = emoji_("     🗑️")
 reinstall_emoji = emoji_("     ♻️")
 install_emoji = emoji_("📥")
+default_icon = emoji_("🛠️", 48)
 
 os.environ['SSL_CERT_FILE'] = certifi.where()
 ssl._create_default_https_context = ssl.create_default_context
 
+# Virtualized grid: a fixed pool of panels is placed by scroll offset and
+# rebound to whichever programs are visible, instead of one widget tree per program
+PANEL_COLUMNS = 2
+ROW_HEIGHT = 204  # panel height + vertical padding
+PANEL_PAD = 12
+SCROLL_STEP = 60
+SEARCH_DELAY_MS = 150
+
+
+class ProgramPanel(ctk.CTkFrame):
+    """One reusable program card; bind_program() swaps the data it shows."""
+    def __init__(self, parent, manager):
+        super().__init__(parent, fg_color="#232323", corner_radius=18, border_width=2, border_color="#444444")
+        self.manager = manager
+        self.prog = None
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(4, weight=1)
+        self.icon = ctk.CTkLabel(self, text="", image=default_icon)
+        self.icon.grid(row=0, column=0, rowspan=2, padx=12, pady=8, sticky="nw")
+        # Name & Description
+        self.name_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=16, weight="bold"))
+        self.name_label.grid(row=0, column=1, sticky="nw", padx=(0,8), pady=(8,0))
+        self.desc_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=12), wraplength=220, justify="left")
+        self.desc_label.grid(row=1, column=1, sticky="nw", padx=(0,8))
+        # Path & status (wrap long paths)
+        self.path_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=11), text_color="#bbbbbb", justify="left", wraplength=320)
+        self.path_label.grid(row=2, column=0, columnspan=2, sticky="w", padx=12, pady=(4,0))
+        # Buttons
+        btn_frame = ctk.CTkFrame(self, fg_color="transparent")
+        btn_frame.grid(row=3, column=0, columnspan=2, pady=(6,2), padx=8, sticky="ew")
+        btn_frame.grid_columnconfigure((0,1,2,3), weight=1)
+        btn_style = {"height":32, "width":60, "corner_radius":8, "font":ctk.CTkFont(size=13), "fg_color":"transparent", "hover_color":"#232323"}
+        ctk.CTkButton(btn_frame, text="", image=install_emoji, command=lambda: self.manager.install_program(self.prog), **btn_style).grid(row=0, column=0, padx=2, pady=0, sticky="ew")
+        ctk.CTkButton(btn_frame, text="", image=reinstall_emoji, command=lambda: self.manager.reinstall_program(self.prog), **btn_style).grid(row=0, column=1, padx=2, pady=0, sticky="ew")
+        ctk.CTkButton(btn_frame, text="", image=trash_emoji, command=lambda: self.manager.uninstall_program(self.prog), **btn_style).grid(row=0, column=2, padx=2, pady=0, sticky="ew")
+        ctk.CTkButton(btn_frame, text="Open", width=70, height=32, corner_radius=8, font=ctk.CTkFont(size=13), fg_color="transparent", hover_color="#232323", command=lambda: self.manager.open_program(self.prog)).grid(row=0, column=3, padx=2, pady=0, sticky="ew")
+
+    def bind_program(self, prog):
+        if prog is self.prog:
+            self.update_path()
+            return
+        self.prog = prog
+        self.icon.configure(image=self.manager.icon_image(prog.get("icon")))
+        self.name_label.configure(text=prog["name"])
+        self.desc_label.configure(text=prog["desc"])
+        self.update_path()
+
+    def update_path(self):
+        text = self.manager.path_text(self.prog["name"])
+        if text != self.path_label.cget("text"):
+            self.path_label.configure(text=text)
+
+
+class WingetQueueWindow(ctk.CTkToplevel):
+    """One window listing every winget job; the log below follows the selected job."""
+    def __init__(self, parent, scheduler):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.title("winget Jobs")
+        self.geometry("620x440")
+        self.resizable(True, True)
+        self.rows = {}
+        self.selected = None
+        self.shown_lines = 0
+        self.footer_shown = False
+        self.list_frame = ctk.CTkScrollableFrame(self, height=180)
+        self.list_frame.pack(fill="x", padx=10, pady=(10, 4))
+        self.list_frame.grid_columnconfigure(0, weight=1)
+        self.log = ctk.CTkTextbox(self, font=ctk.CTkFont(size=12), state="disabled")
+        self.log.pack(fill="both", expand=True, padx=10, pady=4)
+        ctk.CTkButton(self, text="Close", command=self.withdraw).pack(pady=(0, 10))
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        for job in scheduler.jobs:
+            self.add_row(job)
+        if scheduler.jobs:
+            self.select(scheduler.jobs[-1])
+
+    def add_row(self, job):
+        row = ctk.CTkFrame(self.list_frame, fg_color="#232323", corner_radius=8)
+        row.grid(row=job.id, column=0, sticky="ew", padx=4, pady=3)
+        row.grid_columnconfigure(1, weight=1)
+        title = ctk.CTkButton(row, text=job.title, anchor="w", fg_color="transparent", hover_color="#2a2a2a",
+                              font=ctk.CTkFont(size=13, weight="bold"), command=lambda: self.select(job))
+        title.grid(row=0, column=0, sticky="w", padx=6)
+        bar = ctk.CTkProgressBar(row)
+        bar.grid(row=0, column=1, sticky="ew", padx=6)
+        status = ctk.CTkLabel(row, text="", width=90, font=ctk.CTkFont(size=11))
+        status.grid(row=0, column=2, padx=6)
+        cancel = ctk.CTkButton(row, text="Cancel", width=60, fg_color="#444444", command=lambda: self.scheduler.cancel(job))
+        cancel.grid(row=0, column=3, padx=6, pady=4)
+        self.rows[job.id] = {"bar": bar, "status": status, "cancel": cancel}
+        self.update_row(job)
+
+    def update_row(self, job):
+        row = self.rows[job.id]
+        row["bar"].set((job.progress or 0) / 100)
+        text = job.status if job.progress is None or job.finished else f"{job.progress:.0f}%"
+        row["status"].configure(text=text)
+        if job.finished:
+            row["cancel"].configure(state="disabled")
+
+    def select(self, job):
+        self.selected = job
+        self.shown_lines = job.line_count
+        self.footer_shown = False
+        self.log.configure(state="normal")
+        self.log.delete("1.0", "end")
+        self.log.insert("end", f"Running: winget {' '.join(job.args)}\n\n")
+        self.log.insert("end", "".join(line + "\n" for line in job.lines))
+        self.log.configure(state="disabled")
+        self.sync_log()
+
+    def sync_log(self):
+        # Append whatever the selected job printed since the last sync
+        job = self.selected
+        if job is None:
+            return
+        text = ""
+        new = min(job.line_count - self.shown_lines, len(job.lines))
+        if new > 0:
+            text += "".join(line + "\n" for line in job.lines[-new:])
+            self.shown_lines = job.line_count
+        if job.finished and not self.footer_shown:
+            text += "\nSuccess!\n" if job.status == winget_jobs.DONE else f"\n{job.status.capitalize()} (code {job.returncode})\n"
+            self.footer_shown = True
+        if text:
+            self.log.configure(state="normal")
+            self.log.insert("end", text)
+            self.log.see("end")
+            self.log.configure(state="disabled")
+
+    def apply(self, events):
+        for job, kind, value in events:
+            if job.id not in self.rows:
+                # Newest job takes over the log
+                self.add_row(job)
+                self.select(job)
+            else:
+                self.update_row(job)
+        self.sync_log()
+
+
+class ProfileWindow(ctk.CTkToplevel):
+    """Pick or edit an install profile and install what's missing in one job."""
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.manager = manager
+        self.title("Install Profiles")
+        self.geometry("420x520")
+        self.profiles = install_profiles.load_profiles(manager.settings)
+        top = ctk.CTkFrame(self, fg_color="transparent")
+        top.pack(fill="x", padx=10, pady=(10, 4))
+        self.profile_var = ctk.StringVar(value=next(iter(self.profiles), ""))
+        self.profile_menu = ctk.CTkOptionMenu(top, variable=self.profile_var, values=list(self.profiles), command=lambda _: self.load_selection())
+        self.profile_menu.pack(side="left", fill="x", expand=True)
+        ctk.CTkButton(top, text="Save as…", width=80, command=self.save_as).pack(side="left", padx=(6, 0))
+        self.list_frame = ctk.CTkScrollableFrame(self)
+        self.list_frame.pack(fill="both", expand=True, padx=10, pady=4)
+        self.vars = {}
+        for prog in manager.programs:
+            var = ctk.BooleanVar(value=False)
+            ctk.CTkCheckBox(self.list_frame, text=self.program_label(prog), variable=var).pack(anchor="w", pady=2)
+            self.vars[prog["name"]] = var
+        self.summary = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=11), text_color="#bbbbbb", justify="left")
+        self.summary.pack(fill="x", padx=10)
+        ctk.CTkButton(self, text="Install profile", fg_color="#2a8cdb", command=self.install).pack(pady=10)
+        self.load_selection()
+
+    def program_label(self, prog):
+        return f"{prog['name']}  (installed)" if self.manager.detected.get(prog["name"]) else prog["name"]
+
+    def selection(self):
+        return [name for name, var in self.vars.items() if var.get()]
+
+    def load_selection(self):
+        members = set(self.profiles.get(self.profile_var.get(), []))
+        for name, var in self.vars.items():
+            var.set(name in members)
+        plan = install_profiles.plan_profile(self.selection(), self.manager.detected)
+        self.summary.configure(text=f"{len(plan['install'])} to install, {len(plan['skipped'])} already installed, "
+                                    f"{len(plan['manual'])} manual")
+
+    def save_as(self):
+        name = simpledialog.askstring("Save Profile", "Profile name:", initialvalue=self.profile_var.get(), parent=self)
+        if not name:
+            return
+        install_profiles.save_profile(self.manager.settings, name, self.selection())
+        self.profiles = install_profiles.load_profiles(self.manager.settings)
+        self.profile_menu.configure(values=list(self.profiles))
+        self.profile_var.set(name)
+        self.load_selection()
+
+    def install(self):
+        self.manager.install_profile(self.profile_var.get(), self.selection())
+        self.destroy()
+
+
 class ProgramManagerUI(ctk.CTkFrame):
     def __init__(self, parent, settings=None):
         super().__init__(parent, fg_color="transparent")
@@ -67,276 +276,221 @@ class ProgramManagerUI(ctk.CTkFrame):
         ctk.CTkLabel(search_frame, text="Search:", font=ctk.CTkFont(size=13)).pack(side="left", padx=(0, 6))
         search_entry = ctk.CTkEntry(search_frame, textvariable=self.search_var, width=220)
         search_entry.pack(side="left", padx=(0, 6))
-        search_entry.bind("<KeyRelease>", lambda e: self.refresh_programs())
-
-        # Improved scrollable frame for program panels
-        self.scrollable = ctk.CTkScrollableFrame(self, fg_color="transparent", width=1, height=1)
-        self.scrollable.pack(fill="both", expand=True, padx=8, pady=8, anchor="nw")
-        self.scrollable.grid_columnconfigure((0,1), weight=1)
-        self.scrollable.grid_rowconfigure(0, weight=1)
-
-        # List of programs to manage (with icons, winget ids, etc.)
-        self.programs = [
-            {
-                "name": "FFmpeg",
-                "desc": "Required for video/audio processing.",
-                "exe": "ffmpeg.exe",
-                "winget": "Gyan.FFmpeg",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Everything",
-                "desc": "Ultra-fast file search for Windows.",
-                "exe": "Everything.exe",
-                "winget": "voidtools.Everything",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "7-Zip",
-                "desc": "Popular file archiver.",
-                "exe": "7z.exe",
-                "winget": "7zip.7zip",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "VLC",
-                "desc": "Versatile media player.",
-                "exe": "vlc.exe",
-                "winget": "VideoLAN.VLC",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Reg Organizer",
-                "desc": "Advanced system utility for Windows registry.",
-                "exe": "RegOrganizer.exe",
-                "winget": "ChemTableSoftware.RegOrganizer",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "WizTree",
-                "desc": "Disk space analyzer.",
-                "exe": "WizTree64.exe",
-                "winget": "AntibodySoftware.WizTree",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Prism Launcher",
-                "desc": "Minecraft launcher.",
-                "exe": "PrismLauncher.exe",
-                "winget": "PrismLauncher.PrismLauncher",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "IntelliJ IDEA",
-                "desc": "Java IDE by JetBrains.",
-                "exe": "idea64.exe",
-                "winget": "JetBrains.IntelliJIDEA.Community",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Visual Studio Code",
-                "desc": "Popular code editor.",
-                "exe": "Code.exe",
-                "winget": "Microsoft.VisualStudioCode",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Visual Studio 2022",
-                "desc": "Advanced code editor.",
-                "exe": "devenv.exe",
-                "winget": "Microsoft.VisualStudio.2022.Community",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "SkyClient",
-                "desc": "Minecraft modpack installer.",
-                "exe": "SkyClient.exe",
-                "winget": None,
-                "icon": "assets/icon.png",
-                "Source": "https://github.com/SkyblockClient/SkyClient-Windows/releases/latest"
-            },
-            {
-                "name": "Discord",
-                "desc": "Popular chat and voice app.",
-                "exe": "Discord.exe",
-                "winget": "Discord.Discord",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Google Chrome",
-                "desc": "Web browser by Google.",
-                "exe": "chrome.exe",
-                "winget": "Google.Chrome",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Opera GX",
-                "desc": "Gaming web browser by Opera.",
-                "exe": "opera.exe",
-                "winget": "Opera.OperaGX",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Brave",
-                "desc": "Privacy-focused web browser.",
-                "exe": "brave.exe",
-                "winget": "Brave.Brave",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "WinSCP",
-                "desc": "SFTP client and FTP client for Windows.",
-                "exe": "WinSCP.exe",
-                "winget": "WinSCP.WinSCP",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "K-Lite Codec Pack Mega",
-                "desc": "Comprehensive codec pack.",
-                "exe": "klcp_mega.exe",
-                "winget": "CodecGuide.K-LiteCodecPack.Mega",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Python",
-                "desc": "Install multiple Python versions (3.8.x - 3.13.x) with pip and tk.",
-                "exe": "python.exe",
-                "winget": "Python.Python.3",
-                "icon": "assets/icon.png",
-                "python_multi": True
-            },
-            {
-                "name": "Eclipse Temurin JDK 8",
-                "desc": "Eclipse Adoptium OpenJDK 8.",
-                "exe": "java.exe",
-                "winget": "EclipseAdoptium.Temurin.8.JDK",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Eclipse Temurin JDK 11",
-                "desc": "Eclipse Adoptium OpenJDK 11.",
-                "exe": "java.exe",
-                "winget": "EclipseAdoptium.Temurin.11.JDK",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Eclipse Temurin JDK 17",
-                "desc": "Eclipse Adoptium OpenJDK 17.",
-                "exe": "java.exe",
-                "winget": "EclipseAdoptium.Temurin.17.JDK",
-                "icon": "assets/icon.png"
-            },
-            {
-                "name": "Eclipse Temurin JDK 21",
-                "desc": "Eclipse Adoptium OpenJDK 21.",
-                "exe": "java.exe",
-                "winget": "EclipseAdoptium.Temurin.21.JDK",
-                "icon": "assets/icon.png"
-            },
-        ]
-
-        # Detect installed programs at startup
-        program_names = [prog["name"] for prog in self.programs]
-        self.detected = program_detection.detect_programs_by_name(program_names)
+        ctk.CTkButton(search_frame, text="Jobs", width=70, command=self.show_queue).pack(side="right")
+        ctk.CTkButton(search_frame, text="Profiles", width=70, command=lambda: ProfileWindow(self)).pack(side="right", padx=(0, 6))
+        # One filter pass per typing pause instead of one per key
+        search_entry.bind("<KeyRelease>", lambda e: self.schedule_search())
+        self.search_job = None
 
-        self.refresh_programs()
+        # Virtualized program grid: viewport + scrollbar, panels are placed by hand
+        grid_frame = ctk.CTkFrame(self, fg_color="transparent")
+        grid_frame.pack(fill="both", expand=True, padx=8, pady=8, anchor="nw")
+        self.scrollbar = ctk.CTkScrollbar(grid_frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.viewport = ctk.CTkFrame(grid_frame, fg_color="transparent")
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.viewport.bind("<Configure>", lambda e: self.render())
+        # Added next to CTkScrollableFrame's own bind_all handler, filtered to the viewport
+        self.viewport.bind_all("<MouseWheel>", self.on_mousewheel, add="+")
+        self.panel_pool = []
+        self.panel_by_name = {}
+        self.scroll_offset = 0
 
-    def refresh_programs(self):
-        # Clear previous widgets
-        for widget in self.scrollable.winfo_children():
-            widget.destroy()
-        # Filter by search
-        query = self.search_var.get().lower()
-        filtered = [p for p in self.programs if query in p["name"].lower() or query in p["desc"].lower()]
-        # Two per row
-        for i, prog in enumerate(filtered):
-            col = i % 2
-            row = i // 2
-            panel = ctk.CTkFrame(self.scrollable, fg_color="#232323", corner_radius=18, border_width=2, border_color="#444444")
-            panel.grid(row=row, column=col, padx=12, pady=12, sticky="nsew")
-            panel.grid_columnconfigure(1, weight=1)
-            panel.grid_rowconfigure(4, weight=1)
-            panel.configure(width=370, height=180)
-            # Icon (placeholder, can load from file if available)
-            icon_path = prog.get("icon")
-            if icon_path and os.path.exists(icon_path):
-                img = ctk.CTkImage(Image.open(icon_path), size=(48,48))
-                icon = ctk.CTkLabel(panel, image=img, text="")
-            else:
-                icon = ctk.CTkLabel(panel, text="🛠️", font=ctk.CTkFont(size=32))
-            icon.grid(row=0, column=0, rowspan=2, padx=12, pady=8, sticky="nw")
-            # Name & Description
-            ctk.CTkLabel(panel, text=prog["name"], font=ctk.CTkFont(size=16, weight="bold")).grid(row=0, column=1, sticky="nw", padx=(0,8), pady=(8,0))
-            ctk.CTkLabel(panel, text=prog["desc"], font=ctk.CTkFont(size=12), wraplength=220, justify="left").grid(row=1, column=1, sticky="nw", padx=(0,8))
-            # Path & status (wrap long paths)
-            detected_path = self.detected.get(prog["name"])
-            path_str = detected_path if detected_path else "Not installed"
-            import textwrap
-            wrapped_path = "\n".join(textwrap.wrap(str(path_str), width=42))
-            ctk.CTkLabel(panel, text=f"Path: {wrapped_path}", font=ctk.CTkFont(size=11), text_color="#bbbbbb", justify="left", wraplength=320).grid(row=2, column=0, columnspan=2, sticky="w", padx=12, pady=(4,0))
-            # Buttons
-            btn_frame = ctk.CTkFrame(panel, fg_color="transparent")
-            btn_frame.grid(row=3, column=0, columnspan=2, pady=(6,2), padx=8, sticky="ew")
-            btn_frame.grid_columnconfigure((0,1,2,3), weight=1)
-            btn_style = {"height":32, "width":60, "corner_radius":8, "font":ctk.CTkFont(size=13), "fg_color":"transparent", "hover_color":"#232323"}
-            ctk.CTkButton(btn_frame, text="", image=install_emoji, command=lambda p=prog: self.install_program(p), **btn_style).grid(row=0, column=0, padx=2, pady=0, sticky="ew")
-            ctk.CTkButton(btn_frame, text="", image=reinstall_emoji, command=lambda p=prog: self.reinstall_program(p), **btn_style).grid(row=0, column=1, padx=2, pady=0, sticky="ew")
-            ctk.CTkButton(btn_frame, text="", image=trash_emoji, command=lambda p=prog: self.uninstall_program(p), **btn_style).grid(row=0, column=2, padx=2, pady=0, sticky="ew")
-            ctk.CTkButton(btn_frame, text="Open", width=70, height=32, corner_radius=8, font=ctk.CTkFont(size=13), fg_color="transparent", hover_color="#232323", command=lambda p=prog: self.open_program(p)).grid(row=0, column=3, padx=2, pady=0, sticky="ew")
+        # List of programs to manage (with icons, winget ids, etc.), from core/program_catalog.json
+        self.programs = program_catalog.load_catalog().manager_entries()
+        self.filtered = self.programs
+        self.search_index = SearchIndex(self.programs)
 
-    def run_winget_command(self, args, title="Operation"):
-        progress_win = ctk.CTkToplevel(self)
-        progress_win.title(title)
-        progress_win.geometry("600x400")
-        progress_win.resizable(True, True)
-        progress_text = ctk.CTkTextbox(progress_win, width=580, height=340, font=ctk.CTkFont(size=12))
-        progress_text.pack(padx=10, pady=10, fill="both", expand=True)
-        progress_text.insert("end", f"Running: winget {' '.join(args)}\n\n")
-        progress_text.configure(state="disabled")
-        close_btn = ctk.CTkButton(progress_win, text="Close", state="disabled", command=progress_win.destroy)
-        close_btn.pack(pady=(0,10))
+        # Detect installed programs in the background; panels fill in as results arrive
+        self.detected = {}
+        self.detect_queue = queue.Queue()
+        self.detecting = True
+        self.watcher = None
+
+        # winget install/uninstall jobs, run a few at a time
+        self.config = settings.namespace("program_manager", mod_settings) if settings else None
+        concurrency = self.config.get("winget_concurrency") if self.config else winget_jobs.DEFAULT_CONCURRENCY
+        self.jobs = winget_jobs.WingetScheduler(concurrency)
+        self.jobs.on_finished.append(self.on_job_finished)
+        self.queue_window = None
+        self.jobs_polling = False
 
+        self.refresh_programs()
+        self.start_detection()
+
+    def start_detection(self):
+        program_names = [prog["name"] for prog in self.programs]
         def worker():
             try:
-                cmd = ["winget"] + args
-                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=1)
-                last_line = ""
-                for raw_line in proc.stdout:
-                    try:
-                        line = raw_line.decode("utf-8", errors="replace") if isinstance(raw_line, bytes) else raw_line
-                    except Exception:
-                        line = str(raw_line)
-                    # Filter out lines that are just progress bars or spinners
-                    if (set(line.strip()) <= set(" -\\|/") or
-                        all(ord(c) > 127 for c in line.strip()) or
-                        not line.strip()):
-                        continue
-                    # Collapse repeated lines
-                    if line.strip() == last_line.strip():
-                        continue
-                    last_line = line
-                    progress_text.configure(state="normal")
-                    progress_text.insert("end", line)
-                    progress_text.see("end")
-                    progress_text.configure(state="disabled")
-                proc.wait()
-                progress_text.configure(state="normal")
-                if proc.returncode == 0:
-                    progress_text.insert("end", f"\nSuccess!\n")
-                else:
-                    progress_text.insert("end", f"\nError (code {proc.returncode})\n")
-                progress_text.configure(state="disabled")
-                close_btn.configure(state="normal")
+                for name, path in program_detection.iter_detect_programs(program_names):
+                    self.detect_queue.put((name, path))
             except Exception as e:
-                progress_text.configure(state="normal")
-                progress_text.insert("end", f"Exception: {e}\n")
-                progress_text.configure(state="disabled")
-                close_btn.configure(state="normal")
+                print(f"Program detection failed: {e}")
+            self.detect_queue.put(None)
         threading.Thread(target=worker, daemon=True).start()
+        self.after(100, self.poll_detection)
+
+    def poll_detection(self):
+        try:
+            while True:
+                item = self.detect_queue.get_nowait()
+                if item is None:
+                    self.detecting = False
+                    # Anything not reported is not installed
+                    for panel in self.panel_by_name.values():
+                        panel.update_path()
+                    self.start_watcher()
+                    continue
+                name, path = item
+                self.detected[name] = path
+                self.update_path_label(name)
+        except queue.Empty:
+            pass
+        self.after(100 if self.detecting else 250, self.poll_detection)
+
+    def start_watcher(self):
+        # Install/uninstall changes re-detect only the affected programs
+        def on_change(results):
+            for name, path in results.items():
+                self.detect_queue.put((name, path))
+        self.watcher = ProgramWatcher([prog["name"] for prog in self.programs], on_change, detected=self.detected)
+        self.watcher.start()
+
+    def path_text(self, name):
+        if name not in self.detected and self.detecting:
+            return "Path: Detecting…"
+        path_str = self.detected.get(name) or "Not installed"
+        return "Path: " + "\n".join(textwrap.wrap(str(path_str), width=42))
+
+    def update_path_label(self, name):
+        panel = self.panel_by_name.get(name)
+        if panel is not None:
+            panel.update_path()
+
+    def icon_image(self, icon_path):
+        img = image_cache.ctk_image(icon_path, (48,48)) if icon_path else None
+        return img or default_icon
+
+    def schedule_search(self, delay=SEARCH_DELAY_MS):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(delay, self.refresh_programs)
+
+    def refresh_programs(self):
+        # Filter by search (ranked: name prefix, name, description), then rebind the panel pool from the top
+        self.search_job = None
+        self.filtered = self.search_index.search(self.search_var.get())
+        self.scroll_offset = 0
+        self.render()
+
+    def content_height(self):
+        rows = (len(self.filtered) + PANEL_COLUMNS - 1) // PANEL_COLUMNS
+        return rows * ROW_HEIGHT
+
+    def render(self):
+        width = self.viewport.winfo_width()
+        height = self.viewport.winfo_height()
+        if width <= 1 or height <= 1:
+            return  # Not mapped yet; <Configure> renders again
+        total = self.content_height()
+        self.scroll_offset = max(0, min(self.scroll_offset, total - height))
+        # Enough panels for every row that can be partly visible
+        needed = (height // ROW_HEIGHT + 2) * PANEL_COLUMNS
+        while len(self.panel_pool) < needed:
+            self.panel_pool.append(ProgramPanel(self.viewport, self))
+        col_width = (width - PANEL_PAD * (PANEL_COLUMNS + 1)) // PANEL_COLUMNS
+        first = (self.scroll_offset // ROW_HEIGHT) * PANEL_COLUMNS
+        self.panel_by_name = {}
+        for i, panel in enumerate(self.panel_pool):
+            idx = first + i
+            if i >= needed or idx >= len(self.filtered):
+                panel.place_forget()
+                continue
+            prog = self.filtered[idx]
+            panel.bind_program(prog)
+            self.panel_by_name[prog["name"]] = panel
+            row, col = divmod(idx, PANEL_COLUMNS)
+            panel.place(x=PANEL_PAD + col * (col_width + PANEL_PAD), y=row * ROW_HEIGHT - self.scroll_offset + PANEL_PAD,
+                        width=col_width, height=ROW_HEIGHT - PANEL_PAD * 2)
+        if total > height:
+            self.scrollbar.set(self.scroll_offset / total, (self.scroll_offset + height) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, offset):
+        self.scroll_offset = int(offset)
+        self.render()
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(value) * self.content_height())
+        elif action == "scroll":
+            step = self.viewport.winfo_height() if unit == "pages" else SCROLL_STEP
+            self.scroll_to(self.scroll_offset + int(value) * step)
+
+    def on_mousewheel(self, event):
+        if not self.viewport.winfo_ismapped() or not str(event.widget).startswith(str(self.viewport)):
+            return
+        self.scroll_to(self.scroll_offset - (event.delta // 120) * SCROLL_STEP)
+
+    def run_winget_command(self, args, title="Operation"):
+        # Queued on the shared scheduler; progress shows in the one queue window
+        self.jobs.submit(args, title)
+        self.show_queue()
+        self.poll_jobs()
+
+    def install_profile(self, name, programs):
+        # Everything winget can install goes into one `winget import` job
+        plan = install_profiles.plan_profile(programs, self.detected)
+        if plan["install"]:
+            # Remember edits made to the profile before installing it
+            if self.settings is not None and install_profiles.load_profiles(self.settings).get(name) != list(programs):
+                install_profiles.save_profile(self.settings, name, programs)
+            manifest = install_profiles.write_import_manifest(name, plan["install"])
+            self.jobs.submit(install_profiles.import_args(manifest), title=f"Profile {name} ({len(plan['install'])} programs)",
+                             steps=len(plan["install"]))
+            self.show_queue()
+            self.poll_jobs()
+        notes = []
+        if plan["skipped"]:
+            notes.append("Already installed: " + ", ".join(plan["skipped"]))
+        if plan["manual"]:
+            notes.append("Install manually: " + ", ".join(entry["name"] for entry in plan["manual"]))
+        if not plan["install"]:
+            notes.insert(0, "Nothing to install.")
+        if notes:
+            messagebox.showinfo(f"Profile {name}", "\n\n".join(notes))
+
+    def on_job_finished(self, job):
+        # Worker thread: let the watcher pick up what winget changed right away
+        if self.watcher is not None:
+            self.watcher.poke()
+
+    def show_queue(self):
+        if self.queue_window is None or not self.queue_window.winfo_exists():
+            self.queue_window = WingetQueueWindow(self, self.jobs)
+        else:
+            self.queue_window.deiconify()
+            self.queue_window.lift()
+
+    def poll_jobs(self):
+        # Batches every event since the last tick into one UI update
+        if self.jobs_polling:
+            return
+        self.jobs_polling = True
+        def tick():
+            events = self.jobs.events()
+            if events and self.queue_window is not None and self.queue_window.winfo_exists():
+                self.queue_window.apply(events)
+            if self.jobs.pending() or events:
+                self.after(100, tick)
+            else:
+                self.jobs_polling = False
+        tick()
 
     def install_program(self, prog):
         winget_id = prog.get('winget')
-        source_url = prog.get('Source')
+        source_url = prog.get('source')
         if source_url:
             import webbrowser
             webbrowser.open(source_url)
@@ -400,12 +554,11 @@ class ProgramManagerUI(ctk.CTkFrame):
             return
         modules = ["customtkinter", "yt-dlp", "requests", "pillow"]
         def worker():
-            try:
-                for mod in modules:
-                    subprocess.run([py_exec, "-m", "pip", "install", mod], check=False)
+            # One resolver run for all modules instead of one pip call each
+            if PackageTransaction(install=modules).run_one(py_exec) == 0:
                 messagebox.showinfo("Python Modules", f"Modules installed for Python {version}.")
-            except Exception as e:
-                messagebox.showerror("Python Modules", f"Error: {e}")
+            else:
+                messagebox.showerror("Python Modules", f"Failed to install {', '.join(modules)} for Python {version}.")
         threading.Thread(target=worker, daemon=True).start()
 
     def open_program(self, prog):
@@ -5,6 +5,9 @@ import shutil
 import os
 import sys
 from tkinter import simpledialog, messagebox
+import queue
+from core import python_registry, package_inventory
+from core.package_transactions import PackageTransaction, split_packages
 
 # --- Module Metadata ---
 module_version = "1.0.0"
@@ -57,6 +60,45 @@ class CTkMsgBox(ctk.CTkToplevel):
         ctk.CTkButton(win, text="OK", command=win.destroy).pack(pady=10)
         win.wait_window()
 
+def stream_transaction(widget, textbox, transaction, python_paths, on_done=None):
+    """Run a PackageTransaction in the background and stream its output into textbox.
+
+    Worker threads only fill a queue; the Tk thread drains it every 100 ms.
+    """
+    events = queue.Queue()
+    many = len(python_paths) > 1
+    transaction.start(python_paths, on_event=lambda *event: events.put(event),
+                      on_finished=lambda results: events.put((None, "finished", results)))
+    def poll():
+        lines = []
+        finished = None
+        while True:
+            try:
+                path, kind, value = events.get_nowait()
+            except queue.Empty:
+                break
+            prefix = f"[{os.path.basename(os.path.dirname(path))}] " if many and path else ""
+            if kind == "line":
+                lines.append(f"{prefix}{value}\n")
+            elif kind == "package":
+                action, name, version = value
+                lines.append(f"{prefix}  {action}: {name}{' ' + version if version else ''}\n")
+            elif kind == "done":
+                lines.append(f"{prefix}{'Done' if value == 0 else f'Failed (code {value})'}\n")
+            elif kind == "finished":
+                finished = value
+        if lines and textbox.winfo_exists():
+            textbox.configure(state="normal")
+            textbox.insert("end", "".join(lines))
+            textbox.see("end")
+            textbox.configure(state="disabled")
+        if finished is None:
+            widget.after(100, poll)
+        elif on_done:
+            on_done(finished)
+    widget.after(100, poll)
+
+
 class PythonModuleUI(ctk.CTkFrame):
     """
     UI for managing Python installations and packages.
@@ -81,6 +123,7 @@ class PythonModuleUI(ctk.CTkFrame):
         ctk.CTkButton(btn_frame, text="Refresh List", command=self.refresh_pythons).grid(row=0, column=2, padx=4, pady=4)
         ctk.CTkButton(btn_frame, text="Manage Packages", command=self.open_package_manager).grid(row=0, column=3, padx=4, pady=4)
         ctk.CTkButton(btn_frame, text="Ensure Python & uv", command=self.ensure_python_and_uv).grid(row=1, column=0, padx=4, pady=4)
+        ctk.CTkButton(btn_frame, text="Install Packages", command=self.install_packages).grid(row=1, column=1, padx=4, pady=4)
         # ctk.CTkButton(btn_frame, text="Scan & Install Missing Pkgs", command=self.scan_and_install_missing_pkgs).grid(row=1, column=1, padx=4, pady=4)
 
         # List of installed Pythons
@@ -91,12 +134,12 @@ class PythonModuleUI(ctk.CTkFrame):
     def refresh_pythons(self):
         self.python_listbox.configure(state="normal")
         self.python_listbox.delete("1.0", "end")
-        pythons = PythonLogic.list_installed_pythons()
+        pythons = PythonLogic.list_installed_pythons(with_info=True)
         if not pythons:
             self.python_listbox.insert("end", "No Python installations found.\n")
         else:
             for py in pythons:
-                self.python_listbox.insert("end", f"{py['path']}  |  Version: {py['version']}\n")
+                self.python_listbox.insert("end", f"{py['path']}  |  Version: {py['version']}{PythonLogic.describe(py.get('info'))}\n")
         self.python_listbox.configure(state="disabled")
 
     def install_python(self):
@@ -144,8 +187,10 @@ class PythonModuleUI(ctk.CTkFrame):
                 win.vars = []
                 win.py_paths = []
                 for py in pythons:
-                    var = ctk.BooleanVar()
-                    cb = ctk.CTkCheckBox(win, text=f"{py['version']} - {py['path']}", variable=var)
+                    has_uv = bool(py.get("info") and py["info"].get("uv"))
+                    var = ctk.BooleanVar(value=False)
+                    label = f"{py['version']} - {py['path']}" + ("  (uv installed)" if has_uv else "")
+                    cb = ctk.CTkCheckBox(win, text=label, variable=var)
                     cb.pack(anchor="w", padx=18, pady=2)
                     win.vars.append(var)
                     win.py_paths.append(py["path"])
@@ -157,7 +202,7 @@ class PythonModuleUI(ctk.CTkFrame):
                     on_install(selected)
                 else:
                     CTkMsgBox.show_error("Please select at least one Python installation.")
-        pythons = PythonLogic.list_installed_pythons()
+        pythons = PythonLogic.list_installed_pythons(with_info=True)
         if not pythons:
             CTkMsgBox.show_error("No Python installations found.")
             return
@@ -171,6 +216,45 @@ class PythonModuleUI(ctk.CTkFrame):
             threading.Thread(target=worker, daemon=True).start()
         UvInstallWindow(self, pythons, on_install)
 
+    def install_packages(self):
+        # One transaction (one resolver run per interpreter) applied to every selected interpreter
+        class PackagesWindow(ctk.CTkToplevel):
+            def __init__(win, parent, pythons, on_apply):
+                super().__init__(parent)
+                win.title("Install Packages")
+                win.geometry("480x380")
+                win.grab_set()
+                ctk.CTkLabel(win, text="Packages (space or comma separated):", font=ctk.CTkFont(size=14)).pack(pady=(18, 4))
+                win.entry = ctk.CTkEntry(win, width=420)
+                win.entry.pack(padx=18, pady=(0, 8))
+                ctk.CTkLabel(win, text="Apply to:", font=ctk.CTkFont(size=13)).pack(anchor="w", padx=18)
+                win.vars = []
+                win.py_paths = []
+                for py in pythons:
+                    var = ctk.BooleanVar(value=len(pythons) == 1)
+                    ctk.CTkCheckBox(win, text=f"{py['version']} - {py['path']}", variable=var).pack(anchor="w", padx=18, pady=2)
+                    win.vars.append(var)
+                    win.py_paths.append(py["path"])
+                ctk.CTkButton(win, text="Install", command=lambda: win._apply(on_apply)).pack(pady=18)
+            def _apply(win, on_apply):
+                packages = split_packages(win.entry.get())
+                selected = [p for p, var in zip(win.py_paths, win.vars) if var.get()]
+                if not packages or not selected:
+                    CTkMsgBox.show_error("Enter packages and select at least one Python installation.")
+                    return
+                win.destroy()
+                on_apply(packages, selected)
+        pythons = PythonLogic.list_installed_pythons()
+        if not pythons:
+            CTkMsgBox.show_error("No Python installations found.")
+            return
+        def on_apply(packages, py_paths):
+            self.python_listbox.configure(state="normal")
+            self.python_listbox.insert("end", f"\nInstalling {' '.join(packages)} into {len(py_paths)} interpreter(s)...\n")
+            self.python_listbox.configure(state="disabled")
+            stream_transaction(self, self.python_listbox, PackageTransaction(install=packages), py_paths)
+        PackagesWindow(self, pythons, on_apply)
+
     def open_package_manager(self):
         class PythonSelectWindow(ctk.CTkToplevel):
             def __init__(win, parent, pythons, on_select):
@@ -267,7 +351,8 @@ class PackageManagerCTk(ctk.CTkToplevel):
     def setup_ui(self):
         self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=1)
-        ctk.CTkLabel(self, text=f"Python: {self.python_path}", font=ctk.CTkFont(size=13)).grid(row=0, column=0, padx=10, pady=8, sticky="w")
+        info = python_registry.get_registry().info(self.python_path)
+        ctk.CTkLabel(self, text=f"Python: {self.python_path}{PythonLogic.describe(info)}", font=ctk.CTkFont(size=13)).grid(row=0, column=0, padx=10, pady=8, sticky="w")
         btn_frame = ctk.CTkFrame(self, fg_color="transparent")
         btn_frame.grid(row=1, column=0, sticky="ew", padx=10)
         ctk.CTkButton(btn_frame, text="List Packages", command=self.list_packages).grid(row=0, column=0, padx=4, pady=4)
@@ -287,34 +372,41 @@ class PackageManagerCTk(ctk.CTkToplevel):
         threading.Thread(target=worker, daemon=True).start()
 
     def install_package(self):
-        pkg = simpledialog.askstring("Install Package", "Enter package name:")
-        if not pkg:
+        packages = split_packages(simpledialog.askstring("Install Package", "Enter package names (space separated):"))
+        if not packages:
             return
-        def worker():
-            self.output.configure(state="normal")
-            self.output.insert("end", f"\nInstalling {pkg}...\n")
-            self.output.configure(state="disabled")
-            PythonLogic.install_package(self.python_path, pkg)
-            self.list_packages()
-        threading.Thread(target=worker, daemon=True).start()
+        self.run_transaction(PackageTransaction(install=packages), f"Installing {' '.join(packages)}...")
 
     def uninstall_package(self):
-        pkg = simpledialog.askstring("Uninstall Package", "Enter package name:")
-        if not pkg:
+        packages = split_packages(simpledialog.askstring("Uninstall Package", "Enter package names (space separated):"))
+        if not packages:
             return
-        def worker():
-            self.output.configure(state="normal")
-            self.output.insert("end", f"\nUninstalling {pkg}...\n")
-            self.output.configure(state="disabled")
-            PythonLogic.uninstall_package(self.python_path, pkg)
-            self.list_packages()
-        threading.Thread(target=worker, daemon=True).start()
+        self.run_transaction(PackageTransaction(uninstall=packages), f"Uninstalling {' '.join(packages)}...")
+
+    def run_transaction(self, transaction, message):
+        self.output.configure(state="normal")
+        self.output.insert("end", f"\n{message}\n")
+        self.output.configure(state="disabled")
+        stream_transaction(self, self.output, transaction, [self.python_path], on_done=lambda results: self.list_packages())
 
 class PythonLogic:
+    @staticmethod
+    def info(python_path):
+        """Cached metadata for an interpreter (version, site-packages, pip/uv, venv)."""
+        return python_registry.get_registry().info(python_path) or {}
+
+    @staticmethod
+    def describe(info):
+        if not info:
+            return ""
+        tools = ", ".join(t for t in ("pip", "uv") if info.get(t)) or "no pip"
+        venv = "  |  venv" if info.get("venv") else ""
+        return f"  |  {info['implementation']} {info['arch']}{venv}  |  {tools}"
+
     @staticmethod
     def ensure_python_and_uv():
         """Ensure at least one Python and uv are installed."""
-        pythons = PythonLogic.list_installed_pythons()
+        pythons = PythonLogic.list_installed_pythons(with_info=True)
         # Only consider pythons >= 3.13.4
         min_version = (3, 13, 4)
         def version_tuple(v):
@@ -327,13 +419,16 @@ class PythonLogic:
             except Exception as e:
                 CTkMsgBox.show_error(f"Failed to install Python: {e}")
                 return
-            pythons = PythonLogic.list_installed_pythons()
+            pythons = PythonLogic.list_installed_pythons(with_info=True)
             filtered = [py for py in pythons if version_tuple(py["version"]) >= min_version]
         for py in filtered:
+            if py.get("info") and py["info"].get("uv"):
+                continue
             try:
                 subprocess.run([py["path"], "-m", "pip", "install", "uv"], check=True)
             except Exception as e:
                 CTkMsgBox.show_error(f"Failed to install uv in {py['path']}: {e}")
+            python_registry.get_registry().invalidate(py["path"])
 
     @staticmethod
     def scan_and_install_missing_pkgs(python_path):
@@ -347,56 +442,24 @@ class PythonLogic:
             "optparse": "optparse",
         }
         try:
-            out = subprocess.check_output([python_path, "-m", "pip", "freeze"], text=True)
-            installed = set([line.split("==")[0].lower() for line in out.strip().splitlines() if "==" in line])
+            installed = package_inventory.get_inventory().installed_names(python_path)
         except Exception:
             installed = set()
-        missing = [pkg for pkg in required if pkg.lower() not in installed]
+        missing = [pkg for pkg in required if package_inventory.normalize_name(pkg) not in installed]
         if not missing:
             messagebox.showinfo("Packages", "All required packages are already installed.")
             return
         # Map missing to install names
         install_pkgs = [install_name_map.get(m, m) for m in missing]
-        try:
-            subprocess.run([python_path, "-m", "pip", "install"] + install_pkgs, check=True)
+        if PackageTransaction(install=install_pkgs).run_one(python_path) == 0:
             messagebox.showinfo("Packages", f"Installed missing packages: {', '.join(install_pkgs)}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to install packages: {e}")
+        else:
+            messagebox.showerror("Error", f"Failed to install packages: {', '.join(install_pkgs)}")
     @staticmethod
-    def list_installed_pythons():
+    def list_installed_pythons(with_info=False):
         """Return a list of installed Python interpreters with their versions."""
-        pythons = []
-        candidates = set()
-        # Check PATH for python executables
-        for path in os.environ["PATH"].split(os.pathsep):
-            for exe_name in ("python.exe", "python3.exe", "python", "python3"):
-                exe_path = os.path.join(path, exe_name)
-                if os.path.isfile(exe_path) and os.access(exe_path, os.X_OK):
-                    candidates.add(os.path.abspath(exe_path))
-        # Windows: check common install folders
-        if sys.platform == "win32":
-            possible_dirs = [
-                os.path.join(os.environ.get("LocalAppData", ""), "Programs", "Python"),
-                os.path.join(os.environ.get("ProgramFiles", ""), "Python"),
-                os.path.join(os.environ.get("ProgramFiles(x86)", ""), "Python"),
-            ]
-            for d in possible_dirs:
-                if os.path.isdir(d):
-                    for sub in os.listdir(d):
-                        exe = os.path.join(d, sub, "python.exe")
-                        if os.path.isfile(exe) and os.access(exe, os.X_OK):
-                            candidates.add(os.path.abspath(exe))
-        # Remove any directories, only keep files that are executable
-        valid_candidates = [exe for exe in candidates if os.path.isfile(exe) and os.access(exe, os.X_OK)]
-        # Get version info
-        for exe in valid_candidates:
-            try:
-                out = subprocess.check_output([exe, "--version"], stderr=subprocess.STDOUT, text=True)
-                version = out.strip().replace("Python ", "")
-                pythons.append({"path": exe, "version": version})
-            except Exception:
-                continue
-        return pythons
+        # Cached by realpath/size/mtime in core.python_registry; only new interpreters are probed
+        return python_registry.get_registry().interpreters(with_info=with_info)
 
     @staticmethod
     def install_python_version(version):
@@ -434,28 +497,30 @@ class PythonLogic:
             messagebox.showinfo("Success", f"uv installed in {python_path}.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to install uv: {e}")
+        python_registry.get_registry().invalidate(python_path)
 
     @staticmethod
     def list_packages(python_path):
+        # Read from dist-info metadata; cached per site-packages mtime, no subprocess
         try:
-            out = subprocess.check_output([python_path, "-m", "pip", "list"], text=True)
-            return out.strip().splitlines()
+            packages = package_inventory.get_inventory().packages(python_path)
         except Exception as e:
             return [f"Error: {e}"]
+        width = max([len(p["name"]) for p in packages] + [7])
+        lines = [f"{'Package':<{width}}  {'Version':<12}  Summary", "-" * (width + 30)]
+        lines += [f"{p['name']:<{width}}  {p['version'] or '':<12}  {p['summary'] or ''}" for p in packages]
+        return lines
 
     @staticmethod
-    def install_package(python_path, package):
-        try:
-            subprocess.run([python_path, "-m", "uv", "pip", "install", "--system", package], check=True)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to install {package}: {e}")
+    def install_package(python_path, *packages):
+        # All packages in one resolver run (see core.package_transactions)
+        if PackageTransaction(install=packages).run_one(python_path) != 0:
+            messagebox.showerror("Error", f"Failed to install {' '.join(packages)}")
 
     @staticmethod
-    def uninstall_package(python_path, package):
-        try:
-            subprocess.run([python_path, "-m", "uv", "pip", "uninstall" ,"--system", "-y", package], check=True)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to uninstall {package}: {e}")
+    def uninstall_package(python_path, *packages):
+        if PackageTransaction(uninstall=packages).run_one(python_path) != 0:
+            messagebox.showerror("Error", f"Failed to uninstall {' '.join(packages)}")
 
 def home_widget(parent):
     frame = ctk.CTkFrame(parent, fg_color="#232323", corner_radius=8)
@@ -0,0 +1,59 @@
+import pytest
+
+ctk = pytest.importorskip("customtkinter")
+
+from core.SettingsManager import SettingsManager
+from core.module_registry import ModuleRegistry
+
+MODULE_SOURCE = '''import os
+import customtkinter as ctk
+
+# Every execution leaves a line behind
+with open(os.path.join(os.path.dirname(__file__), "executions.log"), "a") as f:
+    f.write("run\\n")
+
+module_name = "Counted"
+module_emoji = "🧩"
+module_description = "Counts its own imports."
+mod_settings = {"option": {"type": "bool", "default": True, "desc": "Some option"}}
+
+
+class CountedUI(ctk.CTkFrame):
+    def __init__(self, parent, settings=None):
+        super().__init__(parent)
+'''
+
+
+@pytest.fixture
+def root():
+    import tkinter as tk
+    try:
+        root = ctk.CTk()
+    except tk.TclError:
+        pytest.skip("no display")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+def test_module_imported_once_for_sidebar_and_settings(tmp_path, root):
+    from core.ui_settings import SettingsTab
+    modules_dir = tmp_path / "modules"
+    modules_dir.mkdir()
+    (modules_dir / "counted_module.py").write_text(MODULE_SOURCE, encoding="utf-8")
+    settings = SettingsManager(str(tmp_path / "toolbox_settings.json"))
+
+    registry = ModuleRegistry(str(modules_dir))
+    # Settings tab reads manifests only
+    SettingsTab(root, settings, registry)
+    assert registry.import_count == 0
+
+    # Sidebar prefetch, then show_tab building the frame
+    registry.prefetch(["counted_module"])["counted_module"].result()
+    entry = registry.get("counted_module")
+    registry.load(entry)
+    entry.ui_class(root, settings)
+    SettingsTab(root, settings, registry)
+
+    assert registry.import_count == 1
+    assert (modules_dir / "executions.log").read_text().count("run") == 1
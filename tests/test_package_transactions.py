@@ -0,0 +1,87 @@
+import os
+import venv
+import zipfile
+import subprocess
+
+import pytest
+
+from core import python_registry
+from core.python_registry import PythonRegistry
+from core.package_transactions import PackageTransaction
+from core.wheel_cache import WheelCache, serve_index
+
+
+def build_wheel(wheel_dir, name, version):
+    """A pure-Python wheel with one module that records its own version."""
+    dist_info = f"{name}-{version}.dist-info"
+    filename = os.path.join(wheel_dir, f"{name}-{version}-py3-none-any.whl")
+    files = {
+        f"{name}.py": f"VERSION = {version!r}\n",
+        f"{dist_info}/METADATA": f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n",
+        f"{dist_info}/WHEEL": "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+    record = "".join(f"{path},,\n" for path in files) + f"{dist_info}/RECORD,,\n"
+    with zipfile.ZipFile(filename, "w") as whl:
+        for path, text in files.items():
+            whl.writestr(path, text)
+        whl.writestr(f"{dist_info}/RECORD", record)
+    return filename
+
+
+class IndexCache(WheelCache):
+    """The same cache, read through its served simple index instead of --find-links."""
+    def __init__(self, root, index_url):
+        super().__init__(root)
+        self.index_url = index_url
+
+    def has(self, requirements, python_path=None):
+        return False
+
+    def find_links_args(self, offline=False):
+        return ["--index-url", self.index_url]
+
+
+@pytest.fixture(scope="module")
+def venv_python(tmp_path_factory):
+    env_dir = tmp_path_factory.mktemp("venv")
+    venv.create(env_dir, with_pip=True)
+    return str(env_dir / ("Scripts" if os.name == "nt" else "bin") / ("python.exe" if os.name == "nt" else "python"))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # Keep the probe cache and pip away from the user's setup and the network
+    monkeypatch.setattr(python_registry, "_registry", PythonRegistry(str(tmp_path / "python_registry.json")))
+    monkeypatch.setenv("PIP_DISABLE_PIP_VERSION_CHECK", "1")
+    monkeypatch.setenv("PIP_NO_INPUT", "1")
+    cache = WheelCache(str(tmp_path / "package_cache"))
+    os.makedirs(cache.wheel_dir)
+    return cache
+
+
+def installed_version(python_path, name):
+    return subprocess.run([python_path, "-c", f"import {name}; print({name}.VERSION)"],
+                          capture_output=True, text=True).stdout.strip()
+
+
+def test_pinned_install_from_cache_only(cache, venv_python):
+    build_wheel(cache.wheel_dir, "ktoolkit_offline", "1.0")
+    cache.rebuild_index()
+    lines = []
+    transaction = PackageTransaction(install=["ktoolkit_offline==1.0"], cache=cache)
+
+    assert transaction.run_one(venv_python, lambda py, kind, value: lines.append((kind, value))) == 0
+    assert installed_version(venv_python, "ktoolkit_offline") == "1.0"
+    assert ("package", ("installed", "ktoolkit_offline", "1.0")) in lines
+
+
+def test_install_from_served_index(cache, venv_python):
+    build_wheel(cache.wheel_dir, "ktoolkit_served", "2.0")
+    cache.rebuild_index()
+    server, index_url = serve_index(cache.root)
+    try:
+        transaction = PackageTransaction(install=["ktoolkit_served"], cache=IndexCache(cache.root, index_url))
+        assert transaction.run_one(venv_python) == 0
+    finally:
+        server.shutdown()
+    assert installed_version(venv_python, "ktoolkit_served") == "2.0"
@@ -0,0 +1,71 @@
+import os
+
+from core import program_detection
+from core.program_detection import DetectionBackend, detect_programs_by_name
+
+
+class FakeTreeBackend(DetectionBackend):
+    """Real files under tmp_path; %VAR% paths point into the tree, no registry."""
+    def __init__(self, root):
+        self.vars = {
+            "APPDATA": os.path.join(root, "AppData", "Roaming"),
+            "LOCALAPPDATA": os.path.join(root, "AppData", "Local"),
+            "PROGRAMDATA": os.path.join(root, "ProgramData"),
+            "ALLUSERSPROFILE": os.path.join(root, "ProgramData"),
+            "ProgramFiles": os.path.join(root, "Program Files"),
+            "ProgramFiles(x86)": os.path.join(root, "Program Files (x86)"),
+            "TEMP": os.path.join(root, "AppData", "Local", "Temp"),
+            "PATH": "",
+        }
+        for key in ("APPDATA", "LOCALAPPDATA", "PROGRAMDATA", "ProgramFiles", "TEMP"):
+            os.makedirs(self.vars[key], exist_ok=True)
+
+    def getenv(self, key, default=None):
+        return self.vars.get(key, default)
+
+    def expandvars(self, path):
+        for key, value in self.vars.items():
+            path = path.replace(f"%{key}%", value)
+        return path.replace("\\", os.sep)
+
+    def uninstall_stamp(self):
+        return []
+
+
+def counting_scans(monkeypatch):
+    calls = []
+    real_scan = program_detection.scan_programs
+
+    def scan(names, backend=None, catalog=None):
+        calls.append(list(names))
+        return real_scan(names, backend, catalog)
+    monkeypatch.setattr(program_detection, "scan_programs", scan)
+    return calls
+
+
+def test_warm_index_skips_scan(tmp_path, monkeypatch):
+    backend = FakeTreeBackend(str(tmp_path))
+    start_menu = os.path.join(backend.vars["APPDATA"], "Microsoft", "Windows", "Start Menu", "Programs", "Tools")
+    os.makedirs(start_menu)
+    # The index lives in the fake %APPDATA%\KToolkit, like the real one
+    app_dir = os.path.join(backend.vars["APPDATA"], "KToolkit")
+    os.makedirs(app_dir)
+    index_path = os.path.join(app_dir, "program_index.json")
+    scans = counting_scans(monkeypatch)
+
+    for _ in range(3):
+        result = detect_programs_by_name(["VLC"], backend, index_path=index_path)
+        # Other toolkit writes next to the index and in temp don't count as changes
+        with open(os.path.join(app_dir, "settings.json"), "w") as f:
+            f.write("{}")
+        os.makedirs(os.path.join(backend.vars["TEMP"], f"tmp{len(scans)}"), exist_ok=True)
+    assert result == {"VLC": None}
+    assert len(scans) == 1
+
+    # A shortcut added inside an existing Start Menu subfolder invalidates the index
+    with open(os.path.join(start_menu, "VLC media player.lnk"), "w"):
+        pass
+    os.utime(start_menu, (1, 1))
+    result = detect_programs_by_name(["VLC"], backend, index_path=index_path)
+    assert len(scans) == 2
+    assert result["VLC"].endswith("VLC media player.lnk")
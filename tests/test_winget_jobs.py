@@ -0,0 +1,61 @@
+import sys
+import threading
+
+from core import winget_jobs
+from core.winget_jobs import WingetScheduler, DONE, FAILED
+
+FAKE_WINGET = r'''import sys
+import time
+
+args = sys.argv[1:]
+if args[0] == "import":
+    for name in ("Alpha", "Beta"):
+        sys.stdout.write(f"Found {name} [Fake.{name}]\n")
+        for percent in (10, 50, 100):
+            sys.stdout.write(f"\r  ---   {percent}%")
+            sys.stdout.flush()
+            time.sleep(0.01)
+        sys.stdout.write("\nSuccessfully installed\n")
+    sys.exit(0)
+sys.stdout.write("No package found matching input criteria.\n")
+sys.exit(1)
+'''
+
+
+def run_jobs(scheduler, submissions):
+    finished = threading.Semaphore(0)
+    scheduler.on_finished.append(lambda job: finished.release())
+    jobs = [scheduler.submit(*args) for args in submissions]
+    for _ in jobs:
+        assert finished.acquire(timeout=30)
+    return jobs
+
+
+def test_fake_winget_progress_and_status(tmp_path, monkeypatch):
+    script = tmp_path / "fake_winget.py"
+    script.write_text(FAKE_WINGET, encoding="utf-8")
+    # Same value KTOOLKIT_WINGET would carry; the module reads it at import
+    monkeypatch.setattr(winget_jobs, "WINGET_COMMAND", f'"{sys.executable}" "{script}"')
+
+    scheduler = WingetScheduler(concurrency=2)
+    try:
+        ok, missing = run_jobs(scheduler, [
+            (["import", "-i", "packages.json"], "Import", 2),
+            (["install", "--id", "Nope.Nope"], "Install Nope"),
+        ])
+    finally:
+        scheduler.shutdown()
+
+    assert (ok.status, ok.returncode, ok.step, ok.progress) == (DONE, 0, 2, 100.0)
+    # Bar redraws are progress events, not log lines
+    assert ok.lines == ["Found Alpha [Fake.Alpha]", "Successfully installed",
+                        "Found Beta [Fake.Beta]", "Successfully installed"]
+    assert (missing.status, missing.returncode) == (FAILED, 1)
+    assert missing.lines == ["No package found matching input criteria."]
+
+    events = scheduler.events()
+    statuses = [value for job, kind, value in events if job is ok and kind == "status"]
+    assert statuses == ["queued", "running", "done"]
+    # Progress is coalesced to one event per job per drain
+    progress = [value for job, kind, value in events if job is ok and kind == "progress"]
+    assert progress == [100.0]